@@ -10,16 +10,23 @@ salīdzināšanas un sapludināšanas loģiku.
 """
 from __future__ import annotations
 
+import io
 from pathlib import Path
 from difflib import SequenceMatcher
-from typing import List, Optional, Tuple
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
 
-import pdfplumber
+# pdfplumber (un pdfminer) tiek importēts tikai funkcijās, jo tas ir dārgs un
+# nav vajadzīgs, ja fallback izslēgts
 
 __all__ = [
+    "PageTextWindow",
     "extract_first_page_text",
     "extract_law_title_pdfplumber",
     "get_page_texts",
+    "release_page",
+    "text_similarity",
+    "texts_are_similar",
 ]
 
 
@@ -27,14 +34,35 @@ __all__ = [
 #  Teksta ieguves palīgfunkcijas
 # ------------------------------------------------------------
 
-def extract_first_page_text(pdf_path: str | Path) -> str:
+def _open_pdfplumber(pdf_path: str | Path | bytes):
+    """Atver PDF ar pdfplumber no ceļa vai no atmiņā esošiem baitiem (arhīva dalībnieks)."""
+    import pdfplumber
+
+    if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+        # BytesIO dala buferi ar `bytes` objektu, kamēr tajā neraksta – kopija netiek veidota
+        return pdfplumber.open(io.BytesIO(pdf_path))
+    return pdfplumber.open(str(pdf_path))
+
+
+def release_page(page) -> None:
+    """Atbrīvo pdfplumber lapas kešus pēc teksta ekstrakcijas.
+
+    `flush_cache` neiztīra `get_textmap` `lru_cache`, kurā paliek visas
+    lapas rakstzīmes un vārdi. Tā kā `doc.pages` patur katru `Page` objektu,
+    bez tā katra nolasītā lapa paliktu atmiņā līdz dokumenta aizvēršanai.
+    """
+    page.flush_cache()
+    page.get_textmap.cache_clear()
+
+
+def extract_first_page_text(pdf_path: str | Path | bytes) -> str:
     """Atgriež pirmās lapas pliku tekstu, izmantojot pdfplumber.
 
     Ja notiek kļūda (piem., bojāts fails), tiek atgriezts tukšs
     virkne, kas ļauj aicinātāju pašam izlemt, ko darīt tālāk.
     """
     try:
-        with pdfplumber.open(str(pdf_path)) as doc:
+        with _open_pdfplumber(pdf_path) as doc:
             if not doc.pages:
                 return ""
             first_page = doc.pages[0]
@@ -44,24 +72,73 @@ def extract_first_page_text(pdf_path: str | Path) -> str:
         return ""
 
 
-def get_page_texts(pdf_path: str | Path) -> List[str]:
+def get_page_texts(pdf_path: str | Path | bytes, pages: Optional[Iterable[int]] = None) -> List[str]:
     """Atgriež visu lapu tekstu sarakstu, izmantojot pdfplumber.
 
     Šo funkciju var izmantot dziļākai salīdzināšanai ar PyMuPDF
     rezultātiem vai rezerves gadījumos, kad zivju fails neļaujas
-    PyMuPDF parserim.
+    PyMuPDF parserim. Ja norādīts `pages` (0-bāzēti indeksi), tiek
+    atgriezts tikai šo lapu teksts tādā pašā secībā.
     """
     texts: List[str] = []
     try:
-        with pdfplumber.open(str(pdf_path)) as doc:
-            for page in doc.pages:
+        with _open_pdfplumber(pdf_path) as doc:
+            selected = doc.pages if pages is None else [doc.pages[i] for i in pages]
+            for page in selected:
                 texts.append(page.extract_text() or "")
+                release_page(page)
     except Exception:
         # Kļūdas gadījumā atgriežam tik, cik paspēts
         pass
     return texts
 
 
+class PageTextWindow:
+    """Lapu teksts pēc pieprasījuma; atmiņā tiek turētas tikai pēdējās `window` lapas.
+
+    Atšķirībā no `get_page_texts` pdfplumber tiek atvērts tikai tad, kad
+    pirmo reizi vajadzīga kādas lapas teksts, un pēc ekstrakcijas lapas
+    iekšējie objekti tiek atbrīvoti. Kļūdas gadījumā tiek atgriezta tukša virkne.
+    """
+
+    def __init__(self, pdf_path: str | Path | bytes, window: int = 4):
+        self.pdf_path = pdf_path
+        self.window = max(1, window)
+        self._doc = None
+        self._failed = False
+        self._texts: "OrderedDict[int, str]" = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, index: int) -> str:
+        if index in self._texts:
+            return self._texts[index]
+        text = ""
+        try:
+            if self._doc is None and not self._failed:
+                self._doc = _open_pdfplumber(self.pdf_path)
+            if self._doc is not None and index < len(self._doc.pages):
+                page = self._doc.pages[index]
+                text = page.extract_text() or ""
+                release_page(page)
+        except Exception:
+            self._failed = True
+        self._texts[index] = text
+        while len(self._texts) > self.window:
+            self._texts.popitem(last=False)
+        return text
+
+    def close(self):
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        self._texts.clear()
+
+
 # ------------------------------------------------------------
 #  Juridiskā nosaukuma atpazīšana (fallback)
 # ------------------------------------------------------------
@@ -86,7 +163,7 @@ def _normalize_whitespace(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
-def extract_law_title_pdfplumber(pdf_path: str | Path) -> Optional[str]:
+def extract_law_title_pdfplumber(pdf_path: str | Path | bytes) -> Optional[str]:
     """Mēģina atrast likuma nosaukumu PDF pirmajā lapā, izmantojot pdfplumber.
 
     Atgriež nosaukumu vai None, ja neizdodas neko atrast.
@@ -106,9 +183,17 @@ def extract_law_title_pdfplumber(pdf_path: str | Path) -> Optional[str]:
 #  Vienkārša satura salīdzināšana
 # ------------------------------------------------------------
 
+def text_similarity(t1: str, t2: str) -> float:
+    """Līdzības koeficients 0..1 (difflib); divi tukši teksti ir vienādi."""
+    if not t1 and not t2:
+        return 1.0
+    if not t1 or not t2:
+        return 0.0
+    return SequenceMatcher(None, t1, t2).ratio()
+
+
 def texts_are_similar(t1: str, t2: str, threshold: float = 0.9) -> bool:
     """Pārbauda, vai divas teksta virknes ir >= threshold līdzīgas."""
     if not t1 or not t2:
         return False
-    ratio = SequenceMatcher(None, t1, t2).ratio()
-    return ratio >= threshold
+    return text_similarity(t1, t2) >= threshold
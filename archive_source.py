@@ -0,0 +1,403 @@
+"""archive_source.py
+
+PDF apstrāde tieši no ZIP/TAR arhīviem, tos neizpakojot uz diska.
+
+Likumi tiek piegādāti lielos ZIP un tar arhīvos. Agrāk tos vajadzēja
+izpakot `input_pdfs` mapē, un `run_processing_for_list` katru failu vēl
+nokopēja – tie paši baiti tika rakstīti uz diska divreiz. Šeit katrs arhīva
+PDF dalībnieks tiek nolasīts atmiņā un nodots tālāk kā `ArchiveMember`:
+
+* PyMuPDF to atver ar `fitz.open(stream=...)`, pdfplumber – caur `BytesIO`
+  virs tiem pašiem baitiem (uzraudzītajam darbiniekam baiti tiek nosūtīti
+  caur kanālu);
+* apstrādātais PDF tiek saglabāts no tiem pašiem baitiem (versiju glabātuvē
+  vai `processed_pdfs`), kļūdas gadījumā – `error_pdfs` mapē;
+* katalogā dalībnieks tiek ierakstīts kā `source_name` "<arhīvs>!<dalībnieks>"
+  kopā ar satura `source_sha256`, tāpēc apstrādes un kļūdu stāvoklis tiek
+  uzskaitīts katram dalībnieka saturam: atkārtota palaišana izlaiž jau
+  apstrādātos (un, ja nav `retry_errors`, arī kļūdainos) dalībniekus, bet
+  atkārtoti piegādātā arhīvā ar to pašu nosaukumu mainītie dalībnieki tiek
+  apstrādāti no jauna;
+* pārāk lieli dalībnieki netiek atspiesti – tie tiek ierakstīti katalogā kā
+  kļūda (`too_large`) pēc nosaukuma un izmēra un netiek mēģināti atkārtoti.
+
+Pabeigtos arhīvus `finish_archive` pārvieto uz `processed_archives`; ja tur
+jau ir arhīvs ar tādu pašu nosaukumu, jaunais saņem numuru
+(`likumi.2.zip`), nevis pārraksta iepriekšējo. Ar `finish=True`
+`run_processing_for_archive` to dara pati, ja palaišanā neviens dalībnieks
+nepalika neapstrādāts – arhīvs netiek lasīts otrreiz.
+
+Dalībnieki tiek apstrādāti paralēli (`max_concurrent_files`), katram
+pavedienam savs `SupervisedWorker`. Arhīvs tiek lasīts secīgi vienā
+pavedienā, un nākamais dalībnieks tiek nolasīts tikai tad, kad atbrīvojas
+darbinieks, tāpēc atmiņā vienlaikus ir ne vairāk kā `max_concurrent_files`
+dalībnieku. ZIP dalībnieki ar `schedule_shortest_first` tiek apstrādāti
+mazākie vispirms; tar arhīvi tiek lasīti plūsmā to secībā. Bez uzraudzītajiem
+darbiniekiem apstrāde notiek vienā pavedienā, jo PyMuPDF nav drošs
+vienlaicīgai lietošanai no vairākiem pavedieniem.
+
+Lietošana no komandrindas::
+
+    python archive_source.py process likumi_2024.zip --workers 4
+    python archive_source.py process likumi.tar.gz --retry-errors
+    python archive_source.py status likumi_2024.zip
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import queue
+import shutil
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from catalog import catalog
+from config import path_config
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "ArchiveMember",
+    "finish_archive",
+    "is_archive",
+    "list_members",
+    "iter_members",
+    "member_states",
+    "member_status",
+    "pending_members",
+    "run_processing_for_archive",
+]
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Dalībnieki ar šiem statusiem netiek apstrādāti atkārtoti
+FINAL_STATUSES = ("ok", "error")
+
+
+def is_archive(path: str | Path) -> bool:
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+@dataclass(eq=False)
+class ArchiveMember:
+    """Viens PDF arhīvā; `data` ir dalībnieka baiti, ja tie jau nolasīti."""
+
+    archive: Path
+    member: str
+    size: int
+    data: Optional[bytes] = field(default=None, repr=False)
+    sha256: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.member).stem
+
+    @property
+    def unique_stem(self) -> str:
+        """`stem` ar dalībnieka ceļa jaucējkodu – dažādās mapēs var būt vienāds `name`."""
+        return f"{self.stem}.{hashlib.sha256(self.member.encode('utf-8')).hexdigest()[:10]}"
+
+    @property
+    def source_name(self) -> str:
+        return f"{self.archive.name}!{self.member}"
+
+    @property
+    def source_path(self) -> str:
+        return f"{self.archive.resolve()}!{self.member}"
+
+    @property
+    def too_large(self) -> bool:
+        return self.size > path_config.max_file_size_mb * 1024 * 1024
+
+    @property
+    def member_key(self) -> Optional[str]:
+        """Satura atslēga katalogā: `sha256` vai, nenolasītam dalībniekam, izmērs."""
+        if self.sha256 is not None:
+            return self.sha256
+        return f"size:{self.size}" if self.too_large else None
+
+    def __str__(self) -> str:
+        return f"{self.archive}!{self.member}"
+
+    def validate(self) -> Tuple[bool, str]:
+        """Tās pašas pārbaudes kā `path_config.validate_file`, bet bez faila uz diska."""
+        if PurePosixPath(self.member).suffix.lower() != ".pdf":
+            return False, "Fails nav PDF formātā"
+        if self.too_large:
+            size_mb = self.size / (1024 * 1024)
+            return False, f"Fails ir pārāk liels ({size_mb:.1f}MB > {path_config.max_file_size_mb}MB)"
+        return True, "OK"
+
+    def read_bytes(self) -> bytes:
+        """Dalībnieka baiti; ja `iter_members` tos vēl nav nolasījis, tie tiek nolasīti no arhīva."""
+        if self.data is None:
+            if zipfile.is_zipfile(self.archive):
+                with zipfile.ZipFile(self.archive) as zf:
+                    self.data = zf.read(self.member)
+            else:
+                with tarfile.open(self.archive, "r:*") as tf:
+                    self.data = tf.extractfile(self.member).read()
+        if self.sha256 is None:
+            self.sha256 = hashlib.sha256(self.data).hexdigest()
+        return self.data
+
+    def release(self):
+        self.data = None
+
+
+# ------------------------------------------------------------
+#  Arhīva lasīšana
+# ------------------------------------------------------------
+
+def _is_pdf(name: str) -> bool:
+    return name.lower().endswith(".pdf")
+
+
+def list_members(archive: str | Path) -> List[ArchiveMember]:
+    """Arhīva PDF dalībnieki bez satura (tar arhīvam tas tiek izlasīts vienreiz)."""
+    archive = Path(archive)
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            return [ArchiveMember(archive, info.filename, info.file_size)
+                    for info in zf.infolist() if not info.is_dir() and _is_pdf(info.filename)]
+    with tarfile.open(archive, "r:*") as tf:
+        return [ArchiveMember(archive, info.name, info.size)
+                for info in tf.getmembers() if info.isfile() and _is_pdf(info.name)]
+
+
+def _read_member(archive: Path, name: str, size: int, read: Callable[[], bytes],
+                 skip: Optional[Callable[[ArchiveMember], bool]]) -> Optional[ArchiveMember]:
+    member = ArchiveMember(archive, name, size)
+    # Pārāk lieli dalībnieki netiek atspiesti; apstrāde tos noraida un ieraksta katalogā
+    if not member.too_large:
+        member.data = read()
+        member.read_bytes()  # aprēķina sha256
+    if skip is not None and skip(member):
+        return None
+    return member
+
+
+def iter_members(archive: str | Path, skip: Optional[Callable[[ArchiveMember], bool]] = None,
+                 smallest_first: bool = False) -> Iterator[ArchiveMember]:
+    """Atgriež PDF dalībniekus kopā ar to baitiem un `sha256`, lasot arhīvu secīgi.
+
+    Dalībnieki, kuriem `skip(member)` ir True, netiek atgriezti. Pārāk lieli
+    dalībnieki netiek atspiesti un tiek atgriezti bez `data` un `sha256`.
+    """
+    archive = Path(archive)
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            infos = [info for info in zf.infolist() if not info.is_dir() and _is_pdf(info.filename)]
+            if smallest_first:
+                infos.sort(key=lambda info: info.file_size)
+            for info in infos:
+                # ZipFile.read pārbauda arī CRC un deklarēto izmēru
+                member = _read_member(archive, info.filename, info.file_size,
+                                      lambda: zf.read(info), skip)
+                if member is not None:
+                    yield member
+        return
+    # Plūsmas režīms: saspiestu tar arhīvu atspiež vienreiz, bez nejaušas piekļuves
+    with tarfile.open(archive, "r|*") as tf:
+        for info in tf:
+            if not info.isfile() or not _is_pdf(info.name):
+                continue
+            member = _read_member(archive, info.name, info.size,
+                                  lambda: tf.extractfile(info).read(), skip)
+            if member is not None:
+                yield member
+
+
+def member_states(archive: str | Path) -> Dict[str, Dict[Optional[str], str]]:
+    """Katra jau mēģinātā dalībnieka pēdējais statuss katalogā katram saturam (sha256)."""
+    return catalog.member_statuses(Path(archive).name)
+
+
+def member_status(states: Dict[str, Dict[Optional[str], str]], member: ArchiveMember) -> Optional[str]:
+    """Dalībnieka pašreizējā satura statuss; None, ja šis saturs vēl nav mēģināts."""
+    return states.get(member.member, {}).get(member.member_key)
+
+
+def pending_members(archive: str | Path, retry_errors: bool = False) -> List[str]:
+    """Dalībnieki, kuru saturs vēl nav apstrādāts (vai ir kļūdains, ja `retry_errors`).
+
+    Arhīvs tiek izlasīts, lai salīdzinātu dalībnieku saturu ar katalogu.
+    """
+    states = member_states(archive)
+    final = ("ok",) if retry_errors else FINAL_STATUSES
+    pending = []
+    for member in iter_members(archive, lambda m: member_status(states, m) in final):
+        pending.append(member.member)
+        member.release()
+    return pending
+
+
+def finish_archive(archive: str | Path, pending: Optional[List[str]] = None) -> Optional[Path]:
+    """Pārvieto pilnībā apstrādātu arhīvu uz `processed_archives`; atgriež jauno ceļu.
+
+    Ja arhīvā vēl ir neapstrādāti dalībnieki, tas paliek vietā (None). Tos
+    nosaka `pending`, ja to jau zina izsaucējs, citādi `pending_members`
+    (arhīvs tiek izlasīts). Esošs arhīvs ar tādu pašu nosaukumu netiek
+    pārrakstīts – jaunais saņem numuru.
+    """
+    archive = Path(archive)
+    if pending is None:
+        pending = pending_members(archive)
+    if pending:
+        return None
+    target_dir = path_config.processed_archives_dir
+    target_dir.mkdir(parents=True, exist_ok=True)
+    suffix = next(s for s in ARCHIVE_SUFFIXES if archive.name.lower().endswith(s))
+    base = archive.name[:-len(suffix)]
+    target = target_dir / archive.name
+    number = 1
+    while target.exists():
+        number += 1
+        target = target_dir / f"{base}.{number}{archive.name[-len(suffix):]}"
+    shutil.move(str(archive), target)
+    return target
+
+
+# ------------------------------------------------------------
+#  Paralēla apstrāde
+# ------------------------------------------------------------
+
+def run_processing_for_archive(archive: str | Path, log_queue=None, workers: Optional[int] = None,
+                               cancel_token=None, retry_errors: bool = False,
+                               force: bool = False, finish: bool = False) -> List[Dict[str, Any]]:
+    """Apstrādā arhīva PDF dalībniekus paralēli; atgriež katra mēģinājuma kataloga ierakstu.
+
+    Katrs dalībnieks iziet pilno `run_processing_for_list` ciklu (JSON,
+    versijas, eksporti, katalogs). Jau apstrādātie dalībnieki tiek izlaisti,
+    ja nav `force`; kļūdainie – ja nav `retry_errors`. Ar `finish` arhīvs
+    pēc pilnas palaišanas bez neapstrādātiem dalībniekiem tiek pārvietots
+    (`finish_archive`).
+    """
+    # main importējam tikai šeit – tas pats importē šo moduli
+    from main import logger as main_logger, run_processing_for_list, setup_logging
+    from supervisor import SupervisedWorker
+
+    archive = Path(archive)
+    setup_logging()
+
+    def log(message: str, tag: str = "meta"):
+        main_logger.info(message.strip(), extra={"tag": tag})
+        if log_queue:
+            log_queue.put((message + "\n", tag))
+
+    skipped = 0
+    states = {} if force else member_states(archive)
+    final = ("ok",) if retry_errors else FINAL_STATUSES
+
+    def _skip(member: ArchiveMember) -> bool:
+        nonlocal skipped
+        if member_status(states, member) in final:
+            skipped += 1
+            return True
+        return False
+
+    skip = None if force else _skip
+
+    use_workers = path_config.use_supervised_workers
+    workers = max(1, workers or path_config.max_concurrent_files) if use_workers else 1
+    idle: "queue.Queue[Optional[SupervisedWorker]]" = queue.Queue()
+    started: List[SupervisedWorker] = []
+    for _ in range(workers):
+        worker = SupervisedWorker() if use_workers else None
+        if worker is not None:
+            started.append(worker)
+        idle.put(worker)
+    # Nākamo dalībnieku lasām tikai tad, kad atbrīvojies darbinieks (ierobežota atmiņa)
+    slots = threading.BoundedSemaphore(workers)
+    records: List[Dict[str, Any]] = []
+    # Dalībnieki bez gala statusa (piem., atcelti) – arhīvu vēl nedrīkst pārvietot
+    unfinished: List[str] = []
+    records_lock = threading.Lock()
+
+    def process_member(member: ArchiveMember):
+        worker = idle.get()
+        try:
+            result = run_processing_for_list([member], log_queue, worker=worker, cancel_token=cancel_token)
+            with records_lock:
+                records.extend(result)
+                if not any(record.get("status") in FINAL_STATUSES for record in result):
+                    unfinished.append(member.member)
+        except BaseException as e:
+            log(f"KĻŪDA apstrādājot {member}: {e}", 'error')
+            with records_lock:
+                unfinished.append(member.member)
+            raise
+        finally:
+            member.release()
+            idle.put(worker)
+            slots.release()
+
+    log(f"Arhīvs {archive.name}: apstrāde ar {workers} darbiniekiem")
+    members = iter_members(archive, skip, path_config.schedule_shortest_first)
+    read_all = False
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive") as executor:
+            while True:
+                slots.acquire()
+                if cancel_token is not None and not cancel_token.proceed():
+                    slots.release()
+                    log(f"⏹ Arhīva {archive.name} apstrāde atcelta", 'error')
+                    break
+                member = next(members, None)
+                if member is None:
+                    slots.release()
+                    read_all = True
+                    break
+                executor.submit(process_member, member)
+    finally:
+        members.close()
+        for worker in started:
+            worker.close()
+
+    if skipped:
+        log(f"{archive.name}: izlaisti {skipped} jau apstrādāti dalībnieki")
+
+    counts: Dict[str, int] = {}
+    for record in records:
+        counts[record.get("status", "?")] = counts.get(record.get("status", "?"), 0) + 1
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())) or "nav jaunu dalībnieku"
+    log(f"🏁 Arhīvs {archive.name} apstrādāts ({summary})")
+    if finish and read_all:
+        moved_to = finish_archive(archive, unfinished)
+        if moved_to:
+            log(f"Arhīvs pārvietots uz: {moved_to.parent.name}/{moved_to.name}")
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF apstrāde tieši no ZIP/TAR arhīviem")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_process = sub.add_parser("process", help="Apstrādāt arhīva PDF dalībniekus")
+    p_process.add_argument("archives", nargs="+", type=Path)
+    p_process.add_argument("--workers", type=int, help="Paralēlo darbinieku skaits (noklusējums: max_concurrent_files)")
+    p_process.add_argument("--retry-errors", action="store_true", help="Apstrādāt atkārtoti arī kļūdainos dalībniekus")
+    p_process.add_argument("--force", action="store_true", help="Apstrādāt visus dalībniekus no jauna")
+    p_status = sub.add_parser("status", help="Dalībnieku stāvoklis katalogā")
+    p_status.add_argument("archive", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "process":
+        # main izmanto moduli `archive_source`, nevis `__main__` – tam jāsakrīt `ArchiveMember` klasei
+        import archive_source
+
+        for path in args.archives:
+            archive_source.run_processing_for_archive(path, workers=args.workers, retry_errors=args.retry_errors,
+                                                      force=args.force)
+    else:
+        states = member_states(args.archive)
+        for member in iter_members(args.archive):
+            status = member_status(states, member) or ("mainīts" if member.member in states else "gaida")
+            print(f"{status:<10} {member.size / 1024:8.0f} KB  {member.member}")
+            member.release()
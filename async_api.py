@@ -0,0 +1,342 @@
+"""async_api.py
+
+Asinhrona (asyncio) saskarne apstrādes konveijeram.
+
+Apstrāde pati par sevi ir bloķējoša un CPU ietilpīga, tāpēc `AsyncPipeline`
+to izpilda izpildītājā (executor) – ja ieslēgti uzraudzītie darbinieki
+(`use_supervised_workers`), katram vienlaicīgajam slotam ir savs
+`SupervisedWorker` process, citādi apstrāde notiek pavedienā.
+
+* Vienlaicīgums ir ierobežots ar `max_concurrency` (pēc noklusējuma
+  `path_config.max_concurrent_files`).
+* Progresa un žurnāla ziņas tiek atgrieztas kā `PipelineEvent` caur async
+  iteratoru, nevis `queue.Queue`.
+* Notikumu buferis ir ierobežots: ja patērētājs nelasa, apstrādes pavediens
+  gaida (backpressure).
+* Katru dokumentu var atcelt atsevišķi ar `cancel(path)`; `pause()` un
+  `resume()` aptur un atsāk visus dokumentus starp lapām.
+
+Piemērs::
+
+    async with AsyncPipeline(max_concurrency=2) as pipeline:
+        async for event in pipeline.process(paths):
+            if event.kind == "finished":
+                ...
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+
+from cancellation import CancellationToken, ProcessingCancelled
+from config import path_config
+from progress import PROGRESS_TAG, ProgressEvent
+from supervisor import SupervisedWorker
+
+__all__ = [
+    "AsyncPipeline",
+    "DocumentCancelled",
+    "DocumentResult",
+    "PipelineEvent",
+]
+
+# Rindu tagi, kurus pārsūtām pēc noklusējuma. Katras parsētās rindas
+# notikumi ('article', 'point', ...) ir vajadzīgi tikai GUI vizualizācijai.
+DEFAULT_EVENT_TAGS = ("meta", "title", "error", PROGRESS_TAG)
+
+
+class DocumentCancelled(ProcessingCancelled):
+    """Dokumenta apstrāde tika atcelta.
+
+    Tāpat kā `asyncio.CancelledError`, manto no `BaseException`, lai to
+    nenoķertu apstrādes koda vispārīgie `except Exception` bloki;
+    `run_processing_for_list` to apstrādā kā atceltu failu.
+    """
+
+
+@dataclass
+class DocumentResult:
+    """Viena dokumenta rezultāts."""
+
+    path: Path
+    law_title: Optional[str] = None
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    record: Optional[Dict[str, Any]] = None  # kataloga ieraksts, ja rezultāts saglabāts
+
+    @property
+    def ok(self) -> bool:
+        if self.record is not None:
+            return self.record.get("status") == "ok"
+        return bool(self.law_title and self.entries)
+
+
+@dataclass
+class PipelineEvent:
+    """Notikums no apstrādes konveijera.
+
+    `kind` ir viens no: "started", "log", "progress", "finished", "failed",
+    "cancelled". "log" notikumiem `message`/`tag` atbilst agrākajiem
+    `(text, tag)` rindas ierakstiem; "progress" notikumiem ir aizpildīts
+    `progress`, noslēguma notikumiem – `result`.
+    """
+
+    kind: str
+    path: Path
+    message: str = ""
+    tag: str = ""
+    result: Optional[DocumentResult] = None
+    progress: Optional[ProgressEvent] = None
+
+
+class _EventBridge:
+    """Queue-līdzīgs objekts, ko bloķējošais kods izmanto kā `log_queue`.
+
+    `put` tiek izsaukts no izpildītāja pavediena un gaida, līdz notikums
+    ievietots ierobežotajā `asyncio.Queue` – tā patērētāja ātrums nosaka
+    apstrādes ātrumu. Pēc atcelšanas notikumi tiek izmesti: apstrādi aptur
+    `cancel_token` pārbaudes, bet atcelšanas apstrāde (izvades dzēšana,
+    kataloga ieraksts) vēl raksta žurnālā un nedrīkst tikt pārtraukta.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, events: asyncio.Queue, path: Path,
+                 cancel_token: CancellationToken, tags: Optional[Sequence[str]]):
+        self._loop = loop
+        self._events = events
+        self._path = path
+        self.cancel_token = cancel_token
+        self._tags = set(tags) if tags is not None else None
+
+    def accepts(self, tag: str) -> bool:
+        # Ļauj parserim neveidot notikumus, kurus tik un tā izmestu
+        return self._tags is None or tag in self._tags
+
+    def put(self, item):
+        if self.cancel_token.cancelled:
+            return
+        text, tag = item
+        if self._tags is not None and tag not in self._tags:
+            return
+        if tag == PROGRESS_TAG:
+            event = PipelineEvent("progress", self._path, tag=tag, progress=text)
+        else:
+            event = PipelineEvent("log", self._path, text, tag)
+        future = asyncio.run_coroutine_threadsafe(self._events.put(event), self._loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return
+            except concurrent.futures.TimeoutError:
+                if self.cancel_token.cancelled:
+                    future.cancel()
+                    return
+
+
+class AsyncPipeline:
+    """Ierobežota vienlaicīguma asinhronā apstrādes saskarne."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        event_buffer: int = 100,
+        event_tags: Optional[Sequence[str]] = DEFAULT_EVENT_TAGS,
+        use_workers: Optional[bool] = None,
+    ):
+        self.max_concurrency = max_concurrency or path_config.max_concurrent_files
+        self.event_buffer = event_buffer
+        self.event_tags = event_tags
+        self.use_workers = path_config.use_supervised_workers if use_workers is None else use_workers
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="pdf-pipeline"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle_workers: List[SupervisedWorker] = []
+        self._all_workers: List[SupervisedWorker] = []
+        self._cancel_flags: Dict[str, CancellationToken] = {}
+        self._paused = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    # ------------------------------------------------------------
+    #  Publiskā saskarne
+    # ------------------------------------------------------------
+
+    async def parse(self, pdf_path: str | Path) -> DocumentResult:
+        """Apstrādā vienu PDF un atgriež rezultātu, neko nesaglabājot.
+
+        Notikumi tiek izmesti; ja tie vajadzīgi, izmanto `process(..., save=False)`.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        result = await self._run_document(Path(pdf_path), events, save=False, tags=())
+        if result is None:
+            raise DocumentCancelled(str(pdf_path))
+        return result
+
+    async def process(self, pdf_paths: Iterable[str | Path], save: bool = True) -> AsyncIterator[PipelineEvent]:
+        """Apstrādā failus un pa vienam atgriež to notikumus.
+
+        Ar `save=True` katram failam tiek izpildīts pilnais `run_processing_for_list`
+        cikls (JSON saglabāšana, PDF pārvietošana, katalogs); ar `save=False`
+        rezultāts ir tikai `DocumentResult` noslēguma notikumā.
+        Ja patērētājs pārtrauc iterāciju, visi vēl nepabeigtie dokumenti tiek atcelti.
+        """
+        events: asyncio.Queue = asyncio.Queue(maxsize=self.event_buffer)
+        paths = [Path(p) for p in pdf_paths]
+        tasks = [
+            asyncio.create_task(self._run_document(path, events, save, self.event_tags))
+            for path in paths
+        ]
+        finished = asyncio.ensure_future(asyncio.gather(*tasks, return_exceptions=True))
+        try:
+            while True:
+                get_event = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({get_event, finished}, return_when=asyncio.FIRST_COMPLETED)
+                if get_event in done:
+                    yield get_event.result()
+                    continue
+                get_event.cancel()
+                # Visi dokumenti pabeigti – izsniedzam atlikušos notikumus
+                while not events.empty():
+                    yield events.get_nowait()
+                break
+        finally:
+            if not finished.done():
+                for path in paths:
+                    self.cancel(path)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel(self, pdf_path: str | Path):
+        """Atceļ viena dokumenta apstrādi (gaidošu vai notiekošu).
+
+        Notiekošā apstrāde apstājas pie nākamās lapas; nepabeigtā izvade
+        tiek izdzēsta, un fails paliek `input_dir` mapē. Jau pabeigtam vai
+        nezināmam dokumentam tas neko nedara.
+        """
+        token = self._cancel_flags.get(str(Path(pdf_path)))
+        if token is not None:
+            token.cancel()
+
+    def pause(self):
+        """Aptur visu dokumentu apstrādi pie nākamās lapas (arī vēl nesāktos)."""
+        self._paused = True
+        for token in self._cancel_flags.values():
+            token.pause()
+
+    def resume(self):
+        self._paused = False
+        for token in self._cancel_flags.values():
+            token.resume()
+
+    async def aclose(self):
+        """Aptur darbinieku procesus un izpildītāju."""
+        loop = asyncio.get_running_loop()
+        for worker in self._all_workers:
+            await loop.run_in_executor(None, worker.close)
+        self._all_workers.clear()
+        self._idle_workers.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------
+    #  Iekšējā loģika
+    # ------------------------------------------------------------
+
+    def _token(self, key: str) -> CancellationToken:
+        token = self._cancel_flags.get(key)
+        if token is None:
+            token = self._cancel_flags[key] = CancellationToken()
+            if self._paused:
+                token.pause()
+        return token
+
+    def _acquire_worker(self) -> Optional[SupervisedWorker]:
+        if not self.use_workers:
+            return None
+        if self._idle_workers:
+            return self._idle_workers.pop()
+        worker = SupervisedWorker()
+        self._all_workers.append(worker)
+        return worker
+
+    def _parse_blocking(self, path: Path, bridge: _EventBridge,
+                        worker: Optional[SupervisedWorker]) -> DocumentResult:
+        if worker is None:
+            from pdf_processor import process_pdf_to_structured_data
+
+            stats: Dict[str, Any] = {}
+            law_title, entries = process_pdf_to_structured_data(str(path), bridge, stats=stats,
+                                                                cancel_token=bridge.cancel_token)
+            return DocumentResult(path, law_title, entries, stats)
+        result = worker.process(path, bridge, cancel_token=bridge.cancel_token)
+        if result.status == "cancelled":
+            raise DocumentCancelled(str(path))
+        stats = dict(result.stats, cpu_seconds=result.cpu_seconds, peak_rss_mb=result.peak_rss_mb,
+                     status=result.status, error=result.error)
+        return DocumentResult(path, result.law_title, result.entries, stats)
+
+    def _save_blocking(self, path: Path, bridge: _EventBridge,
+                       worker: Optional[SupervisedWorker]) -> DocumentResult:
+        # main importējam tikai šeit, jo tas importēšanas brīdī iestata žurnālu un mapes
+        from main import run_processing_for_list
+
+        records = run_processing_for_list([path], bridge, worker=worker, cancel_token=bridge.cancel_token)
+        record = records[0] if records else {"status": "error", "error": "Fails nav derīgs apstrādei"}
+        return DocumentResult(path, record.get("law_title"), record=record)
+
+    async def _run_document(self, path: Path, events: asyncio.Queue, save: bool,
+                            tags: Optional[Sequence[str]]) -> Optional[DocumentResult]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        key = str(path)
+        token = self._token(key)
+        loop = asyncio.get_running_loop()
+
+        try:
+            async with self._semaphore:
+                if token.cancelled:
+                    await events.put(PipelineEvent("cancelled", path))
+                    return None
+
+                await events.put(PipelineEvent("started", path))
+                worker = self._acquire_worker()
+                bridge = _EventBridge(loop, events, path, token, tags)
+                blocking = self._save_blocking if save else self._parse_blocking
+                try:
+                    result = await loop.run_in_executor(self._executor, blocking, path, bridge, worker)
+                except ProcessingCancelled:
+                    # Darbinieks apstājās pats vai, ja nokavēja CANCEL_GRACE_SECONDS, to jau
+                    # nogalināja `SupervisedWorker.process` – abos gadījumos tas ir lietojams
+                    result = None
+                except asyncio.CancelledError:
+                    # Uzdevums atcelts (piem., patērētājs pārtrauca iterāciju)
+                    token.cancel()
+                    if worker is not None:
+                        worker.kill()
+                    raise
+                except Exception as e:
+                    await events.put(PipelineEvent("failed", path, str(e), "error"))
+                    return None
+                finally:
+                    if worker is not None:
+                        self._idle_workers.append(worker)
+
+                if result is None or token.cancelled:
+                    # Ar `save=True` rezultātā ir kataloga ieraksts ar statusu "cancelled"
+                    await events.put(PipelineEvent("cancelled", path, result=result))
+                    return None
+
+                kind = "finished" if result.ok else "failed"
+                await events.put(PipelineEvent(kind, path, result=result))
+                return result
+        finally:
+            # Žetons ir tikai gaidošiem un notiekošiem dokumentiem; tas pats ceļš var būt iesniegts vēlreiz
+            if self._cancel_flags.get(key) is token:
+                del self._cancel_flags[key]
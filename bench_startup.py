@@ -0,0 +1,140 @@
+"""bench_startup.py
+
+Starta laika etalons, kas neļauj importa laikam atkal pieaugt.
+
+Katrs modulis tiek importēts jaunā interpretatorā ar `python -X importtime`,
+un no izvades tiek nolasīts moduļa kumulatīvais importa laiks (labākais no
+vairākiem mēģinājumiem, pēc vienas iesildīšanas, lai netiktu mērīta `.pyc`
+kompilācija). Papildus tiek pārbaudīts, ka:
+
+* moduļa imports neievelk smagās atkarības (PyMuPDF, pdfplumber, pyarrow,
+  customtkinter), kuras drīkst ielādēt tikai pēc vajadzības;
+* importēšana neizveido mapes vai žurnāla failu (pārbaude notiek projekta
+  kopijā pagaidu mapē).
+
+Palaišana (izejas kods 1, ja kāds ierobežojums pārkāpts)::
+
+    python bench_startup.py
+    python bench_startup.py --scale 2   # lēnākam datoram
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+__all__ = [
+    "STARTUP_BUDGET_MS",
+    "measure_import",
+    "run_benchmark",
+]
+
+# Kumulatīvā importa laika budžets milisekundēs (izmērīts uz izstrādes datora
+# ar ~2x rezervi)
+STARTUP_BUDGET_MS: Dict[str, float] = {
+    "config": 40,
+    "legal_parser": 50,
+    "validator": 50,
+    "logging_setup": 60,
+    "alt_extractor": 60,
+    "catalog": 100,
+    "columnar_export": 100,
+    "supervisor": 130,
+    "main": 180,
+    "verify_last_file": 150,
+    "async_api": 180,
+    "parse_service": 220,
+}
+
+# Atkarības, kuras šie moduļi nedrīkst importēt jau importēšanas brīdī
+HEAVY_MODULES = ("fitz", "pdfplumber", "pyarrow", "customtkinter")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+PROJECT_DIR = Path(__file__).parent
+
+
+def _parse_importtime(stderr: str) -> Tuple[Dict[str, int], Set[str]]:
+    """Atgriež {modulis: kumulatīvais laiks µs} augstākā līmeņa ierakstiem un visu moduļu kopu."""
+    cumulative: Dict[str, int] = {}
+    imported: Set[str] = set()
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        imported.add(name)
+        cumulative[name] = int(match.group(2))
+    return cumulative, imported
+
+
+def measure_import(module: str, cwd: Path, runs: int = 5) -> Tuple[float, Set[str]]:
+    """Labākais kumulatīvais importa laiks (ms) un importēto moduļu kopa."""
+    best: Optional[float] = None
+    imported: Set[str] = set()
+    # Pirmā palaišana tikai iesilda `.pyc` kešu
+    for attempt in range(runs + 1):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=str(cwd), capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Neizdevās importēt '{module}':\n{proc.stderr[-2000:]}")
+        cumulative, imported = _parse_importtime(proc.stderr)
+        if attempt == 0:
+            continue
+        elapsed_ms = cumulative.get(module, 0) / 1000
+        best = elapsed_ms if best is None else min(best, elapsed_ms)
+    return best or 0.0, imported
+
+
+def _snapshot(directory: Path) -> Set[str]:
+    return {
+        str(p.relative_to(directory)) for p in directory.rglob("*")
+        if "__pycache__" not in p.parts
+    }
+
+
+def run_benchmark(modules: Optional[List[str]] = None, runs: int = 5, scale: float = 1.0) -> bool:
+    """Izmēra visus moduļus, izdrukā tabulu un atgriež True, ja budžets ievērots."""
+    modules = modules or list(STARTUP_BUDGET_MS)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for source in PROJECT_DIR.glob("*.py"):
+            shutil.copy2(source, workdir / source.name)
+
+        print(f"{'Modulis':<20} {'Laiks, ms':>10} {'Budžets':>10}  Statuss")
+        print("-" * 60)
+        for module in modules:
+            before = _snapshot(workdir)
+            elapsed_ms, imported = measure_import(module, workdir, runs)
+            created = _snapshot(workdir) - before
+            budget = STARTUP_BUDGET_MS.get(module, float("inf")) * scale
+            heavy = sorted(m for m in HEAVY_MODULES if m in imported)
+
+            problems = []
+            if elapsed_ms > budget:
+                problems.append("pārsniegts budžets")
+            if heavy:
+                problems.append(f"importē {', '.join(heavy)}")
+            if created:
+                problems.append(f"izveido {', '.join(sorted(created))}")
+            ok = ok and not problems
+            status = "OK" if not problems else "; ".join(problems)
+            print(f"{module:<20} {elapsed_ms:>10.1f} {budget:>10.0f}  {status}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Moduļu importa laika etalons")
+    parser.add_argument("modules", nargs="*", help="Moduļi (noklusējums: visi ar budžetu)")
+    parser.add_argument("--runs", type=int, default=5, help="Mēģinājumu skaits katram modulim")
+    parser.add_argument("--scale", type=float, default=1.0, help="Budžeta reizinātājs lēnākiem datoriem")
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.modules or None, args.runs, args.scale) else 1)
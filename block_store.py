@@ -0,0 +1,303 @@
+"""block_store.py
+
+Saspiesta, adresējama ierakstu izvade ar nobīžu indeksu.
+
+`processed_json` faili ir formatēti ar `indent=2` un, lai nolasītu kaut vienu
+pantu, tie jāparsē pilnībā. Šeit ieraksti tiek rakstīti kā JSON Lines
+fiksēta izmēra blokos (`block_entries` ierakstu), katrs bloks saspiests
+atsevišķi ar `gzip` vai `lzma` no standarta bibliotēkas. Bloki ir secīgi
+saspiesti posmi (gzip members / xz streams), tāpēc viss fails ir arī derīgs
+parasts `.jsonl.gz` / `.jsonl.xz` – to var lasīt ar `zcat` vai `gzip.open`.
+
+Blakus tiek saglabāts neliels indekss `<fails>.idx.json`::
+
+    {"codec": "gzip", "blocks": [[nobīde, garums, pirmais_ieraksts, skaits], ...],
+     "articles": {"18.pants.": [bloku numuri], ...}, ...}
+
+Viena panta nolasīšanai tiek atspiests tikai tas bloks (vai retos gadījumos
+divi), kurā pants atrodas; visa korpusa skenēšana lasa failu secīgi.
+
+Lietošana no komandrindas::
+
+    python block_store.py convert                 # processed_json -> processed_blocks
+    python block_store.py article Darba_likums 18
+    python block_store.py stats
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import lzma
+import os
+import re
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import path_config
+
+__all__ = [
+    "CODECS",
+    "BlockWriter",
+    "BlockReader",
+    "write_entries",
+    "convert_processed_json",
+]
+
+CODECS = {
+    "gzip": (".jsonl.gz", lambda data: gzip.compress(data, compresslevel=6, mtime=0), gzip.decompress, gzip.open),
+    "lzma": (".jsonl.xz", lambda data: lzma.compress(data, preset=6), lzma.decompress, lzma.open),
+}
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 1
+DEFAULT_BLOCK_ENTRIES = 128
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _codec(name: str):
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Nezināms saspiešanas veids: {name} (iespējams: {', '.join(CODECS)})") from None
+
+
+def article_key(article: Optional[str]) -> Optional[str]:
+    """"18. pants." / "18.pants." / "18" -> "18.pants."."""
+    if article is None:
+        return None
+    key = _WHITESPACE.sub("", str(article))
+    if key.isdigit():
+        key += ".pants."
+    return key
+
+
+def index_path_for(data_path: Path) -> Path:
+    return data_path.with_name(data_path.name + INDEX_SUFFIX)
+
+
+def output_path_for(safe_title: str, codec: str = "gzip") -> Path:
+    return path_config.block_dir / f"{safe_title}{_codec(codec)[0]}"
+
+
+# ------------------------------------------------------------
+#  Rakstīšana
+# ------------------------------------------------------------
+
+class BlockWriter:
+    """Raksta ierakstus saspiestos blokos pakāpeniski, apstrādes laikā.
+
+    Tāpat kā `ColumnarWriter`, dati vispirms tiek rakstīti pagaidu failā;
+    `commit` izraksta indeksu un pārdēvē failu uz gala nosaukumu, `abort`
+    pagaidu failu izdzēš.
+    """
+
+    def __init__(self, partial_path: str | Path, codec: str = "gzip",
+                 block_entries: int = DEFAULT_BLOCK_ENTRIES):
+        self.partial_path = Path(partial_path)
+        self.codec = codec
+        self._compress = _codec(codec)[1]
+        self.block_entries = max(1, block_entries)
+        self._buffer: List[bytes] = []
+        self._buffer_articles: Dict[str, None] = {}
+        self._file = None
+        self.blocks: List[List[int]] = []
+        self.articles: Dict[str, List[int]] = {}
+        self.law_title: Optional[str] = None
+        self.entries_written = 0
+        self.raw_bytes = 0
+
+    def write(self, entry: Dict[str, Any], page: Optional[int] = None):
+        """Pievieno vienu pabeigtu ierakstu (der kā `on_entry` callback)."""
+        if self.law_title is None:
+            self.law_title = entry.get("law_title")
+        self._buffer.append(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        key = article_key(entry.get("article"))
+        if key is not None:
+            self._buffer_articles[key] = None
+        if len(self._buffer) >= self.block_entries:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._file is None:
+            self.partial_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.partial_path, "wb")
+        raw = b"".join(self._buffer)
+        data = self._compress(raw)
+        block = len(self.blocks)
+        self.blocks.append([self._file.tell(), len(data), self.entries_written, len(self._buffer)])
+        self._file.write(data)
+        for key in self._buffer_articles:
+            self.articles.setdefault(key, []).append(block)
+        self.entries_written += len(self._buffer)
+        self.raw_bytes += len(raw)
+        self._buffer = []
+        self._buffer_articles = {}
+
+    def commit(self, final_path: str | Path) -> Path:
+        """Izraksta atlikušos blokus un indeksu, pārvieto failu uz `final_path`."""
+        final_path = Path(final_path)
+        self._flush()
+        if self._file is None:
+            self.partial_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.partial_path, "wb")
+        self._file.close()
+        self._file = None
+
+        index = {
+            "version": INDEX_VERSION,
+            "codec": self.codec,
+            "law_title": self.law_title,
+            "entry_count": self.entries_written,
+            "raw_bytes": self.raw_bytes,
+            "block_entries": self.block_entries,
+            "blocks": self.blocks,
+            "articles": self.articles,
+        }
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        index_tmp = index_path_for(self.partial_path)
+        with open(index_tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        # Dati pirms indeksa: lasītājs ar jaunu indeksu vienmēr atradīs atbilstošus datus
+        self.partial_path.replace(final_path)
+        index_tmp.replace(index_path_for(final_path))
+        return final_path
+
+    def abort(self):
+        """Pārtrauc rakstīšanu un izdzēš pagaidu failu."""
+        self._buffer = []
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+        for path in (self.partial_path, index_path_for(self.partial_path)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def write_entries(entries: List[Dict[str, Any]], output_path: str | Path, codec: str = "gzip",
+                  block_entries: int = DEFAULT_BLOCK_ENTRIES) -> Path:
+    """Ieraksta viena dokumenta ierakstus bloku failā."""
+    output_path = Path(output_path)
+    writer = BlockWriter(output_path.with_name(output_path.name + ".partial"), codec, block_entries)
+    try:
+        for entry in entries:
+            writer.write(entry)
+        return writer.commit(output_path)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def convert_processed_json(json_dir: Optional[str | Path] = None, output_dir: Optional[str | Path] = None,
+                           codec: str = "gzip", block_entries: int = DEFAULT_BLOCK_ENTRIES) -> List[Path]:
+    """Pārveido visus `processed_json` failus bloku formātā; atgriež izveidotos failus."""
+    json_dir = Path(json_dir) if json_dir else path_config.processed_json_dir
+    output_dir = Path(output_dir) if output_dir else path_config.block_dir
+    suffix = _codec(codec)[0]
+    written = []
+    for json_file in sorted(json_dir.glob("*.json")):
+        if json_file.name.endswith(".backup.json"):
+            continue
+        with open(json_file, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        if not isinstance(entries, list):
+            continue
+        written.append(write_entries(entries, output_dir / f"{json_file.stem}{suffix}", codec, block_entries))
+    return written
+
+
+# ------------------------------------------------------------
+#  Lasīšana
+# ------------------------------------------------------------
+
+class BlockReader:
+    """Lasa bloku failu: atsevišķus blokus pēc indeksa vai visu failu secīgi."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(index_path_for(self.path), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        if self.index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Neatbalstīta indeksa versija: {self.index.get('version')}")
+        self.codec = self.index["codec"]
+        self._decompress = _codec(self.codec)[2]
+        self.blocks: List[List[int]] = self.index["blocks"]
+        self._first_entries = [block[2] for block in self.blocks]
+        self.blocks_read = 0
+
+    @property
+    def law_title(self) -> Optional[str]:
+        return self.index.get("law_title")
+
+    def __len__(self) -> int:
+        return self.index["entry_count"]
+
+    def read_block(self, number: int) -> List[Dict[str, Any]]:
+        offset, size, _, _ = self.blocks[number]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size)
+        self.blocks_read += 1
+        return [json.loads(line) for line in self._decompress(data).splitlines()]
+
+    def entry(self, position: int) -> Dict[str, Any]:
+        """Ieraksts pēc tā pozīcijas dokumentā."""
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        number = bisect_right(self._first_entries, position) - 1
+        return self.read_block(number)[position - self._first_entries[number]]
+
+    def article(self, article: str) -> List[Dict[str, Any]]:
+        """Visi panta ieraksti; `article` var būt "18.pants.", "18. pants." vai "18"."""
+        key = article_key(article)
+        result = []
+        for number in self.index["articles"].get(key, []):
+            result.extend(entry for entry in self.read_block(number) if article_key(entry.get("article")) == key)
+        return result
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Visi ieraksti, atspiežot failu vienā secīgā plūsmā."""
+        opener = _codec(self.codec)[3]
+        with opener(self.path, "rb") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saspiesta, adresējama ierakstu izvade")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_convert = sub.add_parser("convert", help="Pārveidot processed_json failus")
+    p_convert.add_argument("--codec", choices=sorted(CODECS), default=path_config.block_codec)
+    p_convert.add_argument("--block-entries", type=int, default=path_config.block_entries)
+    p_article = sub.add_parser("article", help="Izdrukāt viena panta ierakstus")
+    p_article.add_argument("name", help="Faila nosaukums bez paplašinājuma")
+    p_article.add_argument("article", help="Panta numurs, piem., 18")
+    sub.add_parser("stats", help="Bloku failu izmēri")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for path in convert_processed_json(codec=args.codec, block_entries=args.block_entries):
+            print(path)
+    elif args.command == "article":
+        matches = [p for suffix, *_ in CODECS.values() for p in [path_config.block_dir / f"{args.name}{suffix}"] if p.exists()]
+        if not matches:
+            parser.error("Fails nav atrasts")
+        reader = BlockReader(matches[0])
+        for entry in reader.article(args.article):
+            print(json.dumps(entry, ensure_ascii=False))
+        print(f"Atspiesti bloki: {reader.blocks_read}/{len(reader.blocks)}")
+    else:
+        for path in sorted(p for suffix, *_ in CODECS.values() for p in path_config.block_dir.glob(f"*{suffix}")):
+            reader = BlockReader(path)
+            size = os.path.getsize(path)
+            raw = reader.index.get("raw_bytes") or 0
+            print(f"{path.name}: {len(reader)} ieraksti, {len(reader.blocks)} bloki, "
+                  f"{size / 1024:.0f} KB (JSONL {raw / 1024:.0f} KB)")
@@ -0,0 +1,108 @@
+"""cancellation.py
+
+Kooperatīva apstrādes atcelšana un pauze.
+
+`CancellationToken` tiek nodots `run_processing_for_list`, kas to pārbauda
+starp failiem, un `process_pdf_to_structured_data`, kas to pārbauda starp
+lapām. Pauzes laikā `check()` bloķē izsaucēja pavedienu, atcelšanas gadījumā
+izmet `ProcessingCancelled`. Tā kā uzraudzītais darbinieks ir atsevišķs
+process, `SupervisedWorker` žetona stāvokli pārraksta koplietotā vērtībā,
+ko apakšprocesā nolasa `SharedStateToken`.
+
+Daļēji apstrādātais fails paliek (vai tiek atgriezts) `input_dir` mapē,
+un nepabeigtā izvade tiek izdzēsta – nākamā palaišana to apstrādās no jauna.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+__all__ = [
+    "RUNNING",
+    "PAUSED",
+    "CANCELLED",
+    "ProcessingCancelled",
+    "CancellationToken",
+    "SharedStateToken",
+]
+
+RUNNING, PAUSED, CANCELLED = 0, 1, 2
+
+
+class ProcessingCancelled(BaseException):
+    """Apstrāde tika atcelta.
+
+    Tāpat kā `asyncio.CancelledError`, manto no `BaseException`, lai to
+    nenoķertu apstrādes koda vispārīgie `except Exception` bloki.
+    """
+
+
+class CancellationToken:
+    """Atcelšanas un pauzes stāvoklis, ko drīkst mainīt no jebkura pavediena."""
+
+    def __init__(self):
+        self._state = RUNNING
+        self._changed = threading.Condition()
+
+    @property
+    def state(self) -> int:
+        return self._state
+
+    @property
+    def cancelled(self) -> bool:
+        return self._state == CANCELLED
+
+    @property
+    def paused(self) -> bool:
+        return self._state == PAUSED
+
+    def _set(self, state: int):
+        with self._changed:
+            if self._state != CANCELLED:
+                self._state = state
+            self._changed.notify_all()
+
+    def cancel(self):
+        self._set(CANCELLED)
+
+    def pause(self):
+        self._set(PAUSED)
+
+    def resume(self):
+        self._set(RUNNING)
+
+    def proceed(self, timeout: Optional[float] = None) -> bool:
+        """Gaida, kamēr pauze beidzas; atgriež False, ja apstrāde atcelta."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._state != PAUSED, timeout)
+            return self._state != CANCELLED
+
+    def check(self):
+        """Pārbaudes punkts: gaida pauzes laikā, izmet `ProcessingCancelled`, ja atcelts."""
+        if self._state == RUNNING:
+            return
+        if not self.proceed():
+            raise ProcessingCancelled()
+
+
+class SharedStateToken:
+    """Žetons darbinieka procesā, kas nolasa `multiprocessing.Value` stāvokli."""
+
+    def __init__(self, value, poll_seconds: float = 0.1):
+        self._value = value
+        self.poll_seconds = poll_seconds
+
+    @property
+    def state(self) -> int:
+        return self._value.value
+
+    @property
+    def cancelled(self) -> bool:
+        return self.state == CANCELLED
+
+    def check(self):
+        while self.state == PAUSED:
+            time.sleep(self.poll_seconds)
+        if self.state == CANCELLED:
+            raise ProcessingCancelled()
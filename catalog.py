@@ -0,0 +1,271 @@
+"""catalog.py
+
+Apstrādāto dokumentu katalogs SQLite datubāzē.
+
+Katrs `run_processing_for_list` apstrādātais fails (gan veiksmīgs, gan
+kļūdains) tiek ierakstīts tabulā `documents`: avota ceļš un SHA-256,
+likuma nosaukums, izvades ceļi, lapu un ierakstu skaits, laiki un validācijas
+rezultāts. Tādējādi pārbaudes rīkam un GUI vairs nav jāskenē mapes un
+jāpaļaujas uz `sanitize_filename` nosaukumu konvenciju, lai atrastu, kurš
+PDF radīja kuru JSON.
+
+Savienojums tiek atvērts katrai operācijai atsevišķi, tāpēc katalogu var
+droši izmantot no GUI fona pavediena. Datubāze un shēma tiek izveidota tikai
+pirmajā piekļuves reizē.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import path_config
+
+__all__ = [
+    "ProcessingCatalog",
+    "catalog",
+    "file_sha256",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_path         TEXT NOT NULL,
+    source_name         TEXT NOT NULL,
+    source_sha256       TEXT,
+    law_title           TEXT,
+    safe_title          TEXT,
+    json_path           TEXT,
+    pdf_path            TEXT,
+    page_count          INTEGER,
+    entry_count         INTEGER,
+    started_at          REAL,
+    finished_at         REAL,
+    extract_seconds     REAL,
+    total_seconds       REAL,
+    status              TEXT NOT NULL,
+    validation_ok       INTEGER,
+    validation_messages TEXT,
+    error               TEXT,
+    metadata            TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_finished ON documents (status, finished_at);
+CREATE INDEX IF NOT EXISTS idx_documents_sha256 ON documents (source_sha256);
+CREATE INDEX IF NOT EXISTS idx_documents_law_title ON documents (law_title);
+CREATE INDEX IF NOT EXISTS idx_documents_source_name ON documents (source_name);
+"""
+
+_COLUMNS = (
+    "source_path", "source_name", "source_sha256", "law_title", "safe_title",
+    "json_path", "pdf_path", "page_count", "entry_count", "started_at",
+    "finished_at", "extract_seconds", "total_seconds", "status",
+    "validation_ok", "validation_messages", "error", "metadata",
+)
+_JSON_COLUMNS = ("validation_messages", "metadata")
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """Aprēķina faila SHA-256, lasot to pa daļām."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ProcessingCatalog:
+    """Plāns slānis virs `documents` tabulas."""
+
+    def __init__(self, db_path: Optional[str | Path] = None):
+        self._db_path = Path(db_path) if db_path else None
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> Path:
+        # Ceļu nolasām katru reizi no konfigurācijas, ja tas nav dots skaidri
+        return self._db_path or path_config.catalog_path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._schema_ready:
+                with self._lock:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        result = dict(row)
+        for column in _JSON_COLUMNS:
+            if result.get(column):
+                result[column] = json.loads(result[column])
+        return result
+
+    # ------------------------------------------------------------
+    #  Rakstīšana
+    # ------------------------------------------------------------
+
+    def record(self, document: Dict[str, Any]) -> int:
+        """Pievieno ierakstu par vienu apstrādes mēģinājumu, atgriež tā `id`."""
+        values = dict(document)
+        values.setdefault("source_name", Path(values["source_path"]).name)
+        if "validation_ok" in values and values["validation_ok"] is not None:
+            values["validation_ok"] = int(bool(values["validation_ok"]))
+        for column in _JSON_COLUMNS:
+            if values.get(column) is not None:
+                values[column] = json.dumps(values[column], ensure_ascii=False)
+
+        columns = [c for c in _COLUMNS if c in values]
+        placeholders = ", ".join("?" for _ in columns)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO documents ({', '.join(columns)}) VALUES ({placeholders})",
+                [values[c] for c in columns],
+            )
+            return cursor.lastrowid
+
+    def update_status(self, document_id: int, status: str):
+        """Maina ieraksta statusu (piem., kad fails nodots atkārtotai apstrādei)."""
+        with self._connect() as conn:
+            conn.execute("UPDATE documents SET status = ? WHERE id = ?", (status, document_id))
+
+    # ------------------------------------------------------------
+    #  Vaicājumi
+    # ------------------------------------------------------------
+
+    def latest(self, status: str = "ok") -> Optional[Dict[str, Any]]:
+        """Atgriež pēdējo pabeigto dokumentu ar norādīto statusu."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM documents WHERE status = ? ORDER BY finished_at DESC LIMIT 1",
+                (status,),
+            ).fetchone()
+        return self._row_to_dict(row)
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Atgriež pēdējos `limit` apstrādes mēģinājumus (jaunākie pirmie)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM documents ORDER BY finished_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_dict(r) for r in rows]
+
+    def find_by_hash(self, sha256: str) -> List[Dict[str, Any]]:
+        """Visi apstrādes mēģinājumi failam ar doto saturu."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM documents WHERE source_sha256 = ? ORDER BY finished_at DESC",
+                (sha256,),
+            ).fetchall()
+        return [self._row_to_dict(r) for r in rows]
+
+    def find_by_json_path(self, json_path: str | Path) -> Optional[Dict[str, Any]]:
+        """Pēdējais veiksmīgais ieraksts, kas radīja doto JSON failu."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM documents WHERE json_path = ? AND status = 'ok' "
+                "ORDER BY finished_at DESC LIMIT 1",
+                (str(json_path),),
+            ).fetchone()
+        return self._row_to_dict(row)
+
+    def history(self, law_title: str) -> List[Dict[str, Any]]:
+        """Visi viena likuma apstrādes mēģinājumi (jaunākie pirmie)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM documents WHERE law_title = ? ORDER BY finished_at DESC",
+                (law_title,),
+            ).fetchall()
+        return [self._row_to_dict(r) for r in rows]
+
+    def processed_source_names(self, names: List[str]) -> set[str]:
+        """No dotajiem failu nosaukumiem atgriež tos, kas jau veiksmīgi apstrādāti."""
+        if not names:
+            return set()
+        found: set[str] = set()
+        with self._connect() as conn:
+            # SQLite parametru limits – vaicājam pa daļām
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT DISTINCT source_name FROM documents WHERE status = 'ok' "
+                    f"AND source_name IN ({', '.join('?' for _ in chunk)})",
+                    chunk,
+                ).fetchall()
+                found.update(r["source_name"] for r in rows)
+        return found
+
+    def member_statuses(self, archive_name: str) -> Dict[str, Dict[Optional[str], str]]:
+        """Arhīva dalībnieku pēdējais statuss katram saturam: dalībnieks -> {source_sha256: statuss}.
+
+        `source_name` ir "<arhīvs>!<dalībnieks>"; atkārtoti piegādātā arhīvā ar
+        to pašu nosaukumu mainītam dalībniekam ir cits `source_sha256`.
+        """
+        prefix = f"{archive_name}!"
+        with self._connect() as conn:
+            # Diapazona vaicājums pēc prefiksa izmanto source_name indeksu
+            rows = conn.execute(
+                "SELECT source_name, source_sha256, status, metadata FROM documents "
+                "WHERE source_name >= ? AND source_name < ? ORDER BY id",
+                (prefix, f"{archive_name}\""),
+            ).fetchall()
+        statuses: Dict[str, Dict[Optional[str], str]] = {}
+        for r in rows:
+            key = r["source_sha256"]
+            if key is None and r["metadata"]:
+                # Nenolasītiem (pārāk lieliem) dalībniekiem nav sha256, tos atšķir `member_key`
+                key = json.loads(r["metadata"]).get("member_key")
+            statuses.setdefault(r["source_name"][len(prefix):], {})[key] = r["status"]
+        return statuses
+
+    def processing_times(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Pēdējās veiksmīgās apstrādes laiks un lapu skaits katram faila nosaukumam."""
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._connect() as conn:
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT source_name, page_count, total_seconds FROM documents WHERE status = 'ok' "
+                    f"AND source_name IN ({', '.join('?' for _ in chunk)}) ORDER BY finished_at",
+                    chunk,
+                ).fetchall()
+                # Vēlākie ieraksti pārraksta agrākos
+                result.update((r["source_name"], dict(r)) for r in rows)
+        return result
+
+    def recent_timings(self, limit: int = 200) -> List[tuple]:
+        """(lapu skaits, kopējais laiks) pēdējām veiksmīgajām apstrādēm – izmaksu modelim."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT page_count, total_seconds FROM documents WHERE status = 'ok' "
+                "AND page_count > 0 AND total_seconds IS NOT NULL ORDER BY finished_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(r["page_count"], r["total_seconds"]) for r in rows]
+
+    def summary(self) -> Dict[str, Any]:
+        """Kopsavilkums GUI: dokumentu skaits pa statusiem un pēdējais likums."""
+        with self._connect() as conn:
+            counts = {
+                row["status"]: row["n"]
+                for row in conn.execute("SELECT status, COUNT(*) AS n FROM documents GROUP BY status")
+            }
+        last = self.latest()
+        return {"counts": counts, "latest": last}
+
+
+catalog = ProcessingCatalog()
@@ -0,0 +1,247 @@
+"""columnar_export.py
+
+Strukturēto ierakstu eksports kolonnu formātā (Apache Parquet / Arrow).
+
+Lieliem korpusiem JSON sarakstu parsēšana ir dārgākā ielādes daļa, tāpēc
+šeit ieraksti no `process_pdf_to_structured_data` tiek pārvērsti Parquet
+failos, kur `law_title` un `article` kolonnas ir vārdnīcas kodētas (tās
+atkārtojas gandrīz katrā rindā).
+
+Modulis atbalsta trīs darba režīmus:
+
+* `convert_processed_json` – esošās `processed_json` mapes pārveide vienā failā;
+* `ColumnarWriter` – ierakstu rakstīšana jau apstrādes laikā (write-through);
+* `read_entries` – lasīšana ar kolonnu projekciju un filtriem pēc likuma/panta.
+
+`pyarrow` ir neobligāta atkarība un tiek importēta tikai pirmajā lietošanas
+reizē – bez tās modulis importējas, bet funkcijas izmet `ImportError` ar
+skaidru paziņojumu.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from config import path_config
+
+# pyarrow importēšana aizņem ~0,1s, tāpēc to darām tikai, kad eksports tiešām vajadzīgs
+pa = None
+pq = None
+
+__all__ = [
+    "ENTRY_COLUMNS",
+    "ColumnarWriter",
+    "entries_to_table",
+    "write_entries",
+    "convert_processed_json",
+    "read_entries",
+]
+
+ENTRY_COLUMNS = ["law_title", "article", "point", "subpoint", "content", "page_start", "page_end"]
+
+# Ierakstu skaits vienā row group; lasītājs filtrē veselas row grupas,
+# tāpēc tās nedrīkst būt pārāk lielas.
+DEFAULT_ROW_GROUP_SIZE = 5000
+
+
+def _require_pyarrow():
+    global pa, pq
+    if pa is not None:
+        return
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Kolonnu eksportam nepieciešams 'pyarrow' (pip install pyarrow)."
+        ) from None
+    pa, pq = pyarrow, pyarrow.parquet
+
+
+def _schema():
+    _require_pyarrow()
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("law_title", dict_string),
+        ("article", dict_string),
+        ("point", pa.string()),
+        ("subpoint", pa.string()),
+        ("content", pa.string()),
+        ("page_start", pa.int32()),
+        ("page_end", pa.int32()),
+    ])
+
+
+# ------------------------------------------------------------
+#  Rakstīšana
+# ------------------------------------------------------------
+
+def entries_to_table(entries: Sequence[Dict[str, Any]]):
+    """Pārvērš ierakstu sarakstu par `pyarrow.Table` ar vārdnīcas kolonnām."""
+    schema = _schema()
+    columns = {name: [entry.get(name) for entry in entries] for name in ENTRY_COLUMNS}
+    arrays = [
+        pa.array(columns[field.name], type=pa.string()).dictionary_encode()
+        if pa.types.is_dictionary(field.type)
+        else pa.array(columns[field.name], type=field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _open_parquet_writer(path: Path):
+    _require_pyarrow()
+    return pq.ParquetWriter(
+        str(path),
+        _schema(),
+        compression="zstd",
+        use_dictionary=["law_title", "article"],
+    )
+
+
+def write_entries(entries: Sequence[Dict[str, Any]], output_path: str | Path) -> Path:
+    """Ieraksta viena dokumenta ierakstus Parquet failā."""
+    _require_pyarrow()
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = _open_parquet_writer(output_path)
+    try:
+        writer.write_table(entries_to_table(entries), row_group_size=DEFAULT_ROW_GROUP_SIZE)
+    finally:
+        writer.close()
+    return output_path
+
+
+class ColumnarWriter:
+    """Raksta ierakstus Parquet failā pakāpeniski, apstrādes laikā.
+
+    Ieraksti tiek buferēti un izrakstīti pa row grupām pagaidu failā.
+    `commit` pārdēvē pagaidu failu uz gala nosaukumu (kas parasti kļūst
+    zināms tikai pēc likuma nosaukuma atrašanas), `abort` to izdzēš.
+    """
+
+    def __init__(self, partial_path: str | Path, row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        _require_pyarrow()
+        self.partial_path = Path(partial_path)
+        self.row_group_size = row_group_size
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+        self.rows_written = 0
+
+    def write(self, entry: Dict[str, Any], page: Optional[int] = None):
+        """Pievieno vienu pabeigtu ierakstu (der kā `on_entry` callback)."""
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self.partial_path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = _open_parquet_writer(self.partial_path)
+        self._writer.write_table(entries_to_table(self._buffer))
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def commit(self, final_path: str | Path) -> Path:
+        """Izraksta atlikušos ierakstus un pārvieto failu uz `final_path`."""
+        final_path = Path(final_path)
+        if self._writer is None and not self._buffer:
+            # Tukšs dokuments – tomēr izveidojam derīgu failu ar shēmu
+            self._writer = _open_parquet_writer(self.partial_path)
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        self.partial_path.replace(final_path)
+        return final_path
+
+    def abort(self):
+        """Pārtrauc rakstīšanu un izdzēš pagaidu failu."""
+        self._buffer = []
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+        try:
+            self.partial_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ------------------------------------------------------------
+#  Esošo JSON failu pārveide
+# ------------------------------------------------------------
+
+def convert_processed_json(
+    json_dir: Optional[str | Path] = None,
+    output_path: Optional[str | Path] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> int:
+    """Pārveido visus `processed_json` failus vienā Parquet failā.
+
+    Faili tiek lasīti pa vienam, tāpēc atmiņā vienlaikus atrodas tikai viena
+    likuma ieraksti. Katrs likums sākas jaunā row grupā, lai filtrēšana pēc
+    `law_title` varētu izlaist veselas grupas. Atgriež ierakstīto rindu skaitu.
+    """
+    _require_pyarrow()
+    json_dir = Path(json_dir) if json_dir else path_config.processed_json_dir
+    output_path = Path(output_path) if output_path else path_config.parquet_dir / "all_laws.parquet"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    writer = _open_parquet_writer(output_path)
+    try:
+        for json_file in sorted(json_dir.glob("*.json")):
+            if json_file.name.endswith(".backup.json"):
+                continue
+            with open(json_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if not isinstance(entries, list) or not entries:
+                continue
+            writer.write_table(entries_to_table(entries), row_group_size=row_group_size)
+            rows += len(entries)
+    finally:
+        writer.close()
+    return rows
+
+
+# ------------------------------------------------------------
+#  Lasīšana
+# ------------------------------------------------------------
+
+def _in_filter(column: str, values: Optional[str | Iterable[str]]):
+    if values is None:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    return (column, "in", list(values))
+
+
+def read_entries(
+    source: str | Path,
+    columns: Optional[Sequence[str]] = None,
+    law_title: Optional[str | Iterable[str]] = None,
+    article: Optional[str | Iterable[str]] = None,
+    as_table: bool = False,
+):
+    """Nolasa ierakstus no Parquet faila vai mapes.
+
+    `columns` ierobežo nolasītās kolonnas, bet `law_title`/`article` filtri
+    tiek nodoti pyarrow, kas izlaiž row grupas pēc statistikas un neatbilstošās
+    rindas atmet jau lasīšanas laikā. Pēc noklusējuma atgriež vārdnīcu sarakstu
+    tādā pašā formā kā JSON faili; ar `as_table=True` – `pyarrow.Table`.
+    """
+    _require_pyarrow()
+    filters = [f for f in (_in_filter("law_title", law_title), _in_filter("article", article)) if f]
+    table = pq.read_table(
+        str(source),
+        columns=list(columns) if columns else None,
+        filters=filters or None,
+    )
+    if as_table:
+        return table
+    return table.to_pylist()
@@ -11,14 +11,54 @@ class PathConfig:
         self.processed_pdfs_dir = self.base_dir / "processed_pdfs"
         self.error_dir = self.base_dir / "error_pdfs"
         self.log_file = self.base_dir / "processing.log"
+        self.parquet_dir = self.base_dir / "processed_parquet"
+        self.catalog_path = self.base_dir / "catalog.sqlite3"
+        self.entry_store_path = self.base_dir / "entry_store.sqlite3"
+        self.near_duplicate_index_path = self.base_dir / "near_duplicates.npz"
+        self.versions_dir = self.base_dir / "output_versions"  # Immutable output versions (hardlinked objects)
+        self.block_dir = self.base_dir / "processed_blocks"  # Compressed JSON Lines blocks + offset index
+        self.cross_ref_dir = self.base_dir / "processed_refs"  # Cross-reference graph per law (<title>.refs.json)
+        self.page_report_dir = self.base_dir / "processed_pages"  # Per-page extraction outcomes (<title>.pages.json)
+        self.processed_archives_dir = self.base_dir / "processed_archives"  # ZIP/TAR bundles whose members are all done
+        self.lease_dir = self.input_dir / ".leases"  # Job leases, on the same (shared) volume as input_pdfs
         
         # Processing configuration
         self.max_file_size_mb = 100  # Maximum PDF file size in MB
         self.processing_timeout = 300  # Timeout in seconds
+        self.worker_memory_limit_mb = 2048  # Address-space limit of a worker process (POSIX only)
+        self.worker_max_jobs = 50  # Recycle the worker process after this many documents
         self.content_similarity_threshold = 0.95  # For verification
         # Feature flags
         self.use_pdfplumber_fallback: bool = True  # Enable dual extraction
         self.max_concurrent_files = 3  # Maximum files to process simultaneously
+        self.schedule_shortest_first: bool = True  # Order batches by estimated cost (shortest job first)
+        self.schedule_priorities = {}  # Filename glob -> priority; higher runs first, e.g. {"*Darba*": 10}
+        self.export_parquet: bool = False  # Write-through Parquet export (requires pyarrow)
+        self.export_blocks: bool = False  # Write-through compressed JSONL blocks with an article offset index
+        self.block_codec = "gzip"  # "gzip" or "lzma"
+        self.block_entries = 128  # Entries per independently compressed block
+        self.use_entry_store: bool = False  # Also keep every version in the deduplicated entry store
+        self.versioned_output: bool = True  # Keep every run as a version; processed_json/processed_pdfs show the current one
+        self.output_keep_versions = 5  # Older versions are deleted (0 keeps all)
+        self.build_cross_references: bool = True  # Precompute the article cross-reference graph after saving JSON
+        self.page_retry_strategies = ["pymupdf_text", "pymupdf_sorted", "pymupdf_blocks_noclip", "pdfplumber"]  # Tried in order by page_retry.py
+        self.use_supervised_workers: bool = True  # Process each PDF in a supervised subprocess
+        self.retry_fitz_only: bool = True  # Retry timed-out/crashed files once without pdfplumber
+        self.adaptive_extraction: bool = False  # Sample pages and skip pdfplumber when PyMuPDF alone is good enough
+        self.adaptive_sample_pages = 3  # Body pages sampled per document
+        self.adaptive_quality_target = 0.9  # Required share of the best sampled parse yield
+        self.header_footer_mode = "learned"  # "learned" (repeating header/footer detection) or "fixed" (50pt margin)
+        self.header_footer_sample_pages = 8  # Pages sampled to learn the header/footer template
+        self.header_footer_min_pages = 3  # Shorter documents use the fixed margin
+        self.bounded_memory: bool = True  # Extract pdfplumber text on demand, keep only a sliding window of pages
+        self.page_window = 8  # Pages kept in memory in bounded-memory mode
+        self.use_job_queue: bool = False  # main() claims files through leases, so several hosts can share input_pdfs
+        self.job_lease_seconds = 900  # A lease without a heartbeat for this long is reclaimed by another worker
+        self.job_heartbeat_seconds = 30  # How often a worker renews the lease of the file it processes
+        self.job_max_attempts = 3  # Files whose workers died this many times are moved to error_pdfs
+        # Logging
+        self.log_level = "INFO"  # DEBUG also writes every parsed line to the log
+        self.log_json: bool = False  # Write the log file as JSON Lines
 
     def setup_directories(self):
         """Izveido visas nepieciešamās mapes, ja tās neeksistē."""
@@ -0,0 +1,320 @@
+"""cross_references.py
+
+Iepriekš aprēķināts atsauču grafs starp viena likuma ierakstiem.
+
+Likuma teksts pastāvīgi atsaucas uz citiem pantiem ("šā likuma 5. pantā",
+"šā panta otrās daļas 3. punktā", "(3) daļā"). Šeit pēc apstrādes katra
+ieraksta saturā tiek atrastas atsauces, tās tiek atrisinātas pret
+`process_pdf_to_structured_data` ierakstu atslēgām (pants, punkts,
+apakšpunkts), un rezultāts tiek saglabāts kompaktā blakusvirsotņu indeksā
+(CSR: `offsets` + `targets` gan izejošajām, gan ienākošajām atsaucēm).
+Kaimiņu izvēršana atgūšanas slānī tad ir saraksta šķēle, nevis teksta skenēšana.
+
+Atsauce tiek atrisināta līdz dziļākajam esošajam ierakstam: ja norādītā
+daļa vai punkts nav atrasts, tiek izmantots pants. Atsauces uz citiem
+normatīvajiem aktiem (regulām, direktīvām, citu likumu pantiem, pārejas
+noteikumiem) tiek izlaistas.
+
+Lietošana no komandrindas::
+
+    python cross_references.py build                       # visiem processed_json failiem
+    python cross_references.py show Darba_likums 18 --point 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import path_config
+
+__all__ = [
+    "CrossReferenceIndex",
+    "extract_references",
+]
+
+# Kārtas skaitļa vārdi daļām ("otrajā daļā", "trešās daļas")
+_ORDINALS = {
+    "pirm": 1, "otr": 2, "treš": 3, "ceturt": 4, "piekt": 5, "sest": 6, "septīt": 7,
+    "astot": 8, "devīt": 9, "desmit": 10, "vienpadsmit": 11, "divpadsmit": 12,
+    "trīspadsmit": 13, "četrpadsmit": 14, "piecpadsmit": 15, "sešpadsmit": 16,
+    "septiņpadsmit": 17, "astoņpadsmit": 18, "deviņpadsmit": 19, "divdesmit": 20,
+}
+_ORDINAL = "(?:" + "|".join(sorted(_ORDINALS, key=len, reverse=True)) + r")\w*"
+_LIST_SEP = r"\s*(?:,|un|vai|līdz)\s*"
+
+_TOKEN = re.compile(
+    "|".join([
+        r"(?P<this_law>\bšā\s+likuma\b)",
+        r"(?P<this_article>\bšā\s+panta\b)",
+        # Citi normatīvie akti – atsauces līdz teikuma beigām netiek atrisinātas
+        r"(?P<external>\b(?:likuma|likumā|regul\w*|direktīv\w*|kodeks\w*|noteikumu|noteikumos|konvencij\w*|nolikum\w*)\b)",
+        # Nominatīvs "N. pants." ir panta virsraksts, nevis atsauce
+        rf"(?P<articles>(?<![\d.])(?:\d{{1,3}}\.{_LIST_SEP})*\d{{1,3}}\.?\s*[¹²³⁴⁵⁶⁷⁸⁹]*\s*pant(?:a|ā|u|am|os|iem|us)\b)",
+        rf"(?P<parts>(?:(?:{_ORDINAL}|\(\d{{1,3}}\)){_LIST_SEP})*(?:{_ORDINAL}|\(\d{{1,3}}\))\s+daļ\w*)",
+        rf"(?P<points>(?:\d{{1,2}}\.{_LIST_SEP})*\d{{1,2}}\.\s*punkt\w*)",
+        r"(?P<sentence>[;]|\.\s+(?=[A-ZĀČĒĢĪĶĻŅŠŪŽ]))",
+    ]),
+    re.IGNORECASE,
+)
+_NUMBER = re.compile(r"\d+")
+_ARTICLE_NUMBER = re.compile(r"(\d{1,3})\.?\s*([¹²³⁴⁵⁶⁷⁸⁹]*)")
+
+Reference = Tuple[str, Optional[str], Optional[str]]  # (panta numurs, daļa, punkts)
+
+
+def _article_number(article: Optional[str]) -> Optional[str]:
+    """"18.pants." / "18. pants." / "7.¹ pants." -> "18" / "7¹"."""
+    if not article:
+        return None
+    match = _ARTICLE_NUMBER.match(article)
+    return match.group(1) + match.group(2) if match else None
+
+
+def _ordinal_numbers(text: str) -> List[str]:
+    numbers = _NUMBER.findall(text.split("daļ")[0])
+    if numbers:
+        return numbers
+    words = re.findall(_ORDINAL, text, re.IGNORECASE)
+    result = []
+    for word in words:
+        word = word.lower()
+        for stem in sorted(_ORDINALS, key=len, reverse=True):
+            if word.startswith(stem):
+                result.append(str(_ORDINALS[stem]))
+                break
+    return result
+
+
+def extract_references(content: str, own_article: Optional[str], own_point: Optional[str] = None) -> List[Reference]:
+    """Atsauces ieraksta tekstā kā (panta numurs, daļa, punkts).
+
+    `own_article`/`own_point` ir ieraksta paša atslēga – tiem piesaista
+    "šā panta ..." un daļas vai punkta atsauces bez panta.
+    """
+    own = _article_number(own_article)
+    refs: Dict[Reference, None] = {}
+    external = False
+    current: List[Reference] = []  # pēdējā teikuma daļā minētās atsauces, kuras var precizēt
+
+    for match in _TOKEN.finditer(content or ""):
+        kind = match.lastgroup
+        text = match.group(0)
+        if kind == "sentence":
+            external = False
+            current = []
+        elif kind == "this_law":
+            external = False
+            current = []
+        elif kind == "external":
+            external = True
+            current = []
+        elif kind == "this_article":
+            external = False
+            current = [(own, None, None)] if own else []
+            refs.update(dict.fromkeys(current))
+        elif external:
+            continue
+        elif kind == "articles":
+            numbers = [m.group(1) + m.group(2) for m in _ARTICLE_NUMBER.finditer(text)]
+            current = [(number, None, None) for number in numbers]
+            refs.update(dict.fromkeys(current))
+        elif kind == "parts":
+            parts = _ordinal_numbers(text)
+            base = [r for r in current if r[1] is None][-1:] or ([(own, None, None)] if own else [])
+            for ref in base:
+                refs.pop(ref, None)  # precizēta atsauce aizstāj visu pantu
+            current = [(article, part, None) for article, _, _ in base for part in parts]
+            refs.update(dict.fromkeys(current))
+        elif kind == "points":
+            points = _NUMBER.findall(text)
+            if current:
+                article, part, _ = current[-1]
+                if current[-1][2] is None:
+                    refs.pop(current[-1], None)
+            elif own:
+                article, part = own, own_point
+            else:
+                continue
+            current = [(article, part, point) for point in points]
+            refs.update(dict.fromkeys(current))
+    return list(refs)
+
+
+class CrossReferenceIndex:
+    """Viena likuma atsauču grafs; virsotnes ir ierakstu pozīcijas JSON failā."""
+
+    def __init__(self, law_title: str, keys: List[List[Optional[str]]],
+                 out_offsets: List[int], out_targets: List[int], unresolved: int = 0):
+        self.law_title = law_title
+        self.keys = keys
+        self.out_offsets = out_offsets
+        self.out_targets = out_targets
+        self.unresolved = unresolved
+        self.in_offsets, self.in_targets = self._transpose()
+        self._positions: Dict[Tuple[Optional[str], ...], int] = {}
+        for position, key in enumerate(keys):
+            self._positions.setdefault(tuple(key), position)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.out_targets)
+
+    def _transpose(self) -> Tuple[List[int], List[int]]:
+        counts = [0] * (len(self.keys) + 1)
+        for target in self.out_targets:
+            counts[target + 1] += 1
+        for i in range(len(self.keys)):
+            counts[i + 1] += counts[i]
+        fill = counts[:-1].copy()
+        targets = [0] * len(self.out_targets)
+        for source in range(len(self.keys)):
+            for target in self.out_targets[self.out_offsets[source]:self.out_offsets[source + 1]]:
+                targets[fill[target]] = source
+                fill[target] += 1
+        return counts, targets
+
+    # ------------------------------------------------------------
+    #  Veidošana
+    # ------------------------------------------------------------
+
+    @classmethod
+    def from_entries(cls, law_title: str, entries: Sequence[Dict[str, Any]]) -> "CrossReferenceIndex":
+        keys = [[entry.get("article"), entry.get("point"), entry.get("subpoint")] for entry in entries]
+        by_number: Dict[Tuple[Optional[str], ...], int] = {}
+        for position, (article, point, subpoint) in enumerate(keys):
+            by_number.setdefault((_article_number(article), point, subpoint), position)
+
+        def resolve(ref: Reference) -> Optional[int]:
+            article, part, point = ref
+            candidates = [(article, part, point), (article, part, None)]
+            if part is None and point is not None:
+                # Bez "(n)" daļām parseris "n)" saglabā kā punktu
+                candidates.insert(1, (article, point, None))
+            candidates.append((article, None, None))
+            for candidate in candidates:
+                if candidate in by_number:
+                    return by_number[candidate]
+            return None
+
+        offsets = [0]
+        targets: List[int] = []
+        unresolved = 0
+        for position, entry in enumerate(entries):
+            found = []
+            for ref in extract_references(entry.get("content") or "", entry.get("article"), entry.get("point")):
+                target = resolve(ref)
+                if target is None:
+                    unresolved += 1
+                elif target != position and target not in found:
+                    found.append(target)
+            targets.extend(found)
+            offsets.append(len(targets))
+        return cls(law_title, keys, offsets, targets, unresolved)
+
+    # ------------------------------------------------------------
+    #  Vaicājumi
+    # ------------------------------------------------------------
+
+    def position(self, article: str, point: Optional[str] = None, subpoint: Optional[str] = None) -> Optional[int]:
+        """Ieraksta pozīcija pēc atslēgas; `article` var būt arī tikai numurs ("18")."""
+        position = self._positions.get((article, point, subpoint))
+        if position is None:
+            number = _article_number(article)
+            for key, pos in self._positions.items():
+                if _article_number(key[0]) == number and key[1] == point and key[2] == subpoint:
+                    self._positions[(article, point, subpoint)] = pos
+                    return pos
+        return position
+
+    def references(self, position: int) -> List[int]:
+        """Ieraksti, uz kuriem atsaucas `position`."""
+        return self.out_targets[self.out_offsets[position]:self.out_offsets[position + 1]]
+
+    def referenced_by(self, position: int) -> List[int]:
+        """Ieraksti, kas atsaucas uz `position`."""
+        return self.in_targets[self.in_offsets[position]:self.in_offsets[position + 1]]
+
+    def neighbors(self, positions: Iterable[int], hops: int = 1, incoming: bool = True) -> List[int]:
+        """Ieraksti `hops` soļu attālumā (bez pašiem `positions`), atklāšanas secībā."""
+        seen = dict.fromkeys(positions)
+        frontier = list(seen)
+        result: List[int] = []
+        for _ in range(hops):
+            next_frontier = []
+            for position in frontier:
+                linked = self.references(position) + (self.referenced_by(position) if incoming else [])
+                for target in linked:
+                    if target not in seen:
+                        seen[target] = None
+                        result.append(target)
+                        next_frontier.append(target)
+            frontier = next_frontier
+        return result
+
+    # ------------------------------------------------------------
+    #  Saglabāšana
+    # ------------------------------------------------------------
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "law_title": self.law_title,
+                "keys": self.keys,
+                "out_offsets": self.out_offsets,
+                "out_targets": self.out_targets,
+                "unresolved": self.unresolved,
+            }, f, ensure_ascii=False, separators=(",", ":"))
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "CrossReferenceIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["law_title"], data["keys"], data["out_offsets"], data["out_targets"], data.get("unresolved", 0))
+
+
+def refs_path_for(safe_title: str) -> Path:
+    return path_config.cross_ref_dir / f"{safe_title}.refs.json"
+
+
+def _describe(key: List[Optional[str]]) -> str:
+    article, point, subpoint = key
+    return " ".join(p for p in (article, f"({point})" if point else None, f"{subpoint})" if subpoint else None) if p)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atsauču grafs starp likuma pantiem")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Izveidot indeksus processed_json failiem")
+    p_build.add_argument("json_dir", type=Path, nargs="?", default=path_config.processed_json_dir)
+    p_show = sub.add_parser("show", help="Parādīt ieraksta atsauces")
+    p_show.add_argument("name", help="JSON faila nosaukums bez paplašinājuma")
+    p_show.add_argument("article", help="Panta numurs, piem., 18")
+    p_show.add_argument("--point")
+    p_show.add_argument("--subpoint")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        for json_file in sorted(args.json_dir.glob("*.json")):
+            if json_file.name.endswith(".backup.json"):
+                continue
+            with open(json_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if not isinstance(entries, list) or not entries:
+                continue
+            index = CrossReferenceIndex.from_entries(entries[0].get("law_title") or json_file.stem, entries)
+            index.save(refs_path_for(json_file.stem))
+            print(f"{json_file.stem}: {index.edge_count} atsauces, {index.unresolved} neatrisinātas")
+    else:
+        index = CrossReferenceIndex.load(refs_path_for(args.name))
+        position = index.position(args.article, args.point, args.subpoint)
+        if position is None:
+            parser.error("Ieraksts nav atrasts")
+        print(f"{_describe(index.keys[position])}")
+        for label, positions in (("Atsaucas uz", index.references(position)),
+                                 ("Uz to atsaucas", index.referenced_by(position))):
+            print(f"  {label}: " + (", ".join(_describe(index.keys[p]) for p in positions) or "-"))
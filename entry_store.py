@@ -0,0 +1,265 @@
+"""entry_store.py
+
+Satura adresēta ierakstu glabātuve visām likumu versijām.
+
+Secīgas viena likuma konsolidētās versijas lielākoties satur tos pašus
+pantus vārds vārdā, tāpēc atsevišķos JSON failos viens un tas pats `content`
+teksts tiek glabāts daudzas reizes. Šeit katra ieraksta saturs (NFC
+normalizēts) tiek glabāts tikai vienu reizi pēc tā SHA-256 (`objects`
+tabula), bet katrai versijai ir manifests – ierakstu secība ar struktūras
+laukiem un atsauci uz saturu (`manifest` tabula). Līdzšinējais plakanais
+formāts (ierakstu saraksts) tiek atjaunots pēc pieprasījuma.
+
+Lietošana no komandrindas::
+
+    python entry_store.py import processed_json   # esošo JSON failu imports
+    python entry_store.py list                    # versiju saraksts
+    python entry_store.py export 12 likums.json   # versijas atjaunošana
+    python entry_store.py stats                   # ietaupījums
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from config import path_config
+
+__all__ = [
+    "EntryStore",
+    "content_hash",
+    "entry_store",
+]
+
+# Lauki, kas tiek glabāti manifestā; pārējie ieraksta lauki nonāk `extra` JSON
+_STRUCTURE_FIELDS = ("article", "point", "subpoint")
+
+# 128 biti ir pietiekami pret sadursmēm un uz pusi samazina indeksu
+_HASH_BYTES = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash    BLOB PRIMARY KEY,
+    content TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS versions (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    law_title       TEXT NOT NULL,
+    source_name     TEXT,
+    source_sha256   TEXT,
+    manifest_sha256 TEXT NOT NULL,
+    entry_count     INTEGER NOT NULL,
+    created_at      REAL NOT NULL,
+    UNIQUE (law_title, manifest_sha256)
+);
+CREATE TABLE IF NOT EXISTS manifest (
+    version_id INTEGER NOT NULL REFERENCES versions (id),
+    position   INTEGER NOT NULL,
+    article    TEXT,
+    point      TEXT,
+    subpoint   TEXT,
+    hash       BLOB NOT NULL,
+    extra      TEXT,
+    PRIMARY KEY (version_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_versions_law_title ON versions (law_title, created_at);
+"""
+
+
+def _normalize(content: str) -> str:
+    return unicodedata.normalize("NFC", content or "")
+
+
+def content_hash(content: str) -> bytes:
+    """Satura atslēga: pirmie 16 baiti no normalizēta satura SHA-256."""
+    return hashlib.sha256(_normalize(content).encode("utf-8")).digest()[:_HASH_BYTES]
+
+
+class EntryStore:
+    """Versiju manifesti un deduplicēts ierakstu saturs vienā SQLite failā."""
+
+    def __init__(self, db_path: Optional[str | Path] = None):
+        self._db_path = Path(db_path) if db_path else None
+        self._schema_ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path or path_config.entry_store_path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            if not self._schema_ready:
+                with self._lock:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------
+    #  Rakstīšana
+    # ------------------------------------------------------------
+
+    def add_version(self, law_title: str, entries: List[Dict[str, Any]],
+                    source_name: Optional[str] = None, source_sha256: Optional[str] = None) -> int:
+        """Saglabā versiju un atgriež tās `id`.
+
+        Ja šim likumam jau ir versija ar identisku manifestu, tiek atgriezts
+        esošās versijas `id` un nekas netiek rakstīts.
+        """
+        objects: Dict[bytes, str] = {}
+        rows = []
+        manifest_digest = hashlib.sha256()
+        for position, entry in enumerate(entries):
+            content = _normalize(entry.get("content"))
+            digest = content_hash(content)
+            objects[digest] = content
+            extra = {k: v for k, v in entry.items()
+                     if k not in _STRUCTURE_FIELDS and k not in ("law_title", "content")}
+            extra_json = json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else None
+            row = (position, entry.get("article"), entry.get("point"), entry.get("subpoint"), digest, extra_json)
+            rows.append(row)
+            manifest_digest.update(json.dumps([*row[1:4], digest.hex(), extra_json], ensure_ascii=False).encode("utf-8"))
+        manifest_sha256 = manifest_digest.hexdigest()
+
+        with self._connect() as conn:
+            existing = conn.execute(
+                "SELECT id FROM versions WHERE law_title = ? AND manifest_sha256 = ?",
+                (law_title, manifest_sha256),
+            ).fetchone()
+            if existing:
+                return existing["id"]
+            conn.executemany("INSERT OR IGNORE INTO objects (hash, content) VALUES (?, ?)", objects.items())
+            version_id = conn.execute(
+                "INSERT INTO versions (law_title, source_name, source_sha256, manifest_sha256, entry_count, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (law_title, source_name, source_sha256, manifest_sha256, len(rows), time.time()),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO manifest (version_id, position, article, point, subpoint, hash, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(version_id, *row) for row in rows],
+            )
+        return version_id
+
+    # ------------------------------------------------------------
+    #  Lasīšana
+    # ------------------------------------------------------------
+
+    def iter_entries(self, version_id: int) -> Iterator[Dict[str, Any]]:
+        """Atjauno versijas ierakstus plakanajā formātā (pa vienam)."""
+        with self._connect() as conn:
+            version = conn.execute("SELECT law_title FROM versions WHERE id = ?", (version_id,)).fetchone()
+            if version is None:
+                raise KeyError(f"Versija {version_id} nav atrasta")
+            law_title = version["law_title"]
+            cursor = conn.execute(
+                "SELECT m.article, m.point, m.subpoint, m.extra, o.content FROM manifest m "
+                "JOIN objects o ON o.hash = m.hash WHERE m.version_id = ? ORDER BY m.position",
+                (version_id,),
+            )
+            for row in cursor:
+                entry = {
+                    "law_title": law_title,
+                    "article": row["article"],
+                    "point": row["point"],
+                    "subpoint": row["subpoint"],
+                    "content": row["content"],
+                }
+                if row["extra"]:
+                    entry.update(json.loads(row["extra"]))
+                yield entry
+
+    def read_version(self, version_id: int) -> List[Dict[str, Any]]:
+        return list(self.iter_entries(version_id))
+
+    def versions(self, law_title: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Versiju saraksts (jaunākās pirmās), pēc izvēles viena likuma."""
+        query = "SELECT * FROM versions"
+        params: tuple = ()
+        if law_title:
+            query += " WHERE law_title = ?"
+            params = (law_title,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY created_at DESC, id DESC", params).fetchall()
+        return [dict(r) for r in rows]
+
+    def latest_version(self, law_title: str) -> Optional[int]:
+        versions = self.versions(law_title)
+        return versions[0]["id"] if versions else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Unikālo un loģisko (visu versiju kopā) satura baitu salīdzinājums."""
+        with self._connect() as conn:
+            unique = conn.execute(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0) AS bytes FROM objects"
+            ).fetchone()
+            logical = conn.execute(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(LENGTH(CAST(o.content AS BLOB))), 0) AS bytes "
+                "FROM manifest m JOIN objects o ON o.hash = m.hash"
+            ).fetchone()
+            versions = conn.execute("SELECT COUNT(*) AS n FROM versions").fetchone()["n"]
+        return {
+            "versions": versions,
+            "entries": logical["n"],
+            "unique_contents": unique["n"],
+            "content_bytes": logical["bytes"],
+            "stored_content_bytes": unique["bytes"],
+            "dedup_ratio": round(logical["bytes"] / unique["bytes"], 2) if unique["bytes"] else None,
+        }
+
+    def import_json_files(self, paths: Iterable[Path]) -> List[int]:
+        """Importē esošus plakanā formāta JSON failus (arī `.backup.json`)."""
+        version_ids = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if not entries:
+                continue
+            law_title = entries[0].get("law_title") or path.stem
+            version_ids.append(self.add_version(law_title, entries, source_name=path.name))
+        return version_ids
+
+
+entry_store = EntryStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicētā ierakstu glabātuve")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Importēt JSON failus no mapes")
+    p_import.add_argument("json_dir", type=Path, nargs="?", default=path_config.processed_json_dir)
+    p_list = sub.add_parser("list", help="Versiju saraksts")
+    p_list.add_argument("law_title", nargs="?")
+    p_export = sub.add_parser("export", help="Atjaunot versiju plakanā JSON formātā")
+    p_export.add_argument("version_id", type=int)
+    p_export.add_argument("output", type=Path)
+    sub.add_parser("stats", help="Glabātuves statistika")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        ids = entry_store.import_json_files(sorted(args.json_dir.glob("*.json")))
+        print(f"Importētas {len(ids)} versijas ({len(set(ids))} unikālas)")
+    elif args.command == "list":
+        for version in entry_store.versions(args.law_title):
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(version["created_at"]))
+            print(f"{version['id']:>5}  {created}  {version['entry_count']:>5} ier.  {version['law_title']}")
+    elif args.command == "export":
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(entry_store.read_version(args.version_id), f, ensure_ascii=False, indent=2)
+        print(f"Versija {args.version_id} saglabāta: {args.output}")
+    elif args.command == "stats":
+        print(json.dumps(entry_store.stats(), ensure_ascii=False, indent=2))
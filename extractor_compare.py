@@ -0,0 +1,323 @@
+"""extractor_compare.py
+
+Teksta ekstrakcijas stratēģiju salīdzināšana pa lapām.
+
+Apstrādē tiek izmantoti divi ekstraktori – PyMuPDF (`get_text("blocks",
+clip=...)`) un pdfplumber (`extract_text()`), bet nav datu, kurš ir ātrāks
+vai labāks kurās lapās. Šis rīks katrai korpusa lapai palaiž visas
+reģistrētās stratēģijas un pieraksta laiku, rakstzīmju un rindu skaitu un
+iznākumu (rindas, kuras parseris atpazītu kā pantu/punktu/apakšpunktu, skat.
+`legal_parser.count_structural_lines`). Katras stratēģijas teksts tiek
+salīdzināts ar atskaites stratēģiju; atšķirīgajām lapām tiek saglabāts
+diff fails. Kopsavilkuma tabula parāda, kuru stratēģiju izvēlēties pēc tā
+paša noteikuma, ko izmanto `extractor_selection`.
+
+Jaunu stratēģiju pievieno ar `register_strategy`; funkcija saņem
+`PageContext` un atgriež lapas tekstu.
+
+Lietošana no komandrindas::
+
+    python extractor_compare.py processed_pdfs/ --out extractor_report
+    python extractor_compare.py likums.pdf --strategies pymupdf_blocks,pdfplumber
+"""
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import fitz  # PyMuPDF
+
+from alt_extractor import release_page, text_similarity
+from config import path_config
+from extractor_selection import pick_extractor, relative_yields
+from layout_template import get_template
+from legal_parser import count_structural_lines
+
+__all__ = [
+    "STRATEGIES",
+    "PageContext",
+    "PageResult",
+    "compare_corpus",
+    "register_strategy",
+    "summarize",
+]
+
+# Lapa tiek uzskatīta par atšķirīgu, ja teksta līdzība ar atskaiti ir zemāka
+SIMILARITY_THRESHOLD = 0.9
+# Cita stratēģija tiek ieteikta atskaites vietā tikai, ja tā ir vismaz tik daudz ātrāka
+MIN_SAVING_MS_PER_PAGE = 1.0
+
+_SPACES = re.compile(r"\s+")
+
+
+# ------------------------------------------------------------
+#  Stratēģijas
+# ------------------------------------------------------------
+
+class PageContext:
+    """Vienas lapas avoti stratēģijām: PyMuPDF lapa, pamatteksta apgabals un pdfplumber lapa."""
+
+    def __init__(self, fitz_page, clip, plumber_doc_factory: Callable[[], Any]):
+        self.fitz_page = fitz_page
+        self.clip = clip
+        self._plumber_doc_factory = plumber_doc_factory
+
+    def plumber_page(self):
+        doc = self._plumber_doc_factory()
+        return doc.pages[self.fitz_page.number] if doc is not None else None
+
+
+STRATEGIES: Dict[str, Callable[[PageContext], str]] = {}
+
+
+def register_strategy(name: str):
+    """Dekorators, kas pievieno stratēģiju `STRATEGIES` reģistram."""
+    def decorator(func: Callable[[PageContext], str]):
+        STRATEGIES[name] = func
+        return func
+    return decorator
+
+
+@register_strategy("pymupdf_blocks")
+def _pymupdf_blocks(ctx: PageContext) -> str:
+    # Tieši tā, kā `process_pdf_to_structured_data`
+    return "\n".join(b[4] for b in ctx.fitz_page.get_text("blocks", clip=ctx.clip) if len(b) >= 5)
+
+
+@register_strategy("pymupdf_text")
+def _pymupdf_text(ctx: PageContext) -> str:
+    return ctx.fitz_page.get_text("text", clip=ctx.clip)
+
+
+@register_strategy("pymupdf_sorted")
+def _pymupdf_sorted(ctx: PageContext) -> str:
+    return ctx.fitz_page.get_text("text", clip=ctx.clip, sort=True)
+
+
+@register_strategy("pymupdf_blocks_noclip")
+def _pymupdf_blocks_noclip(ctx: PageContext) -> str:
+    # Visa lapa – ja pamatteksta apgabals kļūdaini nogriež saturu
+    return "\n".join(b[4] for b in ctx.fitz_page.get_text("blocks") if len(b) >= 5)
+
+
+@register_strategy("pdfplumber")
+def _pdfplumber(ctx: PageContext) -> str:
+    # Tāpat kā fallback: visa lapa, bez galvenes/kājenes izgriešanas
+    page = ctx.plumber_page()
+    if page is None:
+        return ""
+    text = page.extract_text() or ""
+    release_page(page)
+    return text
+
+
+# ------------------------------------------------------------
+#  Mērīšana
+# ------------------------------------------------------------
+
+@dataclass
+class PageResult:
+    """Vienas stratēģijas rezultāts vienā lapā."""
+
+    document: str
+    page: int  # 1-bāzēts
+    strategy: str
+    seconds: float
+    chars: int
+    lines: int
+    structural_lines: int
+    similarity: Optional[float] = None  # pret atskaites stratēģiju
+    differs: Optional[bool] = None  # zema līdzība vai cits strukturālo rindu skaits
+    error: Optional[str] = None
+
+
+def _normalize(text: str) -> str:
+    lines = (_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _write_diff(diff_dir: Path, document: Path, page: int, strategy: str, reference: str,
+                reference_text: str, text: str):
+    diff = difflib.unified_diff(
+        reference_text.split("\n"), text.split("\n"),
+        fromfile=f"{document.name}:{page}:{reference}", tofile=f"{document.name}:{page}:{strategy}",
+        lineterm="",
+    )
+    diff_dir.mkdir(parents=True, exist_ok=True)
+    (diff_dir / f"{document.stem}_p{page:05d}_{strategy}.diff").write_text("\n".join(diff) + "\n", encoding="utf-8")
+
+
+def compare_document(pdf_path: Path, strategies: List[str], reference: str,
+                     diff_dir: Optional[Path] = None, max_pages: Optional[int] = None) -> Iterator[PageResult]:
+    """Palaiž stratēģijas katrai dokumenta lapai un atgriež rezultātus pa vienam."""
+    plumber_doc = None
+    plumber_failed = False
+
+    def open_plumber():
+        nonlocal plumber_doc, plumber_failed
+        if plumber_doc is None and not plumber_failed:
+            try:
+                import pdfplumber
+
+                plumber_doc = pdfplumber.open(str(pdf_path))
+            except Exception:
+                plumber_failed = True
+        return plumber_doc
+
+    doc = fitz.open(str(pdf_path))
+    try:
+        template = get_template(doc)
+        page_count = min(len(doc), max_pages) if max_pages else len(doc)
+        for index in range(page_count):
+            page = doc.load_page(index)
+            ctx = PageContext(page, template.clip_for(page), open_plumber)
+            texts: Dict[str, str] = {}
+            results: Dict[str, PageResult] = {}
+            for name in strategies:
+                error = None
+                start = time.perf_counter()
+                try:
+                    text = STRATEGIES[name](ctx)
+                except Exception as e:
+                    text, error = "", f"{type(e).__name__}: {e}"
+                seconds = time.perf_counter() - start
+                structural, lines = count_structural_lines(text)
+                texts[name] = _normalize(text)
+                results[name] = PageResult(pdf_path.name, index + 1, name, round(seconds, 6),
+                                           len(text), lines, structural, error=error)
+            reference_text = texts.get(reference, "")
+            for name, result in results.items():
+                if name != reference and reference in texts:
+                    result.similarity = round(text_similarity(reference_text, texts[name]), 4)
+                    result.differs = (result.similarity < SIMILARITY_THRESHOLD
+                                      or result.structural_lines != results[reference].structural_lines)
+                    if diff_dir is not None and result.differs and (reference_text or texts[name]):
+                        _write_diff(diff_dir, pdf_path, index + 1, name, reference, reference_text, texts[name])
+                yield result
+    finally:
+        doc.close()
+        if plumber_doc is not None:
+            plumber_doc.close()
+
+
+def compare_corpus(paths: Iterable[Path], strategies: Optional[List[str]] = None,
+                   reference: str = "pymupdf_blocks", out_dir: Optional[Path] = None,
+                   max_pages: Optional[int] = None) -> List[PageResult]:
+    """Salīdzina stratēģijas visos PDF failos.
+
+    Ja norādīts `out_dir`, tur tiek rakstīts `pages.jsonl` (viena rinda katrai
+    lapai un stratēģijai), `summary.json` un `diffs/` ar atšķirīgajām lapām.
+    """
+    strategies = strategies or list(STRATEGIES)
+    unknown = [name for name in strategies + [reference] if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Nezināma stratēģija: {', '.join(unknown)}")
+    if reference not in strategies:
+        strategies = [reference] + strategies
+
+    results: List[PageResult] = []
+    pages_file = None
+    diff_dir = out_dir / "diffs" if out_dir else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        pages_file = open(out_dir / "pages.jsonl", "w", encoding="utf-8")
+    try:
+        for pdf_path in paths:
+            for result in compare_document(pdf_path, strategies, reference, diff_dir, max_pages):
+                results.append(result)
+                if pages_file:
+                    pages_file.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+    finally:
+        if pages_file:
+            pages_file.close()
+    if out_dir:
+        with open(out_dir / "summary.json", "w", encoding="utf-8") as f:
+            json.dump(summarize(results, reference=reference), f, ensure_ascii=False, indent=2)
+    return results
+
+
+# ------------------------------------------------------------
+#  Kopsavilkums
+# ------------------------------------------------------------
+
+def summarize(results: List[PageResult], quality_target: Optional[float] = None,
+              reference: str = "pymupdf_blocks") -> Dict[str, Any]:
+    """Kopsavilkums pa stratēģijām un ieteicamā stratēģija.
+
+    Iznākums ir strukturālo rindu skaits attiecībā pret labāko stratēģiju.
+    Ieteikums: lētākā stratēģija, kuras iznākums sasniedz `quality_target`
+    (pēc noklusējuma `adaptive_quality_target`); atskaites stratēģija paliek
+    ieteiktā, ja lētākā ir ātrāka mazāk nekā par `MIN_SAVING_MS_PER_PAGE`.
+    """
+    quality_target = path_config.adaptive_quality_target if quality_target is None else quality_target
+    strategies: Dict[str, Dict[str, Any]] = {}
+    for r in results:
+        s = strategies.setdefault(r.strategy, {
+            "pages": 0, "seconds": 0.0, "chars": 0, "lines": 0, "structural_lines": 0,
+            "errors": 0, "pages_differing": 0, "_similarity": [],
+        })
+        s["pages"] += 1
+        s["seconds"] += r.seconds
+        s["chars"] += r.chars
+        s["lines"] += r.lines
+        s["structural_lines"] += r.structural_lines
+        s["errors"] += bool(r.error)
+        if r.similarity is not None:
+            s["_similarity"].append(r.similarity)
+            s["pages_differing"] += bool(r.differs)
+
+    for s in strategies.values():
+        similarity = s.pop("_similarity")
+        s["seconds"] = round(s["seconds"], 4)
+        s["ms_per_page"] = round(1000 * s["seconds"] / s["pages"], 3) if s["pages"] else 0.0
+        s["mean_similarity"] = round(sum(similarity) / len(similarity), 4) if similarity else None
+    relative_yields(strategies)
+
+    recommended = None
+    if strategies:
+        pages = strategies[reference]["pages"] if reference in strategies else 0
+        recommended = pick_extractor(strategies, quality_target, preferred=reference,
+                                     min_saving=pages * MIN_SAVING_MS_PER_PAGE / 1000)
+    return {"strategies": strategies, "quality_target": quality_target, "recommended": recommended}
+
+
+def format_table(summary: Dict[str, Any]) -> str:
+    header = f"{'stratēģija':<16} {'lapas':>6} {'ms/lapa':>9} {'rakstz.':>10} {'rindas':>8} {'struktūra':>10} {'iznākums':>9} {'līdzība':>8} {'atšķ.':>6}"
+    rows = [header, "-" * len(header)]
+    for name, s in sorted(summary["strategies"].items(), key=lambda item: item[1]["ms_per_page"]):
+        similarity = f"{s['mean_similarity']:.3f}" if s["mean_similarity"] is not None else "atsk."
+        rows.append(f"{name:<16} {s['pages']:>6} {s['ms_per_page']:>9.2f} {s['chars']:>10} {s['lines']:>8} "
+                    f"{s['structural_lines']:>10} {s['yield']:>9.3f} {similarity:>8} {s['pages_differing']:>6}")
+    rows.append(f"Ieteicamā: {summary['recommended'] or '-'} (iznākums >= {summary['quality_target']:.0%} no labākā)")
+    return "\n".join(rows)
+
+
+def _collect_pdfs(paths: List[Path]) -> List[Path]:
+    pdfs = []
+    for path in paths:
+        pdfs.extend(sorted(path.glob("*.pdf")) if path.is_dir() else [path])
+    return pdfs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ekstrakcijas stratēģiju salīdzināšana pa lapām")
+    parser.add_argument("paths", type=Path, nargs="*", help="PDF faili vai mapes (pēc noklusējuma processed_pdfs)")
+    parser.add_argument("--strategies", help=f"Komatiem atdalīts saraksts no: {', '.join(STRATEGIES)}")
+    parser.add_argument("--reference", default="pymupdf_blocks")
+    parser.add_argument("--out", type=Path, default=path_config.base_dir / "extractor_report")
+    parser.add_argument("--max-pages", type=int, help="Lapu skaita ierobežojums katram dokumentam")
+    args = parser.parse_args()
+
+    pdfs = _collect_pdfs(args.paths or [path_config.processed_pdfs_dir])
+    if not pdfs:
+        parser.error("Nav atrasts neviens PDF fails")
+    strategies = args.strategies.split(",") if args.strategies else None
+    results = compare_corpus(pdfs, strategies, args.reference, args.out, args.max_pages)
+    print(format_table(summarize(results, reference=args.reference)))
+    print(f"Rezultāti: {args.out}")
@@ -0,0 +1,156 @@
+"""extractor_selection.py
+
+Adaptīva teksta ekstraktora izvēle katram dokumentam.
+
+Ja ieslēgts `use_pdfplumber_fallback`, pdfplumber tiek palaists visām lapām,
+lai gan lielākajai daļai likumu PyMuPDF teksts ir pilnīgi pietiekams. Ar
+`path_config.adaptive_extraction` dokumentam tiek izvēlēts viens no režīmiem:
+
+* ``"pymupdf"`` – tikai PyMuPDF (pdfplumber netiek atvērts vispār);
+* ``"pdfplumber"`` – līdzšinējā dubultā ekstrakcija (PyMuPDF + pdfplumber
+  lapām, kurās PyMuPDF neatrada ierakstus).
+
+Izvēle: no dažām satura lapām abi ekstraktori iegūst tekstu, tiek mērīts
+laiks un iznākums – atpazīto pantu/punktu/apakšpunktu rindu skaits (skat.
+`legal_parser.count_structural_lines`) attiecībā pret labāko ekstraktoru.
+Tiek izvēlēts lētākais ekstraktors, kura iznākums sasniedz
+`adaptive_quality_target`. Strukturālo rindu daļa no visām rindām netiek
+izmantota, jo tā sodītu ekstraktorus, kas atgriež arī galveni un kājeni. Lēmums
+tiek saglabāts apstrādes statistikā (kataloga `metadata.extractor`) un
+nākamajām tā paša likuma versijām tiek izmantots atkārtoti bez paraugu
+ņemšanas.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from alt_extractor import get_page_texts
+from config import path_config
+from layout_template import LayoutTemplate
+from legal_parser import count_structural_lines
+
+__all__ = [
+    "EXTRACTORS",
+    "choose_extractor",
+    "pick_extractor",
+    "relative_yields",
+    "sample_page_indices",
+]
+
+# Ekstraktoru nosaukumi, kas tiek saglabāti metadatos
+EXTRACTORS = ("pymupdf", "pdfplumber")
+
+# ------------------------------------------------------------
+#  Paraugu ņemšana
+# ------------------------------------------------------------
+
+def sample_page_indices(page_count: int, samples: int) -> List[int]:
+    """Vienmērīgi izkliedētas satura lapas (pirmā lapa ar nosaukumu tiek izlaista)."""
+    body = list(range(1, page_count)) or list(range(page_count))
+    if samples <= 0 or len(body) <= samples:
+        return body
+    step = len(body) / samples
+    return [body[int(step * k + step / 2)] for k in range(samples)]
+
+
+def _pymupdf_text(doc, index: int, template: LayoutTemplate) -> str:
+    # Tāds pats pamatteksta apgabals kā `process_pdf_to_structured_data`
+    page = doc[index]
+    clip = template.clip_for(page)
+    return "\n".join(block[4] for block in page.get_text("blocks", clip=clip) if len(block) >= 5)
+
+
+def _measure(extract: Callable[[], List[str]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        texts = extract()
+    except Exception:
+        texts = []
+    seconds = time.perf_counter() - start
+    structural = lines = 0
+    for text in texts:
+        s, n = count_structural_lines(text)
+        structural += s
+        lines += n
+    return {
+        "seconds": round(seconds, 4),
+        "structural_lines": structural,
+        "lines": lines,
+    }
+
+
+def relative_yields(measurements: Dict[str, Dict[str, Any]]):
+    """Iestata katram mērījumam `yield` – strukturālās rindas attiecībā pret labāko."""
+    best = max((m["structural_lines"] for m in measurements.values()), default=0)
+    for m in measurements.values():
+        m["yield"] = round(m["structural_lines"] / best, 4) if best else 0.0
+
+
+def pick_extractor(measurements: Dict[str, Dict[str, Any]], quality_target: float,
+                   preferred: Optional[str] = None, min_saving: float = 0.0) -> Optional[str]:
+    """Lētākais ekstraktors, kura strukturālo rindu skaits ir >= quality_target * labākā.
+
+    `preferred` tiek izvēlēts arī tad, ja lētākais to apsteidz ne vairāk kā
+    par `min_saving` sekundēm – lai laika mērījumu troksnis neizšķir izvēli.
+    """
+    best = max(m["structural_lines"] for m in measurements.values())
+    if best <= 0:
+        return None
+    by_cost = sorted(measurements, key=lambda name: measurements[name]["seconds"])
+    qualifying = [name for name in by_cost if measurements[name]["structural_lines"] >= quality_target * best]
+    choice = qualifying[0]
+    if (preferred in qualifying
+            and measurements[preferred]["seconds"] - measurements[choice]["seconds"] <= min_saving):
+        return preferred
+    return choice
+
+
+# ------------------------------------------------------------
+#  Lēmums
+# ------------------------------------------------------------
+
+def _previous_decision(law_title: str) -> Optional[Tuple[str, int]]:
+    """Pēdējais izmērītais lēmums šim likumam no kataloga, ja tāds ir."""
+    from catalog import catalog
+
+    try:
+        history = catalog.history(law_title)
+    except Exception:
+        return None
+    for record in history:
+        decision = (record.get("metadata") or {}).get("extractor")
+        if (record.get("status") == "ok" and decision and decision.get("extractor") in EXTRACTORS
+                and decision.get("source") != "default"):
+            return decision["extractor"], record["id"]
+    return None
+
+
+def choose_extractor(doc, pdf_path: str | bytes, law_title: Optional[str],
+                     template: LayoutTemplate) -> Dict[str, Any]:
+    """Izvēlas ekstraktoru dokumentam un atgriež lēmumu kā vārdnīcu.
+
+    Atslēgas: ``extractor`` (viens no `EXTRACTORS`), ``source``
+    ("history" | "sampled" | "default") un, ja tika ņemti paraugi,
+    ``sample_pages`` (1-bāzēti) un ``measurements``.
+    """
+    if law_title and law_title != "Nezinams_likums":
+        previous = _previous_decision(law_title)
+        if previous:
+            extractor, record_id = previous
+            return {"extractor": extractor, "source": "history", "reused_from": record_id}
+
+    indices = sample_page_indices(len(doc), path_config.adaptive_sample_pages)
+    measurements = {
+        "pymupdf": _measure(lambda: [_pymupdf_text(doc, i, template) for i in indices]),
+        "pdfplumber": _measure(lambda: get_page_texts(pdf_path, indices)),
+    }
+    relative_yields(measurements)
+    extractor = pick_extractor(measurements, path_config.adaptive_quality_target)
+    return {
+        # Ja neviens ekstraktors paraugā neko neatpazina, paliekam pie dubultās ekstrakcijas
+        "extractor": extractor or "pdfplumber",
+        "source": "sampled" if extractor else "default",
+        "sample_pages": [i + 1 for i in indices],
+        "measurements": measurements,
+    }
@@ -7,16 +7,16 @@ import threading
 import os
 import time
 from pathlib import Path
-from main import run_processing_for_list
 from config import path_config
+from catalog import catalog
+from cancellation import CancellationToken
+from progress import PROGRESS_TAG, STAGE_LABELS, ThroughputTracker
 from queue import Queue, Empty
-import fitz
-
-ctk.set_appearance_mode("System")
-ctk.set_default_color_theme("blue")
 
 class App(ctk.CTk):
     def __init__(self):
+        ctk.set_appearance_mode("System")
+        ctk.set_default_color_theme("blue")
         super().__init__()
 
         self.title("Likumu Datu Apstrādes Rīks v3.1")
@@ -79,6 +79,27 @@ class App(ctk.CTk):
             height=40
         )
         self.button_start.grid(row=0, column=0, padx=20, pady=10, sticky="ew")
+        # Pause/resume and cancel for the running batch
+        self.button_pause = ctk.CTkButton(
+            self.frame_bottom,
+            text="⏸️ Pauze",
+            command=self.toggle_pause,
+            state="disabled",
+            width=110,
+            height=40
+        )
+        self.button_pause.grid(row=0, column=1, padx=(0, 10), pady=10)
+        self.button_cancel = ctk.CTkButton(
+            self.frame_bottom,
+            text="⏹️ Atcelt",
+            command=self.cancel_processing,
+            state="disabled",
+            width=110,
+            height=40,
+            fg_color="#cc3333",
+            hover_color="#992222"
+        )
+        self.button_cancel.grid(row=0, column=2, padx=(0, 20), pady=10)
         # Checkbox for pdfplumber fallback
         self.var_plumber = ctk.BooleanVar(value=path_config.use_pdfplumber_fallback)
         self.checkbox_plumber = ctk.CTkCheckBox(
@@ -89,7 +110,7 @@ class App(ctk.CTk):
             offvalue=False,
             command=self.toggle_plumber,
         )
-        self.checkbox_plumber.grid(row=0, column=1, padx=(0, 20), pady=10)
+        self.checkbox_plumber.grid(row=0, column=3, padx=(0, 20), pady=10)
 
         # Progress frame
         self.frame_progress = ctk.CTkFrame(self.frame_bottom)
@@ -101,15 +122,22 @@ class App(ctk.CTk):
         self.progressbar.set(0)
 
         self.label_progress = ctk.CTkLabel(self.frame_progress, text="", fg_color="transparent")
-        self.label_progress.grid(row=1, column=0, padx=10, pady=(0, 10))
+        self.label_progress.grid(row=1, column=0, padx=10, pady=(0, 2))
+
+        # Live throughput of the current file
+        self.label_throughput = ctk.CTkLabel(self.frame_progress, text="", fg_color="transparent",
+                                             text_color=("gray30", "gray70"))
+        self.label_throughput.grid(row=2, column=0, padx=10, pady=(0, 10))
 
         # Initialize variables
         self.selected_paths = []
         self.log_queue = Queue()
         self.total_pages = 0
-        self.pages_processed = 0
+        self.tracker = ThroughputTracker()
+        self.last_progress_refresh = 0.0
         self.is_processing = False
         self.start_time = None
+        self.cancel_token = None
 
         # Initial welcome message
         self.show_welcome_message()
@@ -131,12 +159,31 @@ class App(ctk.CTk):
 ⚙️ IESTATĪJUMI:
 • Maksimālais faila izmērs: {max_size}MB
 • Apstrādes timeout: {timeout}s
+• Atmiņas limits vienam failam: {memory_limit}MB
 
+{catalog_info}
 Izvēlieties failus, lai sāktu...
-""".format(max_size=path_config.max_file_size_mb, timeout=path_config.processing_timeout)
+""".format(max_size=path_config.max_file_size_mb, timeout=path_config.processing_timeout,
+           memory_limit=path_config.worker_memory_limit_mb,
+           catalog_info=self.get_catalog_info())
         
         self.clear_and_log(welcome_text, 'meta')
 
+    def get_catalog_info(self) -> str:
+        """Short summary of previously processed documents from the catalog."""
+        try:
+            summary = catalog.summary()
+        except Exception:
+            return ""
+        counts = summary["counts"]
+        if not counts:
+            return ""
+        info = f"🗂️ KATALOGS:\n• Apstrādāti: {counts.get('ok', 0)} • Kļūdaini: {counts.get('error', 0)}\n"
+        latest = summary["latest"]
+        if latest:
+            info += f"• Pēdējais: {latest['law_title']} ({latest['entry_count']} ieraksti)\n"
+        return info
+
     def select_file(self):
         """Select single PDF file with validation."""
         try:
@@ -196,6 +243,12 @@ Izvēlieties failus, lai sāktu...
                 self.update_status(status_msg)
                 
                 log_msg = f"✅ Atlasīta mape: {folderpath}\n✓ Derīgi faili: {len(valid_files)}\n"
+                try:
+                    already_processed = catalog.processed_source_names([p.name for p in valid_files])
+                except Exception:
+                    already_processed = set()
+                if already_processed:
+                    log_msg += f"ℹ️ Jau apstrādāti iepriekš (pēc kataloga): {len(already_processed)}\n"
                 if invalid_files:
                     log_msg += f"⚠️ Nederīgi faili ({len(invalid_files)}):\n"
                     for name, reason in invalid_files[:5]:  # Show first 5
@@ -252,21 +305,8 @@ Izvēlieties failus, lai sāktu...
                 try:
                     message, tag = self.log_queue.get_nowait()
                     
-                    if tag == "progress_update":
-                        self.pages_processed += 1
-                        if self.total_pages > 0:
-                            progress = min(self.pages_processed / self.total_pages, 1.0)
-                            self.progressbar.set(progress)
-                            
-                            # Update progress label
-                            if self.start_time:
-                                elapsed = time.time() - self.start_time
-                                if progress > 0:
-                                    eta = (elapsed / progress) * (1 - progress)
-                                    self.label_progress.configure(
-                                        text=f"Progress: {self.pages_processed}/{self.total_pages} lpp. "
-                                             f"({progress*100:.1f}%) • ETA: {eta:.0f}s"
-                                    )
+                    if tag == PROGRESS_TAG:
+                        self.tracker.update(message)
                     else:
                         self.log_message(message, tag)
                     
@@ -275,14 +315,49 @@ Izvēlieties failus, lai sāktu...
                 except Empty:
                     break
                     
+            # Labels are refreshed a few times per second, not on every event
+            if time.time() - self.last_progress_refresh >= 0.25:
+                self.refresh_progress()
+                    
         except Exception:
             pass  # Ignore errors during shutdown
         finally:
             if self.is_processing:
                 self.after(30, self.process_log_queue)  # Faster updates
 
+    def refresh_progress(self):
+        """Show overall progress, rate-based ETA and the current file's throughput."""
+        self.last_progress_refresh = time.time()
+        tracker = self.tracker
+        if tracker.total_pages <= 0:
+            return
+        progress = tracker.progress()
+        self.progressbar.set(progress)
+
+        eta = tracker.eta_seconds()
+        eta_text = f"{eta:.0f}s" if eta is not None else "–"
+        self.label_progress.configure(
+            text=f"Progress: {tracker.pages_done}/{tracker.total_pages} lpp. ({progress*100:.1f}%) • "
+                 f"{tracker.pages_per_second():.1f} lpp/s • ETA: {eta_text}"
+        )
+
+        current = tracker.current
+        parts = []
+        if current:
+            now = time.time()
+            parts.append(f"📄 {current.name}: {current.pages_per_second(now):.1f} lpp/s • "
+                         f"{current.entries_per_second(now):.0f} ier./s")
+            stages = " • ".join(f"{STAGE_LABELS.get(stage, stage)} {seconds:.1f}s"
+                                for stage, seconds in current.stages.items())
+            if stages:
+                parts.append(stages)
+        parts.append(f"Darbinieki: {len(tracker.files)}/{tracker.workers} ({tracker.utilization()*100:.0f}% noslodze)")
+        self.label_throughput.configure(text="  |  ".join(parts))
+
     def calculate_total_pages(self) -> int:
         """Calculate total pages in all selected files."""
+        import fitz  # loaded on first use so the window opens sooner
+
         total = 0
         failed_files = []
         
@@ -314,8 +389,9 @@ Izvēlieties failus, lai sāktu...
             self.update_status("Aprēķina kopējo lapu skaitu...")
             self.clear_and_log("🔍 Aprēķina kopējo lapu skaitu...\n", 'meta')
             
-            self.pages_processed = 0
             self.total_pages = self.calculate_total_pages()
+            # Files are processed one after another by run_processing_for_list
+            self.tracker = ThroughputTracker(self.total_pages, workers=1)
             
             if self.total_pages == 0:
                 self.update_status("Kļūda: Nav derīgu failu apstrādei", True)
@@ -329,6 +405,11 @@ Izvēlieties failus, lai sāktu...
             self.progressbar.set(0)
             self.label_progress.configure(text="Sāk apstrādi...")
             
+            # Pause/Cancel act on this token between files and pages
+            self.cancel_token = CancellationToken()
+            self.button_pause.configure(state="normal", text="⏸️ Pauze")
+            self.button_cancel.configure(state="normal")
+
             # Start processing thread
             processing_thread = threading.Thread(target=self.processing_worker, daemon=True)
             processing_thread.start()
@@ -340,27 +421,79 @@ Izvēlieties failus, lai sāktu...
             messagebox.showerror("Kļūda", f"Neizdevās sākt apstrādi: {e}")
             self.reset_ui()
 
+    def toggle_pause(self):
+        """Pause or resume the batch at the next page boundary."""
+        token = self.cancel_token
+        if token is None or token.cancelled:
+            return
+        if token.paused:
+            token.resume()
+            self.button_pause.configure(text="⏸️ Pauze")
+            self.update_status("Apstrāde turpinās...")
+        else:
+            token.pause()
+            self.button_pause.configure(text="▶️ Turpināt")
+            self.update_status("Apstrāde pauzēta")
+
+    def cancel_processing(self):
+        """Cancel the batch; the current file is released back to input_pdfs."""
+        token = self.cancel_token
+        if token is None or token.cancelled:
+            return
+        if not messagebox.askyesno(
+            "Atcelt apstrādi",
+            f"Atcelt apstrādi? Pašreizējais fails paliks mapē '{path_config.input_dir.name}' "
+            "un tiks apstrādāts nākamajā reizē.",
+        ):
+            return
+        token.cancel()
+        self.button_pause.configure(state="disabled")
+        self.button_cancel.configure(state="disabled")
+        self.update_status("Atceļ apstrādi...")
+
     def reset_ui(self):
         """Reset UI to initial state."""
         self.is_processing = False
         self.button_start.configure(state="normal", text="▶️ Sākt Apstrādi")
+        self.button_pause.configure(state="disabled", text="⏸️ Pauze")
+        self.button_cancel.configure(state="disabled")
         self.button_select_file.configure(state="normal")
         self.button_select_folder.configure(state="normal")
         self.progressbar.set(0)
         self.label_progress.configure(text="")
+        self.label_throughput.configure(text="")
         self.update_status("Gatavs apstrādei")
 
     def processing_worker(self):
         """Background processing worker."""
         try:
             # Run the actual processing
-            run_processing_for_list(self.selected_paths, self.log_queue)
+            from main import run_processing_for_list
+
+            records = run_processing_for_list(self.selected_paths, self.log_queue,
+                                              cancel_token=self.cancel_token)
+
+            if self.cancel_token is not None and self.cancel_token.cancelled:
+                done = sum(1 for r in records if r.get("status") == "ok")
+                self.log_queue.put((f"\n⏹️ APSTRĀDE ATCELTA! Pabeigti {done} no {len(self.selected_paths)} failiem\n", 'error'))
+                self.after(100, lambda: [
+                    self.label_progress.configure(text="⏹️ Atcelts"),
+                    self.update_status("Apstrāde atcelta"),
+                    self.log_textbox.configure(state="normal")
+                ])
+                self.after(1000, self.reset_ui)
+                return
             
             # Processing completed
             processing_time = time.time() - self.start_time if self.start_time else 0
             self.log_queue.put((f"\n🎉 APSTRĀDE PABEIGTA!\n", 'meta'))
             self.log_queue.put((f"⏱️  Kopējais laiks: {processing_time:.1f} sekundes\n", 'meta'))
-            self.log_queue.put((f"📊 Apstrādātas {self.pages_processed} lapas\n", 'meta'))
+            tracker = self.tracker
+            self.log_queue.put((f"📊 Apstrādātas {tracker.pages_done} lapas "
+                                f"({tracker.pages_per_second():.1f} lpp/s)\n", 'meta'))
+            for file in tracker.finished_files:
+                stages = ", ".join(f"{STAGE_LABELS.get(s, s)} {t:.1f}s" for s, t in file.stages.items())
+                self.log_queue.put((f"   • {file.name}: {file.elapsed(file.finished):.1f}s ({stages})\n", 'meta'))
             
             # Schedule UI updates
             self.after(100, lambda: [
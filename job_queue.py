@@ -0,0 +1,384 @@
+"""job_queue.py
+
+Failu rinda vairākiem darbiniekiem (arī dažādos datoros) ar kopīgu
+`input_pdfs` mapi, piem., NFS sējumā.
+
+Bez koordinācijas divi `main.main()` procesi apstrādātu vienus un tos pašus
+failus un sadurtos pie `shutil.move`. Šeit katru PDF drīkst apstrādāt tikai
+tas darbinieks, kuram ir tā noma (lease) – fails `lease_dir/<nosaukums>.lease`:
+
+* **Pieteikšanās** – nomas fails tiek izveidots ar `O_CREAT | O_EXCL`, kas ir
+  atomārs arī NFSv3+; izdodas tikai vienam darbiniekam.
+* **Sirdspuksti** – apstrādes laikā fona pavediens ik `job_heartbeat_seconds`
+  atjauno nomas faila `mtime`.
+* **Atgūšana** – noma bez sirdspukstiem ilgāk par `job_lease_seconds` ir
+  pamesta (darbinieks vai dators avarējis). Cits darbinieks to atomāri
+  pārsauc par savu "stale" failu (izdodas tikai vienam), vēlreiz pārbauda
+  vecumu un piesakās no jauna ar palielinātu mēģinājumu skaitu. Pēc
+  `job_max_attempts` mēģinājumiem fails tiek pārvietots uz `error_pdfs`.
+  Mēģinājumu skaits glabājas atsevišķā `<nosaukums>.attempts` failā, tāpēc
+  tas nepazūd, kamēr nomas fails ir pārsaukts; dzīvs īpašnieks, kurš šajā
+  brīdī nomu neatrod, pārbauda to vēlreiz nākamajā sirdspukstā.
+
+PDF apstrādes laikā paliek `input_pdfs` mapē, tāpēc avārijas gadījumā nekas
+nav jāpārvieto atpakaļ. ZIP/TAR arhīvs ir viens darbs: tā nomnieks apstrādā
+dalībniekus ar `archive_source.run_processing_for_archive` (katalogs izlaiž
+jau apstrādātos, tāpēc pārņemts arhīvs turpinās, nevis sāksies no jauna). Nomas termiņam jābūt krietni lielākam par
+pulksteņu nobīdi starp datoriem un par `processing_timeout`.
+
+Lietošana no komandrindas (katrā datorā var palaist vairākus)::
+
+    python job_queue.py work            # apstrādā, līdz rinda tukša
+    python job_queue.py work --follow   # gaida jaunus failus
+    python job_queue.py status
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import path_config
+from output_versions import temp_path_for
+
+__all__ = [
+    "JobQueue",
+    "Lease",
+    "QueueWorker",
+    "new_worker_id",
+]
+
+logger = logging.getLogger(__name__)
+
+_LEASE_SUFFIX = ".lease"
+_ATTEMPTS_SUFFIX = ".attempts"
+
+
+def new_worker_id() -> str:
+    """Unikāls darbinieka identifikators: dators, process un nejaušs sufikss."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Lease:
+    """Viena faila noma; kamēr tā ir aktīva, fona pavediens sūta sirdspukstus."""
+
+    def __init__(self, queue: "JobQueue", pdf_path: Path, lease_path: Path, attempt: int):
+        self.queue = queue
+        self.pdf_path = pdf_path
+        self.lease_path = lease_path
+        self.attempt = attempt
+        self.lost = False
+        self._misses = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Lease":
+        self._thread = threading.Thread(target=self._heartbeat, name=f"lease-{self.pdf_path.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.queue.heartbeat_seconds):
+            if not self.renew():
+                return
+
+    def renew(self) -> bool:
+        """Atjauno nomu; `False`, ja to jau pārņēmis cits darbinieks.
+
+        Atguvējs uz brīdi pārsauc nomas failu, lai pārbaudītu tā vecumu, un
+        dzīvu nomu atdod atpakaļ. Tāpēc trūkstoša vai sveša noma tiek uzskatīta
+        par zaudētu tikai tad, ja tā tāda ir arī nākamajā sirdspukstā.
+        """
+        ours = _read_json(self.lease_path).get("worker") == self.queue.worker_id
+        if ours:
+            try:
+                os.utime(self.lease_path)
+            except FileNotFoundError:
+                ours = False
+        if ours:
+            self._misses = 0
+            return True
+        self._misses += 1
+        if self._misses < 2:
+            logger.info("Noma %s uz brīdi nav atrasta, pārbaudīs vēlreiz", self.pdf_path.name)
+            return True
+        self.lost = True
+        logger.warning("Noma zaudēta: %s", self.pdf_path.name)
+        return False
+
+    def release(self):
+        """Aptur sirdspukstus un dzēš nomas failu (ja tas vēl ir mūsu)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if not self.lost and _read_json(self.lease_path).get("worker") == self.queue.worker_id:
+            # Apstrāde beidzās bez avārijas – mēģinājumu skaits vairs nav vajadzīgs
+            self.queue._attempts_path(self.pdf_path).unlink(missing_ok=True)
+            try:
+                self.lease_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class JobQueue:
+    """`input_pdfs` mape kā darba rinda ar nomām `lease_dir` mapē."""
+
+    def __init__(self, input_dir: Optional[Path] = None, lease_dir: Optional[Path] = None,
+                 worker_id: Optional[str] = None, lease_seconds: Optional[float] = None,
+                 heartbeat_seconds: Optional[float] = None, max_attempts: Optional[int] = None):
+        self.input_dir = Path(input_dir or path_config.input_dir)
+        self.lease_dir = Path(lease_dir or path_config.lease_dir)
+        self.worker_id = worker_id or new_worker_id()
+        self.lease_seconds = lease_seconds or path_config.job_lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds or path_config.job_heartbeat_seconds
+        self.max_attempts = max_attempts or path_config.job_max_attempts
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+
+    def _lease_path(self, pdf_path: Path) -> Path:
+        return self.lease_dir / (pdf_path.name + _LEASE_SUFFIX)
+
+    def _attempts_path(self, pdf_path: Path) -> Path:
+        return self.lease_dir / (pdf_path.name + _ATTEMPTS_SUFFIX)
+
+    def _attempts(self, pdf_path: Path) -> int:
+        """Iepriekšējo pieteikšanos skaits, kas nav beigušās ar `Lease.release`."""
+        return int(_read_json(self._attempts_path(pdf_path)).get("attempts", 0))
+
+    def _write_attempts(self, pdf_path: Path, attempts: int):
+        path = self._attempts_path(pdf_path)
+        tmp = temp_path_for(path)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"attempts": attempts}, f)
+        os.replace(tmp, path)
+
+    def _lease_age(self, path: Path) -> Optional[float]:
+        try:
+            return time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    # ------------------------------------------------------------
+    #  Pieteikšanās un atgūšana
+    # ------------------------------------------------------------
+
+    def _take_over_expired(self, lease_path: Path) -> Optional[Dict[str, Any]]:
+        """Pārņem pamestu nomu; atgriež tās saturu vai `None`, ja noma ir dzīva vai to paņēma cits."""
+        age = self._lease_age(lease_path)
+        if age is None:
+            return {}
+        if age < self.lease_seconds:
+            return None
+        stale = lease_path.with_name(f"{lease_path.name}.{self.worker_id.replace(':', '_')}.stale")
+        try:
+            os.rename(lease_path, stale)  # atomāri – izdodas tikai vienam atguvējam
+        except FileNotFoundError:
+            return None
+        previous = _read_json(stale)
+        stale_age = self._lease_age(stale)
+        if stale_age is not None and stale_age < self.lease_seconds:
+            # Īpašnieks paspēja atjaunot nomu starp pārbaudi un pārsaukšanu – atdodam atpakaļ
+            try:
+                os.link(stale, lease_path)
+            except OSError:
+                pass
+            stale.unlink(missing_ok=True)
+            return None
+        stale.unlink(missing_ok=True)
+        logger.warning("Atgūta pamesta noma: %s (darbinieks %s)", lease_path.name, previous.get("worker"))
+        return previous
+
+    def claim(self, pdf_path: Path) -> Optional[Lease]:
+        """Mēģina iegūt faila nomu; `None`, ja to apstrādā cits darbinieks."""
+        lease_path = self._lease_path(pdf_path)
+        previous: Dict[str, Any] = {}
+        if lease_path.exists():
+            previous = self._take_over_expired(lease_path)
+            if previous is None:
+                return None
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None
+        # Skaits no .attempts faila – arī tad, ja nomas fails tikko bija pārsaukts
+        attempt = max(self._attempts(pdf_path), previous.get("attempt", 0)) + 1
+        self._write_attempts(pdf_path, attempt)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "worker": self.worker_id,
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "claimed_at": time.time(),
+                "attempt": attempt,
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        lease = Lease(self, pdf_path, lease_path, attempt)
+        if not pdf_path.exists():
+            # Fails jau apstrādāts, kamēr mēs skatījām sarakstu
+            lease.release()
+            return None
+        if attempt > self.max_attempts:
+            self._abandon(pdf_path, attempt - 1)
+            lease.release()
+            return None
+        return lease
+
+    def _abandon(self, pdf_path: Path, attempts: int):
+        """Pārvieto failu, kura apstrāde atkārtoti avarēja, uz kļūdu mapi."""
+        import shutil
+        from catalog import catalog
+        from main import write_error_report
+
+        error_path = path_config.error_dir / pdf_path.name
+        now = time.time()
+        message = f"Darbinieki avarēja {attempts} reizes, fails netiek apstrādāts atkārtoti"
+        try:
+            shutil.move(str(pdf_path), error_path)
+        except OSError as e:
+            logger.error("Neizdevās pārvietot %s uz kļūdu mapi: %s", pdf_path.name, e)
+            return
+        self._attempts_path(pdf_path).unlink(missing_ok=True)
+        write_error_report(error_path, {
+            "source": str(pdf_path),
+            "error": message,
+            "failed_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "reason": "abandoned",
+            "attempts": attempts,
+        })
+        try:
+            catalog.record({
+                "source_path": str(pdf_path), "pdf_path": str(error_path.resolve()), "status": "error",
+                "error": message, "started_at": now, "finished_at": now, "total_seconds": 0.0,
+                "metadata": {"failure": {"reason": "abandoned", "attempts": attempts}},
+            })
+        except Exception as e:
+            logger.warning("Neizdevās ierakstīt katalogā: %s", e)
+        logger.error("%s: %s", pdf_path.name, message)
+
+    def pending(self) -> List[Path]:
+        """Rindā esošie PDF faili un arhīvi (vecākie pirmie)."""
+        from archive_source import is_archive
+
+        files = []
+        for path in self.input_dir.iterdir():
+            if path.suffix.lower() != ".pdf" and not is_archive(path):
+                continue
+            try:
+                files.append((path.stat().st_mtime, path.name, path))
+            except FileNotFoundError:
+                continue
+        return [path for _, _, path in sorted(files)]
+
+    def claim_next(self, exclude: Iterable[Path] = ()) -> Optional[Lease]:
+        """Nākamais fails, kuru izdodas iegūt (ar dzīvu nomu esošie un `exclude` tiek izlaisti)."""
+        exclude = set(exclude)
+        for pdf_path in self.pending():
+            if pdf_path in exclude:
+                continue
+            lease = self.claim(pdf_path)
+            if lease is not None:
+                return lease
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        leases = []
+        for path in sorted(self.lease_dir.glob("*" + _LEASE_SUFFIX)):
+            info = _read_json(path)
+            age = self._lease_age(path)
+            info.update(file=path.name[:-len(_LEASE_SUFFIX)], heartbeat_age=round(age, 1) if age is not None else None,
+                        expired=age is not None and age >= self.lease_seconds)
+            leases.append(info)
+        return {"pending": len(self.pending()), "leases": leases}
+
+
+class QueueWorker:
+    """Ņem failus no `JobQueue` un apstrādā tos ar `run_processing_for_list`."""
+
+    def __init__(self, queue: Optional[JobQueue] = None, log_queue=None, cancel_token=None):
+        self.queue = queue or JobQueue()
+        self.log_queue = log_queue
+        # Atcelts fails paliek input_pdfs mapē, un tā noma tiek atbrīvota
+        self.cancel_token = cancel_token
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, follow: bool = False, poll_seconds: float = 5.0) -> List[dict]:
+        """Apstrādā failus, līdz rinda tukša (vai līdz `stop()`, ja `follow`)."""
+        from archive_source import is_archive, run_processing_for_archive
+        from main import run_processing_for_list
+        from supervisor import SupervisedWorker
+
+        records: List[dict] = []
+        # Arhīvi, kuros pēc apstrādes palika neapstrādāti dalībnieki (piem., pārāk lieli)
+        unfinished: List[Path] = []
+        worker = SupervisedWorker() if path_config.use_supervised_workers else None
+        try:
+            while not self._stop.is_set():
+                if self.cancel_token is not None and not self.cancel_token.proceed():
+                    break
+                lease = self.queue.claim_next(unfinished)
+                if lease is None:
+                    if not follow:
+                        break
+                    self._stop.wait(poll_seconds)
+                    continue
+                logger.info("%s: %s (mēģinājums %d)", self.queue.worker_id, lease.pdf_path.name, lease.attempt)
+                with lease:
+                    if is_archive(lease.pdf_path):
+                        # Arhīvam ir savi darbinieki dalībnieku paralēlai apstrādei
+                        records.extend(run_processing_for_archive(lease.pdf_path, self.log_queue,
+                                                                  cancel_token=self.cancel_token, finish=True))
+                        if lease.pdf_path.exists():
+                            logger.warning("%s: arhīvā palika neapstrādāti dalībnieki", lease.pdf_path.name)
+                            unfinished.append(lease.pdf_path)
+                    else:
+                        records.extend(run_processing_for_list([lease.pdf_path], self.log_queue, worker=worker,
+                                                               cancel_token=self.cancel_token))
+                if lease.lost:
+                    logger.warning("%s tika apstrādāts pēc nomas zaudēšanas", lease.pdf_path.name)
+        finally:
+            if worker is not None:
+                worker.close()
+        return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kopīgas input_pdfs mapes apstrāde ar nomām")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_work = sub.add_parser("work", help="Apstrādāt failus no rindas")
+    p_work.add_argument("--follow", action="store_true", help="Negriezties atpakaļ, kad rinda tukša")
+    p_work.add_argument("--poll", type=float, default=5.0, help="Gaidīšanas intervāls (s) ar --follow")
+    sub.add_parser("status", help="Rindas un nomu stāvoklis")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        from main import setup_logging
+
+        setup_logging()
+        path_config.setup_directories()
+        records = QueueWorker().run(follow=args.follow, poll_seconds=args.poll)
+        ok = sum(1 for r in records if r.get("status") == "ok")
+        print(f"Apstrādāti {len(records)} faili, veiksmīgi: {ok}")
+    else:
+        print(json.dumps(JobQueue().status(), ensure_ascii=False, indent=2))
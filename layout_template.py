@@ -0,0 +1,164 @@
+"""layout_template.py
+
+Dokumenta galvenes un kājenes apgabalu noteikšana.
+
+Agrāk katrai lapai tika nogriezta fiksēta 50 punktu mala. Tā dažkārt nogriež
+pamatteksta pēdējo rindu un dažkārt atstāj lapas numuru vai galveni, kas
+pēc tam nonāk ierakstu turpinājuma tekstā. Šeit no dažu lapu parauga tiek
+atrasti bloki, kas atkārtojas gandrīz visās lapās vienā un tajā pašā vietā
+(teksts salīdzināts ar cipariem aizstātiem ar `#`, lai "2/63" un "3/63"
+sakristu), un to apgabali tiek izgriezti pirms rindu parsēšanas.
+
+Veidne tiek saglabāta kešatmiņā pēc lapas izmēra un PDF ģeneratora, tāpēc
+vienāda izkārtojuma dokumentiem (piem., visiem likumi.lv eksportiem) tā tiek
+aprēķināta tikai vienreiz katrā procesā.
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Hashable, List, Tuple
+
+from config import path_config
+
+__all__ = [
+    "FIXED_MARGIN",
+    "LayoutTemplate",
+    "get_template",
+    "learn_template",
+]
+
+# Līdzšinējā fiksētā mala (punktos), ko lieto, ja veidni nevar iemācīties
+FIXED_MARGIN = 50
+
+# Galvenes/kājenes meklēšanas zona – augšējā un apakšējā lapas daļa
+_EDGE_ZONE = 0.15
+# Bloka pozīcijas noapaļošana (punktos), lai nelielas nobīdes neizjauktu atslēgu
+_POSITION_STEP = 4
+_CACHE_SIZE = 32
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+_template_cache: "OrderedDict[Hashable, LayoutTemplate]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class LayoutTemplate:
+    """Pamatteksta apgabals kā lapas augstuma daļas (0 – augša, 1 – apakša)."""
+
+    body_top: float
+    body_bottom: float
+    side_margin: float = 0.0  # punktos, tikai fiksētajam režīmam
+    source: str = "learned"  # "learned" | "cached" | "fixed"
+    repeating_blocks: int = 0
+
+    @classmethod
+    def fixed(cls, page_height: float) -> "LayoutTemplate":
+        margin = FIXED_MARGIN / page_height if page_height else 0.0
+        return cls(margin, 1 - margin, FIXED_MARGIN, "fixed")
+
+    def clip_for(self, page):
+        """Atgriež `fitz.Rect`, kas aptver lapas pamattekstu."""
+        import fitz
+
+        rect = page.rect
+        return fitz.Rect(
+            rect.x0 + self.side_margin,
+            rect.y0 + self.body_top * rect.height,
+            rect.x1 - self.side_margin,
+            rect.y0 + self.body_bottom * rect.height,
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        return {k: round(v, 4) if isinstance(v, float) else v for k, v in asdict(self).items()}
+
+
+def _block_key(block) -> Tuple[int, int, str]:
+    text = _SPACES.sub(" ", _DIGITS.sub("#", block[4])).strip()
+    return (round(block[1] / _POSITION_STEP), round(block[3] / _POSITION_STEP), text)
+
+
+def _sample_indices(page_count: int, samples: int) -> List[int]:
+    if page_count <= samples:
+        return list(range(page_count))
+    step = page_count / samples
+    return sorted({int(step * k + step / 2) for k in range(samples)})
+
+
+def learn_template(doc) -> LayoutTemplate:
+    """Iemācās galvenes/kājenes apgabalus no dokumenta lapu parauga.
+
+    Bloks tiek uzskatīts par galveni vai kājeni, ja tas atrodas lapas augšējā
+    vai apakšējā zonā un atkārtojas vismaz pusē parauga lapu. Ja lapu ir par
+    maz, tiek atgriezta fiksētās malas veidne.
+    """
+    page_count = len(doc)
+    page_height = doc[0].rect.height if page_count else 0
+    if page_count < path_config.header_footer_min_pages or not page_height:
+        return LayoutTemplate.fixed(page_height)
+
+    indices = _sample_indices(page_count, path_config.header_footer_sample_pages)
+    seen: Counter = Counter()
+    positions: Dict[Tuple[int, int, str], Tuple[float, float]] = {}
+    for index in indices:
+        page = doc[index]
+        top_zone = page.rect.y0 + _EDGE_ZONE * page.rect.height
+        bottom_zone = page.rect.y1 - _EDGE_ZONE * page.rect.height
+        keys = set()
+        for block in page.get_text("blocks"):
+            if len(block) < 5 or not block[4].strip():
+                continue
+            if block[3] > top_zone and block[1] < bottom_zone:
+                continue  # bloks nav malā
+            key = _block_key(block)
+            keys.add(key)
+            y0, y1 = positions.get(key, (block[1], block[3]))
+            positions[key] = (min(y0, block[1]), max(y1, block[3]))
+        seen.update(keys)
+
+    threshold = max(2, math.ceil(len(indices) / 2))
+    repeating = [key for key, count in seen.items() if count >= threshold]
+    body_top, body_bottom = 0.0, page_height
+    for key in repeating:
+        y0, y1 = positions[key]
+        if y1 <= _EDGE_ZONE * page_height:
+            body_top = max(body_top, y1 + 1)
+        else:
+            body_bottom = min(body_bottom, y0 - 1)
+    return LayoutTemplate(body_top / page_height, body_bottom / page_height,
+                          repeating_blocks=len(repeating))
+
+
+def _layout_key(doc) -> Hashable:
+    rect = doc[0].rect
+    metadata = doc.metadata or {}
+    return (round(rect.width), round(rect.height), metadata.get("producer"), metadata.get("creator"))
+
+
+def get_template(doc) -> LayoutTemplate:
+    """Atgriež dokumenta veidni atbilstoši `path_config.header_footer_mode`.
+
+    "fixed" – līdzšinējā 50 punktu mala; "learned" – iemācīta veidne,
+    kas tiek kešota pēc izkārtojuma (lapas izmērs + PDF ģenerators).
+    """
+    page_height = doc[0].rect.height if len(doc) else 0
+    if path_config.header_footer_mode != "learned" or not len(doc):
+        return LayoutTemplate.fixed(page_height)
+
+    key = _layout_key(doc)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        _template_cache.move_to_end(key)
+        return LayoutTemplate(cached.body_top, cached.body_bottom, cached.side_margin,
+                              "cached", cached.repeating_blocks)
+
+    template = learn_template(doc)
+    if template.source == "learned" and template.repeating_blocks:
+        # Kešojam tikai veidnes, kurās tiešām atrasta galvene vai kājene
+        _template_cache[key] = template
+        if len(_template_cache) > _CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return template
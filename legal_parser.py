@@ -7,7 +7,7 @@ balstās regulārajās izteiksmēs un noderīgu atslēgvārdu sarakstos.
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 # ------------------------------------------------------------
 #  Regulārās izteiksmes pamatstruktūrai
@@ -30,4 +30,64 @@ __all__ = [
     "POINT_PATTERN_PAREN",
     "POINT_SUBPOINT_PATTERN_DOT",
     "STOP_KEYWORDS",
+    "count_structural_lines",
+    "parse_line",
 ]
+
+
+# ------------------------------------------------------------
+#  Palīgfunkcijas
+# ------------------------------------------------------------
+
+def count_structural_lines(text: str) -> Tuple[int, int]:
+    """Atgriež (rindas, kas sāk pantu/punktu/apakšpunktu; visas netukšās rindas).
+
+    Attiecība starp abiem skaitļiem ir aptuvens ekstrakcijas kvalitātes
+    rādītājs – cik no teksta parseris spēj atpazīt kā struktūru.
+    """
+    structural = 0
+    lines = 0
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        lines += 1
+        if (ARTICLE_PATTERN.match(line) or POINT_PATTERN_PAREN.match(line)
+                or POINT_SUBPOINT_PATTERN_DOT.match(line)):
+            structural += 1
+    return structural, lines
+
+
+def parse_line(line: str, context: Dict[str, Optional[str]], law_title: str) -> Optional[Dict[str, Any]]:
+    """Vienas rindas parsēšana; to izmanto `process_pdf_to_structured_data` un `page_retry`.
+
+    `context` ({"article", "point", "subpoint"}) tiek atjaunināts vietā.
+    Atgriež jaunu ierakstu vai None, ja rinda ir iepriekšējā ieraksta turpinājums.
+    """
+    article_match = ARTICLE_PATTERN.match(line)
+    if article_match:
+        context.update(article=article_match.group(1).strip(), point=None, subpoint=None)
+        content = article_match.group(2).strip()
+    elif not context.get("article"):
+        return None
+    else:
+        paren_match = POINT_PATTERN_PAREN.match(line)
+        dot_match = None if paren_match else POINT_SUBPOINT_PATTERN_DOT.match(line)
+        if paren_match:
+            context.update(point=paren_match.group(1).strip(), subpoint=None)
+            content = paren_match.group(2).strip()
+        elif dot_match:
+            if not context.get("point"):
+                context["point"] = dot_match.group(1).strip()
+            else:
+                context["subpoint"] = dot_match.group(1).strip()
+            content = dot_match.group(2).strip()
+        else:
+            return None
+    return {
+        "law_title": law_title,
+        "article": context["article"],
+        "point": context["point"],
+        "subpoint": context["subpoint"],
+        "content": content,
+    }
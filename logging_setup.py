@@ -0,0 +1,132 @@
+"""logging_setup.py
+
+Žurnālošana, kas gandrīz neko nemaksā apstrādes ciklā.
+
+* Faila un konsoles izvadi veic `QueueListener` fona pavediens – apstrādes
+  pavediens tikai ievieto ierakstu `QueueHandler` rindā un nekad negaida
+  diska vai termināļa I/O.
+* Ar `path_config.log_json = True` faila žurnāls tiek rakstīts kā JSON Lines
+  (viens objekts rindā, ar `extra` laukiem), kas ērti apstrādājams ar citiem
+  rīkiem.
+* Katras parsētās rindas notikumi ('article', 'point', 'subpoint', 'content')
+  tiek veidoti tikai tad, ja kāds tos lasa – skat. `wants_line_events`.
+* `path_config.log_level` un rindas apstrādātājs attiecas arī uz apstrādes
+  moduļu žurnāliem (`PROCESSING_LOGGERS`); uzraudzītais darbinieka process
+  savus ierakstus pārsūta vecākam (`supervisor`).
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+from typing import List, Sequence
+
+from config import path_config
+
+__all__ = [
+    "LINE_EVENT_TAGS",
+    "PROCESSING_LOGGERS",
+    "JsonFormatter",
+    "configure_logging",
+    "log_level",
+    "wants_line_events",
+]
+
+# Rindu tagi, ko `process_pdf_to_structured_data` sūta par katru parsēto rindu
+LINE_EVENT_TAGS = ("article", "point", "subpoint", "content")
+# Moduļi, kuru ieraksti nonāk tajā pašā žurnālā kā izsaucēja (main) ieraksti
+PROCESSING_LOGGERS = ("pdf_processor", "page_retry", "output_versions", "job_queue")
+
+# Standarta `LogRecord` atribūti; viss pārējais ir `extra` lauki
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listeners: List[logging.handlers.QueueListener] = []
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatē ierakstu kā vienu JSON rindu."""
+
+    def __init__(self, component: str):
+        super().__init__()
+        self.component = component
+
+    def format(self, record: logging.LogRecord) -> str:
+        import json
+        from datetime import datetime, timezone
+
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "component": self.component,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def log_level() -> int:
+    return getattr(logging, str(path_config.log_level).upper(), logging.INFO)
+
+
+def configure_logging(logger: logging.Logger, component: str, also: Sequence[str] = ()) -> logging.Logger:
+    """Pievieno `logger` rindas apstrādātāju ar faila un konsoles izvadi fona pavedienā.
+
+    Atkārtots izsaukums neko nemaina. `component` ir nosaukums žurnāla rindās
+    (piem., "MAIN" vai "VERIFY"). Žurnāliem `also` (piem., `PROCESSING_LOGGERS`)
+    tiek iestatīts tas pats līmenis un apstrādātājs, ja tie vēl nav konfigurēti.
+    """
+    # logging.handlers ievelk socket un pickle; tas vajadzīgs tikai šeit, nevis
+    # moduļiem, kas importē `wants_line_events` (supervisor, pdf_processor)
+    import logging.handlers
+
+    with _lock:
+        if logger.handlers:
+            return logger
+
+        file_handler = logging.FileHandler(path_config.log_file, mode="a", encoding="utf-8")
+        if path_config.log_json:
+            file_handler.setFormatter(JsonFormatter(component))
+        else:
+            file_handler.setFormatter(logging.Formatter(f"%(asctime)s - %(levelname)s - {component} - %(message)s"))
+        stream_handler = logging.StreamHandler()
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler, respect_handler_level=True
+        )
+        listener.start()
+        _listeners.append(listener)
+        handler = logging.handlers.QueueHandler(log_queue)
+        for target in (logger, *(logging.getLogger(name) for name in also)):
+            if target is not logger and target.handlers:
+                continue
+            target.setLevel(log_level())
+            target.addHandler(handler)
+            target.propagate = False
+    return logger
+
+
+@atexit.register
+def _stop_listeners():
+    # Izraksta rindā palikušos ierakstus pirms programmas beigām
+    with _lock:
+        while _listeners:
+            _listeners.pop().stop()
+
+
+def wants_line_events(log_queue) -> bool:
+    """Vai `log_queue` lasa katras parsētās rindas notikumus.
+
+    Objekts var atteikties no tiem ar metodi `accepts(tag) -> bool`
+    (piem., `async_api` notikumu tilts, kas pārsūta tikai dažus tagus).
+    """
+    if log_queue is None:
+        return False
+    accepts = getattr(log_queue, "accepts", None)
+    return accepts is None or any(accepts(tag) for tag in LINE_EVENT_TAGS)
@@ -5,23 +5,51 @@ import shutil
 import logging
 import re
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Union
 from queue import Queue
 from config import path_config
-from pdf_processor import process_pdf_to_structured_data
-from validator import validate_processed_data
-
-# Setup logging
-path_config.setup_directories()
-log_handler = logging.FileHandler(path_config.log_file, mode='a', encoding='utf-8')
-log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - MAIN - %(message)s')
-log_handler.setFormatter(log_formatter)
+from archive_source import ArchiveMember, is_archive, run_processing_for_archive
+from validator import StreamingValidator
+from columnar_export import ColumnarWriter
+from block_store import BlockWriter, output_path_for
+from catalog import catalog, file_sha256
+from cross_references import CrossReferenceIndex, refs_path_for
+from output_versions import output_store, temp_path_for
+from page_retry import failed_pages, write_page_report
+from entry_store import entry_store
+from cancellation import ProcessingCancelled
+from scheduler import estimate_costs, expected_times_to_result, order_by_cost, summarize_times, time_to_result_report
+from supervisor import RETRYABLE_STATUSES, ProcessingFailure, SupervisedWorker
+from logging_setup import PROCESSING_LOGGERS, configure_logging
+from progress import ProgressEvent, emit_progress
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-if not logger.handlers:
-    logger.addHandler(log_handler)
-    logger.addHandler(logging.StreamHandler())
+
+# Archive members run in parallel; members with the same law title save one at a time
+_title_save_locks = {}
+_title_save_locks_guard = threading.Lock()
+
+def title_save_lock(safe_title: str) -> threading.Lock:
+    with _title_save_locks_guard:
+        return _title_save_locks.setdefault(safe_title, threading.Lock())
+
+# Parser stats that are kept in the catalog metadata
+METADATA_STATS = (
+    "cpu_seconds", "peak_rss_mb", "peak_working_set_mb", "working_set_growth_mb",
+    "fitz_only", "extractor", "layout",
+)
+
+def setup_logging():
+    """Create working directories and attach the queued log handlers (once, on first use)."""
+    if logger.handlers:
+        return
+    path_config.setup_directories()
+    configure_logging(logger, "MAIN", also=PROCESSING_LOGGERS)
 
 def sanitize_filename(name: str) -> str:
     """Clean filename from illegal characters with improved handling."""
@@ -43,51 +71,247 @@ def backup_existing_file(filepath: Path) -> bool:
     if filepath.exists():
         try:
             backup_path = filepath.with_suffix(f'.backup{filepath.suffix}')
+            backup_path.unlink(missing_ok=True)  # A copy of a read-only version object is read-only too
             shutil.copy2(filepath, backup_path)
-            logger.info(f"Izveidota rezerves kopija: {backup_path.name}")
+            logger.info("Izveidota rezerves kopija: %s", backup_path.name)
             return True
         except Exception as e:
-            logger.warning(f"Neizdevās izveidot rezerves kopiju: {e}")
+            logger.warning("Neizdevās izveidot rezerves kopiju: %s", e)
             return False
     return True
 
-def run_processing_for_list(pdf_files: List[Path], log_queue: Optional[Queue] = None):
-    """Process list of PDF files with enhanced error handling."""
+@contextmanager
+def open_replacing(filepath: Path, mode: str = 'w', encoding: Optional[str] = None):
+    """Write through a temp file and ``os.replace`` it over ``filepath``.
+
+    Output views may be hardlinks to immutable version objects; opening them
+    for writing would change every version that shares the object.
+    """
+    tmp = temp_path_for(filepath)
+    try:
+        with open(tmp, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp, filepath)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def write_error_report(error_path: Path, report: dict) -> Optional[Path]:
+    """Write a structured failure reason next to the file in the error directory."""
+    report_path = error_path.with_suffix('.error.json')
+    try:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report_path
+    except Exception as e:
+        logger.warning("Neizdevās saglabāt kļūdas aprakstu: %s", e)
+        return None
+
+def stage_timer(log_queue, file_name: str):
+    """Return ``end_stage(name)``, which reports the time since the previous call as a progress event."""
+    last = time.perf_counter()
+
+    def end_stage(stage: str):
+        nonlocal last
+        now = time.perf_counter()
+        emit_progress(log_queue, ProgressEvent("stage", file_name, stage=stage, seconds=now - last))
+        last = now
+
+    return end_stage
+
+def extract_structured_data(pdf_path: Path, log_queue, on_entry, stats: dict,
+                            worker: Optional[SupervisedWorker], log, cancel_token=None,
+                            pdf_stream: Optional[bytes] = None):
+    """Run the parser in-process or, if a worker is given, in the supervised subprocess.
+
+    With ``pdf_stream`` the PDF is parsed from memory and ``pdf_path`` is only its name.
+
+    A worker that times out, runs out of memory or crashes is retried once in
+    fitz-only mode; if that fails too, ProcessingFailure carries the attempts.
+    Raises ProcessingCancelled when ``cancel_token`` is cancelled.
+    """
+    if worker is None:
+        # PyMuPDF is only needed in this process when no worker is used
+        from pdf_processor import process_pdf_to_structured_data
+        return process_pdf_to_structured_data(str(pdf_path), log_queue, on_entry=on_entry, stats=stats,
+                                              cancel_token=cancel_token, pdf_stream=pdf_stream)
+
+    result = worker.process(pdf_path, log_queue, cancel_token=cancel_token, pdf_stream=pdf_stream)
+    attempts = [result.report()]
+    if result.status in RETRYABLE_STATUSES and path_config.retry_fitz_only:
+        log(f"{result.error} – mēģina vēlreiz tikai ar PyMuPDF (bez pdfplumber)", 'error')
+        result = worker.process(pdf_path, log_queue, fitz_only=True, cancel_token=cancel_token,
+                                pdf_stream=pdf_stream)
+        attempts.append(result.report())
+    if result.status == "cancelled":
+        raise ProcessingCancelled(str(pdf_path))
+
+    if result.status != "ok":
+        raise ProcessingFailure(
+            result.error or "Neizdevās iegūt likuma nosaukumu vai strukturēt datus.",
+            {"reason": result.status, "attempts": attempts},
+        )
+
+    stats.update(result.stats)
+    stats.update(cpu_seconds=result.cpu_seconds, peak_rss_mb=result.peak_rss_mb, fitz_only=result.fitz_only)
+    # Ieraksti tiek atskaņoti caur on_entry tāpat kā apstrādājot tajā pašā procesā
+    for entry, page in zip(result.entries, result.entry_pages):
+        on_entry(entry, page)
+    return result.law_title, result.entries
+
+def record_rejected_member(member: ArchiveMember, error_msg: str) -> dict:
+    """Catalog an archive member that failed validation, so it is not pending forever.
+
+    Oversized members are never read, so they have no ``source_sha256``; the
+    catalog tells them apart by ``member_key`` (their size) instead.
+    """
+    now = time.time()
+    record = {
+        "source_path": member.source_path, "source_name": member.source_name,
+        "source_sha256": member.sha256, "status": "error", "error": error_msg,
+        "started_at": now, "finished_at": now, "total_seconds": 0.0,
+        "metadata": {"failure": {"reason": "too_large" if member.too_large else "invalid", "size": member.size},
+                     "member_key": member.member_key},
+    }
+    try:
+        record["id"] = catalog.record(record)
+    except Exception as catalog_error:
+        logger.warning("Neizdevās ierakstīt katalogā: %s", catalog_error)
+    return record
+
+def run_processing_for_list(pdf_files: List[Union[Path, ArchiveMember]], log_queue: Optional[Queue] = None,
+                            worker: Optional[SupervisedWorker] = None, cancel_token=None) -> List[dict]:
+    """Process list of PDF files with enhanced error handling.
+
+    Items may also be ``archive_source.ArchiveMember`` objects: they are parsed
+    from memory, the processed PDF is written from the same bytes and the
+    catalog tracks them as "<archive>!<member>"; nothing is unpacked to ``input_dir``.
+
+    ``log_queue`` may be any object with a ``put((text, tag))`` method; an
+    optional ``accepts(tag)`` method lets it opt out of per-line events. An
+    existing ``worker`` can be passed in to reuse its process across calls;
+    it is then left running. Returns the catalog record of every attempt.
+
+    ``cancel_token`` (a ``cancellation.CancellationToken``) is checked between
+    files and pages. A cancelled file is left in ``input_dir`` with its
+    partial output removed and recorded with status "cancelled".
+    """
+    setup_logging()
     
     def log(message, tag='meta'):
-        logger.info(message.strip())
+        logger.info(message.strip(), extra={"tag": tag})
         if log_queue:
             log_queue.put((message + "\n", tag))
 
     # Validate files before processing
     valid_files = []
+    records = []
     for pdf_file in pdf_files:
-        is_valid, error_msg = path_config.validate_file(pdf_file)
+        if isinstance(pdf_file, ArchiveMember):
+            is_valid, error_msg = pdf_file.validate()
+        else:
+            is_valid, error_msg = path_config.validate_file(pdf_file)
         if is_valid:
             valid_files.append(pdf_file)
         else:
             log(f"Izlaists fails {pdf_file.name}: {error_msg}", 'error')
+            if isinstance(pdf_file, ArchiveMember):
+                records.append(record_rejected_member(pdf_file, error_msg))
 
     if not valid_files:
         log("Nav derīgu failu apstrādei!", 'error')
-        return
+        return records
 
     log(f"Apstrādei atlasīti {len(valid_files)} no {len(pdf_files)} failiem", 'meta')
 
+    if (path_config.schedule_shortest_first and len(valid_files) > 1
+            and not any(isinstance(f, ArchiveMember) for f in valid_files)):
+        # Small laws first (within priority), so one large code does not delay the rest
+        estimates = estimate_costs(valid_files, path_config.schedule_priorities)
+        plan = order_by_cost(estimates)
+        valid_files = [estimate.path for estimate in plan]
+        planned = summarize_times(expected_times_to_result(plan))
+        original = summarize_times(expected_times_to_result(estimates))
+        log(f"Secība: īsākie vispirms – paredzamais vid. laiks līdz rezultātam {planned['mean']:.0f}s "
+            f"(p95 {planned['p95']:.0f}s), sākotnējā secībā {original['mean']:.0f}s", 'meta')
+    batch_started_at = time.time()
+
+    owns_worker = worker is None and path_config.use_supervised_workers
+    if owns_worker:
+        worker = SupervisedWorker()
+    if owns_worker and not worker.memory_limit_enforced:
+        log("Atmiņas ierobežojums šajā sistēmā netiek piemērots, darbojas tikai taimauts", 'meta')
+
     for i, pdf_file in enumerate(valid_files, 1):
+        if cancel_token is not None and not cancel_token.proceed():
+            log(f"⏹ Apstrāde atcelta, neapstrādāti {len(valid_files) - i + 1} faili", 'error')
+            break
         log(f"\n=== FAILS {i}/{len(valid_files)}: {pdf_file.name} ===", 'meta')
         
         input_pdf_path = None
+        member = pdf_file if isinstance(pdf_file, ArchiveMember) else None
+        # Partial and error files: archive members may share a basename (2023/likums.pdf, 2024/likums.pdf)
+        work_stem = pdf_file.stem if member is None else member.unique_stem
+        pdf_stream = None
+        columnar_writer = None
+        block_writer = None
+        output_version = None
+        save_lock = None
+        started_at = time.time()
+        if member is not None:
+            record = {"source_path": member.source_path, "source_name": member.source_name, "started_at": started_at}
+        else:
+            record = {"source_path": str(pdf_file.resolve()), "started_at": started_at}
+        emit_progress(log_queue, ProgressEvent("file_started", pdf_file.name))
+        end_stage = stage_timer(log_queue, pdf_file.name)
         try:
-            # Copy to input directory if needed
-            input_pdf_path = path_config.input_dir / pdf_file.name
-            if not input_pdf_path.exists():
-                shutil.copy2(pdf_file, input_pdf_path)
-                log(f"Fails nokopēts uz apstrādes mapi", 'meta')
+            if member is not None:
+                # Archive members are parsed from memory, nothing is unpacked to disk
+                pdf_stream = member.read_bytes()
+                record["source_sha256"] = member.sha256
+            else:
+                # Copy to input directory if needed
+                input_pdf_path = path_config.input_dir / pdf_file.name
+                if not input_pdf_path.exists():
+                    shutil.copy2(pdf_file, input_pdf_path)
+                    log(f"Fails nokopēts uz apstrādes mapi", 'meta')
+                record["source_sha256"] = file_sha256(input_pdf_path)
+            end_stage("prepare")
 
             # Process PDF
+            if path_config.export_parquet:
+                columnar_writer = ColumnarWriter(path_config.parquet_dir / f"{work_stem}.parquet.partial")
+            if path_config.export_blocks:
+                block_writer = BlockWriter(
+                    path_config.block_dir / f"{work_stem}.blocks.partial",
+                    path_config.block_codec, path_config.block_entries,
+                )
+
+            # Entries are validated (and optionally exported) as they are parsed
+            validator = StreamingValidator()
+            entry_sinks = [validator.feed]
+            if columnar_writer:
+                entry_sinks.append(columnar_writer.write)
+            if block_writer:
+                entry_sinks.append(block_writer.write)
+
+            def on_entry(entry, page):
+                for sink in entry_sinks:
+                    sink(entry, page)
+
             log("Sāk PDF analīzi...", 'meta')
-            law_title, structured_data = process_pdf_to_structured_data(str(input_pdf_path), log_queue)
+            stats = {}
+            extract_start = time.perf_counter()
+            law_title, structured_data = extract_structured_data(
+                input_pdf_path or Path(pdf_file.name), log_queue, on_entry, stats, worker, log, cancel_token,
+                pdf_stream,
+            )
+            record["extract_seconds"] = time.perf_counter() - extract_start
+            end_stage("extract")
+            record["page_count"] = stats.get("page_count")
+            record["metadata"] = {k: stats[k] for k in METADATA_STATS if k in stats}
+            if "peak_working_set_mb" in stats:
+                log(f"Atmiņa: maks. {stats['peak_working_set_mb']} MB (+{stats.get('working_set_growth_mb')} MB dokumentam)", 'meta')
             
             if not law_title or not structured_data:
                 raise ValueError("Neizdevās iegūt likuma nosaukumu vai strukturēt datus.")
@@ -95,69 +319,233 @@ def run_processing_for_list(pdf_files: List[Path], log_queue: Optional[Queue] =
             log(f"Iegūts likuma nosaukums: {law_title}", 'meta')
             log(f"Izveidoti {len(structured_data)} strukturēti ieraksti", 'meta')
 
-            # Validate data
-            log("Validē strukturētos datus...", 'meta')
-            is_valid, messages = validate_processed_data(structured_data)
+            # Validation already ran during parsing
+            is_valid, messages = validator.finish()
+            record.update(
+                law_title=law_title,
+                entry_count=len(structured_data),
+                validation_ok=is_valid,
+                validation_messages=messages,
+            )
             
             for msg in messages:
                 log(f"Validācija: {msg}", 'meta' if not any(word in msg.lower() for word in ['kļūda', 'error']) else 'error')
+            end_stage("validate")
+            if cancel_token is not None:
+                cancel_token.check()  # Last point where the file can still be released
 
             # Save JSON file
             safe_title = sanitize_filename(law_title)
             json_filename = f"{safe_title}.json"
             json_filepath = path_config.processed_json_dir / json_filename
-            
-            # Backup existing file if needed
-            backup_existing_file(json_filepath)
+            record["safe_title"] = safe_title
+            # JSON, exports and the PDF of one law all come from the same file
+            save_lock = title_save_lock(safe_title)
+            save_lock.acquire()
             
             log("Saglabā JSON failu...", 'meta')
-            with open(json_filepath, 'w', encoding='utf-8') as f:
-                json.dump(structured_data, f, ensure_ascii=False, indent=2)
+            if path_config.versioned_output:
+                # New immutable version; processed_json is updated only on commit
+                output_version = output_store.begin(safe_title)
+                output_version.add_json(json_filename, structured_data)
+            else:
+                # Backup existing file if needed
+                backup_existing_file(json_filepath)
+                with open_replacing(json_filepath, 'w', encoding='utf-8') as f:
+                    json.dump(structured_data, f, ensure_ascii=False, indent=2)
             
             log(f"JSON fails saglabāts: {json_filename}", 'meta')
+            record["json_path"] = str(json_filepath.resolve())
+
+            if path_config.use_entry_store:
+                version_id = entry_store.add_version(
+                    law_title, structured_data,
+                    source_name=pdf_file.name, source_sha256=record.get("source_sha256"),
+                )
+                log(f"Versija saglabāta ierakstu glabātuvē (id {version_id})", 'meta')
+                record.setdefault("metadata", {})["entry_store_version"] = version_id
+
+            if path_config.build_cross_references:
+                refs = CrossReferenceIndex.from_entries(law_title, structured_data)
+                refs_path = refs.save(refs_path_for(safe_title))
+                log(f"Atsauču grafs: {refs.edge_count} atsauces ({refs.unresolved} neatrisinātas)", 'meta')
+                record.setdefault("metadata", {})["cross_references"] = {
+                    "path": str(refs_path.resolve()), "edges": refs.edge_count, "unresolved": refs.unresolved,
+                }
+
+            if columnar_writer:
+                parquet_path = columnar_writer.commit(path_config.parquet_dir / f"{safe_title}.parquet")
+                columnar_writer = None
+                log(f"Parquet fails saglabāts: {parquet_path.name}", 'meta')
+                record.setdefault("metadata", {})["parquet_path"] = str(parquet_path.resolve())
+
+            if block_writer:
+                blocks_path = block_writer.commit(output_path_for(safe_title, path_config.block_codec))
+                block_writer = None
+                log(f"Bloku fails saglabāts: {blocks_path.name}", 'meta')
+                record.setdefault("metadata", {})["blocks_path"] = str(blocks_path.resolve())
 
             # Move processed PDF
             processed_pdf_path = path_config.processed_pdfs_dir / f"{safe_title}.pdf"
-            backup_existing_file(processed_pdf_path)
-            
-            shutil.move(str(input_pdf_path), processed_pdf_path)
-            log(f"PDF fails pārvietots uz: {processed_pdf_path.name}", 'meta')
+            if output_version:
+                # Unchanged PDFs are shared with earlier versions through hardlinks
+                if member is not None:
+                    output_version.add_bytes(processed_pdf_path.name, pdf_stream)
+                else:
+                    output_version.add_file(processed_pdf_path.name, input_pdf_path, record.get("source_sha256"), move=True)
+                output_version.commit({"source_name": pdf_file.name, "entry_count": len(structured_data)})
+                log(f"Saglabāta versija {output_version.name}", 'meta')
+                record.setdefault("metadata", {})["output_version"] = output_version.name
+                output_version = None
+            elif member is not None:
+                backup_existing_file(processed_pdf_path)
+                with open_replacing(processed_pdf_path, 'wb') as f:
+                    f.write(pdf_stream)
+            else:
+                backup_existing_file(processed_pdf_path)
+                shutil.move(str(input_pdf_path), processed_pdf_path)
+            log(f"PDF fails {'saglabāts' if member else 'pārvietots'} uz: {processed_pdf_path.name}", 'meta')
+            record["pdf_path"] = str(processed_pdf_path.resolve())
+            save_lock.release()
+            save_lock = None
+
+            # Page-level outcomes, so failed pages can be retried without reprocessing the file
+            page_report = {
+                "law_title": law_title,
+                "source_name": pdf_file.name,
+                "source_sha256": record.get("source_sha256"),
+                "pdf_path": record["pdf_path"],
+                "page_count": stats.get("page_count"),
+                "pages": stats.get("page_outcomes", []),
+            }
+            write_page_report(safe_title, page_report)
+            failed = failed_pages(page_report)
+            record.setdefault("metadata", {})["failed_pages"] = failed
+            if failed:
+                log(f"Neizdevās apstrādāt {len(failed)} lapas ({', '.join(map(str, failed))}); "
+                    f"atkārtot: python page_retry.py retry {safe_title}", 'error')
+            record["status"] = "ok"
+            end_stage("save")
             
             log(f"✅ Veiksmīgi pabeigts: {pdf_file.name}", 'meta')
 
+        except ProcessingCancelled:
+            record["status"] = "cancelled"
+            if columnar_writer:
+                columnar_writer.abort()
+            if block_writer:
+                block_writer.abort()
+            if output_version:
+                output_version.abort()
+            # The file stays in input_dir, so the next run picks it up again
+            if member is not None:
+                log(f"⏹ Apstrāde atcelta: {member}", 'error')
+            else:
+                if input_pdf_path and input_pdf_path.exists():
+                    record["pdf_path"] = str(input_pdf_path.resolve())
+                log(f"⏹ Apstrāde atcelta: {pdf_file.name} atstāts mapē {path_config.input_dir.name}", 'error')
+
         except Exception as e:
             error_msg = f"KĻŪDA apstrādājot {pdf_file.name}: {str(e)}"
             log(error_msg, 'error')
+            record.update(status="error", error=str(e))
+            failure_report = getattr(e, "report", {"reason": "error"})
+            record.setdefault("metadata", {})["failure"] = failure_report
+
+            if columnar_writer:
+                columnar_writer.abort()
+            if block_writer:
+                block_writer.abort()
+            if output_version:
+                output_version.abort()
             
             # Move to error directory
-            error_path = path_config.error_dir / pdf_file.name
+            error_path = path_config.error_dir / (pdf_file.name if member is None else f"{work_stem}.pdf")
             try:
                 if input_pdf_path and input_pdf_path.exists():
                     shutil.move(str(input_pdf_path), error_path)
                     log(f"Fails pārvietots uz kļūdu mapi: {error_path.name}", 'error')
+                    record["pdf_path"] = str(error_path.resolve())
+                elif member is not None:
+                    # Keep the failing member for inspection; the archive itself is not touched
+                    if pdf_stream is not None:
+                        error_path.write_bytes(pdf_stream)
+                        log(f"Arhīva fails saglabāts kļūdu mapē: {error_path.name}", 'error')
+                        record["pdf_path"] = str(error_path.resolve())
                 elif pdf_file != error_path:
                     shutil.copy2(pdf_file, error_path)
                     log(f"Fails nokopēts uz kļūdu mapi: {error_path.name}", 'error')
+                    record["pdf_path"] = str(error_path.resolve())
             except Exception as move_error:
                 log(f"Neizdevās pārvietot failu uz kļūdu mapi: {move_error}", 'error')
 
-    log(f"\n🏁 Apstrāde pabeigta. Veiksmīgi: {len(valid_files)} faili", 'meta')
+            write_error_report(error_path, {
+                "source": str(pdf_file),
+                "error": str(e),
+                "failed_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                **failure_report,
+            })
+
+        finally:
+            if save_lock is not None:
+                save_lock.release()
+
+        # Record the attempt in the catalog
+        record["finished_at"] = time.time()
+        record["total_seconds"] = record["finished_at"] - started_at
+        try:
+            record["id"] = catalog.record(record)
+        except Exception as catalog_error:
+            log(f"Neizdevās ierakstīt katalogā: {catalog_error}", 'error')
+        records.append(record)
+        emit_progress(log_queue, ProgressEvent("file_finished", pdf_file.name, ok=record.get("status") == "ok"))
+        if record.get("status") == "cancelled":
+            break
+
+    if owns_worker:
+        worker.close()
+
+    if len(records) > 1:
+        ttr = time_to_result_report(records, batch_started_at)
+        log(f"Laiks līdz rezultātam: vid. {ttr['mean']:.1f}s, p50 {ttr['p50']:.1f}s, "
+            f"p95 {ttr['p95']:.1f}s, maks. {ttr['max']:.1f}s", 'meta')
+
+    ok_count = sum(1 for record in records if record.get("status") == "ok")
+    if cancel_token is not None and cancel_token.cancelled:
+        log(f"\n🏁 Apstrāde atcelta. Veiksmīgi: {ok_count} no {len(valid_files)} failiem", 'meta')
+    else:
+        log(f"\n🏁 Apstrāde pabeigta. Veiksmīgi: {ok_count} faili", 'meta')
+    return records
 
 def main():
     """Main function for standalone execution."""
+    setup_logging()
     logger.info("Sāk PDF failu apstrādi no 'input_pdfs' mapes...")
     
     if not path_config.setup_directories():
         logger.error("Neizdevās izveidot nepieciešamās mapes!")
         return
     
+    if path_config.use_job_queue:
+        # Files are claimed one at a time, so other instances can share the backlog
+        from job_queue import QueueWorker
+
+        records = QueueWorker().run()
+        logger.info("Visi faili apstrādāti (%d šajā procesā).", len(records))
+        return
+
     input_files = list(path_config.input_dir.glob("*.pdf"))
+    # ZIP/TAR bundles are read member by member, without unpacking them first
+    archives = sorted(p for p in path_config.input_dir.iterdir() if p.is_file() and is_archive(p))
     
-    if not input_files:
+    if not input_files and not archives:
         logger.info("Nav PDF failu apstrādei 'input_pdfs' mapē.")
         return
     
-    run_processing_for_list(input_files)
+    if input_files:
+        run_processing_for_list(input_files)
+    for archive in archives:
+        run_processing_for_archive(archive, finish=True)
     logger.info("Visi faili apstrādāti.")
 
 if __name__ == "__main__":
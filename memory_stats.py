@@ -0,0 +1,69 @@
+"""memory_stats.py
+
+Procesa atmiņas (RSS) mērījumi apstrādes statistikai.
+
+`WorkingSetTracker` dokumenta apstrādes laikā periodiski nolasa pašreizējo
+RSS un atceras maksimumu, tāpēc katram dokumentam ir zināms, cik atmiņas
+tieši tas prasīja – arī ilgi dzīvojošā darbinieka procesā, kur
+`ru_maxrss` rāda visa procesa mūža maksimumu. No šiem skaitļiem var
+plānot, cik dokumentu drīkst apstrādāt paralēli dotajā atmiņas budžetā.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+__all__ = [
+    "WorkingSetTracker",
+    "current_rss_mb",
+    "peak_rss_mb",
+]
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Procesa mūža maksimālais RSS (MB)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux atgriež KB, macOS – baitus
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """Pašreizējais RSS (MB); ja /proc nav pieejams, procesa maksimums."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+class WorkingSetTracker:
+    """Dokumenta apstrādes laikā novērotais RSS maksimums."""
+
+    def __init__(self):
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+
+    def sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def report(self) -> Dict[str, Any]:
+        self.sample()
+        if self.start_mb is None or self.peak_mb is None:
+            return {}
+        return {
+            "rss_start_mb": round(self.start_mb, 1),
+            "peak_working_set_mb": round(self.peak_mb, 1),
+            "working_set_growth_mb": round(self.peak_mb - self.start_mb, 1),
+        }
@@ -0,0 +1,338 @@
+"""output_versions.py
+
+Versiju glabātuve apstrādes rezultātiem ar cietajām saitēm.
+
+Agrāk katra atkārtota likuma apstrāde ar `shutil.copy2` pilnībā kopēja
+esošo JSON un PDF uz `.backup` failu (pārrakstot iepriekšējo), tātad maksāja
+pilnu kopiju un glabāja tikai vienu iepriekšējo versiju. Tagad katra
+apstrāde izveido jaunu, nemainīgu versiju::
+
+    output_versions/
+        objects/ab/ab12….pdf            # faili pēc SHA-256, glabāti vienreiz
+        Darba_likums/
+            000001/Darba_likums.json    # cietās saites uz objects/
+            000001/Darba_likums.pdf
+            000001/version.json         # manifests: faili, hash, metadati
+            000002/…
+            CURRENT                     # aktuālās versijas nosaukums
+
+Versijas faili ir cietās saites uz satura objektiem, tāpēc nemainīts PDF
+(vai identisks JSON) netiek kopēts ne reizi. `processed_json/<nosaukums>.json`
+un `processed_pdfs/<nosaukums>.pdf` paliek kā līdzšinējais "skats" uz aktuālo
+versiju – arī tās ir cietās saites, kuras tiek nomainītas atomāri
+(`os.replace`) tikai pēc tam, kad versija ir pilnībā uzrakstīta. Vecākās
+versijas virs `output_keep_versions` tiek dzēstas, un objekti, uz kuriem
+vairs neattiecas neviena saite, tiek atbrīvoti.
+
+Ja failu sistēma neatbalsta cietās saites, fails tiek nokopēts.
+
+Lietošana no komandrindas::
+
+    python output_versions.py list Darba_likums
+    python output_versions.py activate Darba_likums 000003   # atgriezties pie versijas
+    python output_versions.py prune --keep 3
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import path_config
+
+__all__ = [
+    "OutputStore",
+    "PendingVersion",
+    "output_store",
+    "temp_path_for",
+]
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "version.json"
+OBJECTS_DIR = "objects"
+
+
+def _sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def temp_path_for(path: Path) -> Path:
+    """Pagaidu fails blakus `path`, unikāls arī starp viena procesa pavedieniem."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Atomāri aizstāj `target` ar cieto saiti uz `source` (vai kopiju)."""
+    tmp = temp_path_for(target)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy2(source, tmp)
+    os.replace(tmp, target)
+
+
+def _make_read_only(path: Path):
+    """Objekti (un visas saites uz tiem) ir tikai lasāmi, lai tos nevarētu pārrakstīt vietā.
+
+    Windows `os.replace` un dzēšana neizdodas tikai lasāmiem failiem, tāpēc
+    tur objekti paliek rakstāmi un tos aizsargā tikai SHA-256 pārbaude.
+    """
+    if os.name != "nt":
+        os.chmod(path, 0o444)
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = temp_path_for(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------
+#  Versijas izveide
+# ------------------------------------------------------------
+
+class PendingVersion:
+    """Versija, kas vēl tiek rakstīta; redzama kļūst tikai pēc `commit`."""
+
+    def __init__(self, store: "OutputStore", safe_title: str, path: Path):
+        self.store = store
+        self.safe_title = safe_title
+        self.path = path
+        self.name = path.name
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._consumed: List[Path] = []
+        self.committed = False
+
+    def _add_object(self, name: str, digest: str, size: int, source: Optional[Path] = None,
+                    data: Optional[bytes] = None):
+        obj = self.store.object_path(digest, Path(name).suffix)
+        # Cits pavediens citādi varētu atbrīvot objektu (`collect_objects`), pirms tam izveidota saite
+        with self.store.objects_lock:
+            if obj.exists() and _sha256_file(obj) != digest:
+                # Objekts mainīts caur kādu no saitēm – tas netiek izmantots atkārtoti
+                logger.warning("Objekts %s neatbilst savam SHA-256, tas tiek uzrakstīts no jauna", obj.name)
+                obj.unlink()
+            if not obj.exists():
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                if data is not None:
+                    tmp = temp_path_for(obj)
+                    with open(tmp, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp, obj)
+                else:
+                    _link_or_copy(source, obj)
+                _make_read_only(obj)
+            _link_or_copy(obj, self.path / name)
+        self.files[name] = {"sha256": digest, "size": size}
+
+    def add_bytes(self, name: str, data: bytes):
+        self._add_object(name, _sha256_bytes(data), len(data), data=data)
+
+    def add_json(self, name: str, data: Any):
+        """Saglabā JSON tieši tādā formātā kā līdz šim (`indent=2`)."""
+        self.add_bytes(name, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def add_file(self, name: str, source: Path, sha256: Optional[str] = None, move: bool = False):
+        """Pievieno failu; ar `move=True` avots tiek izdzēsts pēc veiksmīga `commit`."""
+        source = Path(source)
+        self._add_object(name, sha256 or _sha256_file(source), source.stat().st_size, source=source)
+        if move:
+            self._consumed.append(source)
+
+    def commit(self, metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """Uzraksta manifestu, padara versiju par aktuālo un izdzēš liekās vecās versijas.
+
+        Ja CURRENT jau norāda uz jaunāku versiju, tā netiek nomainīta.
+        """
+        manifest = {
+            "version": self.name,
+            "safe_title": self.safe_title,
+            "created_at": time.time(),
+            "files": self.files,
+            "metadata": metadata or {},
+        }
+        # Manifests padara versiju redzamu `prune`, tāpēc arī tas tiek rakstīts zem nosaukuma slēdzenes
+        with self.store.title_lock(self.safe_title):
+            _write_atomic(self.path / MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+            current = self.store.current(self.safe_title)
+            # Paralēli apstrādāts tā paša likuma fails var būt jau aktivizējis jaunāku versiju
+            if current is None or current < self.name:
+                self.store.activate(self.safe_title, self.name)
+            else:
+                logger.info("Versija %s/%s saglabāta, aktuālā paliek jaunākā %s", self.safe_title, self.name, current)
+            self.committed = True  # No šī brīža versija ir redzama, `abort` to vairs nedzēš
+            if self.store.keep_versions:
+                self.store.prune(self.safe_title, self.store.keep_versions)
+        for source in self._consumed:
+            try:
+                source.unlink()
+            except FileNotFoundError:
+                pass
+        return self.path
+
+    def abort(self):
+        """Izdzēš nepabeigto versiju un tikai tai piederošos objektus; avota faili paliek."""
+        if self.committed:
+            return
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.store.collect_objects(self.files.values())
+
+
+# ------------------------------------------------------------
+#  Glabātuve
+# ------------------------------------------------------------
+
+class OutputStore:
+    """Nemainīgas rezultātu versijas katram likumam un to "skats" plakanajās mapēs."""
+
+    def __init__(self, root: Optional[Path] = None, views: Optional[Dict[str, Path]] = None,
+                 keep_versions: Optional[int] = None):
+        self.root = Path(root or path_config.versions_dir)
+        # Paplašinājums -> mape, kurā glabājas aktuālās versijas faili
+        self.views = views if views is not None else {
+            ".json": path_config.processed_json_dir,
+            ".pdf": path_config.processed_pdfs_dir,
+        }
+        self.keep_versions = path_config.output_keep_versions if keep_versions is None else keep_versions
+        # Pavedieni vienā procesā: objektu izveide/atbrīvošana un katra nosaukuma CURRENT maiņa
+        self.objects_lock = threading.RLock()
+        self._title_locks: Dict[str, threading.Lock] = {}
+        self._title_locks_guard = threading.Lock()
+
+    def title_lock(self, safe_title: str) -> threading.Lock:
+        with self._title_locks_guard:
+            return self._title_locks.setdefault(safe_title, threading.Lock())
+
+    def object_path(self, digest: str, suffix: str = "") -> Path:
+        return self.root / OBJECTS_DIR / digest[:2] / f"{digest}{suffix}"
+
+    def title_dir(self, safe_title: str) -> Path:
+        return self.root / safe_title
+
+    def versions(self, safe_title: str) -> List[str]:
+        """Pabeigtās versijas, vecākā pirmā."""
+        title_dir = self.title_dir(safe_title)
+        if not title_dir.is_dir():
+            return []
+        return sorted(p.name for p in title_dir.iterdir() if (p / MANIFEST_FILE).exists())
+
+    def current(self, safe_title: str) -> Optional[str]:
+        try:
+            return (self.title_dir(safe_title) / CURRENT_FILE).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def manifest(self, safe_title: str, version: str) -> Dict[str, Any]:
+        with open(self.title_dir(safe_title) / version / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def begin(self, safe_title: str) -> PendingVersion:
+        """Rezervē nākamo versijas numuru (mkdir ir atomārs arī vairākiem darbiniekiem)."""
+        title_dir = self.title_dir(safe_title)
+        title_dir.mkdir(parents=True, exist_ok=True)
+        existing = [int(p.name) for p in title_dir.iterdir() if p.is_dir() and p.name.isdigit()]
+        number = max(existing, default=0) + 1
+        while True:
+            path = title_dir / f"{number:06d}"
+            try:
+                path.mkdir()
+                return PendingVersion(self, safe_title, path)
+            except FileExistsError:
+                number += 1
+
+    def activate(self, safe_title: str, version: str):
+        """Padara `version` par aktuālo: atjauno skata failus un CURRENT rādītāju."""
+        version_dir = self.title_dir(safe_title) / version
+        manifest = self.manifest(safe_title, version)
+        for name in manifest["files"]:
+            view_dir = self.views.get(Path(name).suffix)
+            if view_dir is None:
+                continue
+            view_dir.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(version_dir / name, view_dir / name)
+            # Kopīgais objekts var būt vecs; skata lasītāji meklē jaunāko failu pēc mtime
+            os.utime(view_dir / name)
+        _write_atomic(self.title_dir(safe_title) / CURRENT_FILE, version + "\n")
+
+    def prune(self, safe_title: str, keep: int) -> List[str]:
+        """Izdzēš vecākās versijas, atstājot `keep` jaunākās un aktuālo."""
+        versions = self.versions(safe_title)
+        current = self.current(safe_title)
+        removed = []
+        for version in versions[:-keep] if keep > 0 else []:
+            if version == current:
+                continue
+            files = self.manifest(safe_title, version)["files"]
+            shutil.rmtree(self.title_dir(safe_title) / version, ignore_errors=True)
+            self.collect_objects({"sha256": info["sha256"], "name": name} for name, info in files.items())
+            removed.append(version)
+        if removed:
+            logger.info("Dzēstas vecās versijas (%s): %s", safe_title, ", ".join(removed))
+        return removed
+
+    def collect_objects(self, files):
+        """Atbrīvo objektus, uz kuriem vairs nav citu saišu kā pašā glabātuvē."""
+        with self.objects_lock:
+            for info in files:
+                digest = info["sha256"]
+                for obj in (self.object_path(digest).parent).glob(f"{digest}*"):
+                    try:
+                        if obj.stat().st_nlink <= 1:
+                            obj.unlink()
+                    except FileNotFoundError:
+                        pass
+
+    def titles(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and p.name != OBJECTS_DIR)
+
+
+output_store = OutputStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apstrādes rezultātu versijas")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="Likuma versijas")
+    p_list.add_argument("name", help="Likuma faila nosaukums bez paplašinājuma")
+    p_activate = sub.add_parser("activate", help="Padarīt versiju par aktuālo")
+    p_activate.add_argument("name")
+    p_activate.add_argument("version")
+    p_prune = sub.add_parser("prune", help="Dzēst vecās versijas visiem likumiem")
+    p_prune.add_argument("--keep", type=int, default=path_config.output_keep_versions)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = output_store.current(args.name)
+        for version in output_store.versions(args.name):
+            manifest = output_store.manifest(args.name, version)
+            created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(manifest["created_at"]))
+            files = ", ".join(f"{name} ({info['sha256'][:8]})" for name, info in manifest["files"].items())
+            print(f"{'*' if version == current else ' '} {version}  {created}  {files}")
+    elif args.command == "activate":
+        output_store.activate(args.name, args.version)
+        print(f"Aktuālā versija: {args.version}")
+    else:
+        for title in output_store.titles():
+            for version in output_store.prune(title, args.keep):
+                print(f"{title}: dzēsta {version}")
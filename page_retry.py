@@ -0,0 +1,417 @@
+"""page_retry.py
+
+Lapu līmeņa iznākumi un neveiksmīgo lapu atkārtota ekstrakcija.
+
+`process_pdf_to_structured_data` katrai lapai pieraksta iznākumu (`ok`,
+`empty` vai `failed` ar kļūdas tekstu un izmantoto ekstraktoru), un
+neveiksmīgās lapas daļējie ieraksti tiek atsaukti. `run_processing_for_list`
+šos iznākumus saglabā blakus izvadei::
+
+    processed_pages/<nosaukums>.pages.json
+        {"law_title": …, "source_sha256": …, "pdf_path": …, "page_count": 63,
+         "pages": [{"page": 1, "status": "ok", "entries": 12, "extractor": "pymupdf"}, …]}
+
+Agrāk viena bojāta lapa nozīmēja visa dokumenta atkārtotu apstrādi. Šeit
+atkārtoti tiek ekstrahētas tikai neveiksmīgās lapas ar alternatīvām
+stratēģijām no `extractor_compare` (`page_retry_strategies`: cits PyMuPDF
+teksta režīms, lapa bez pamatteksta izgriešanas, pdfplumber). Pirmās
+stratēģijas, kas atgriež tekstu, rindas tiek parsētas ar
+`legal_parser.parse_line` iepriekšējā ieraksta kontekstā un iesprausti
+esošajā izvadē lapu secībā: sākuma turpinājuma teksts tiek pievienots
+iepriekšējam ierakstam, jaunie ieraksti – pirms nākamās lapas ierakstiem.
+
+Lapas pēc neveiksmīgās sākotnēji tika parsētas ar novecojušu kontekstu
+(pants/punkts), un to sākuma turpinājums tika pievienots ierakstam pirms
+neveiksmīgās lapas. Tāpēc līdz lapai ar nākamo panta virsrakstu tās tiek
+pārparsētas ar sākotnējo ekstraktoru, bet pievienotais turpinājums
+(iznākuma `continued`) tiek atdalīts. Rezultāts tiek saglabāts kā jauna
+izvades versija, un atsauču grafs un eksporti tiek pārbūvēti.
+Atkārtotajiem ierakstiem nav `bboxes` (teksta režīmi tos nedod).
+
+Lietošana no komandrindas::
+
+    python page_retry.py list                    # dokumenti ar neveiksmīgām lapām
+    python page_retry.py retry Darba_likums
+    python page_retry.py retry Darba_likums --pages 12 13 --strategies pdfplumber
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import time
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import path_config
+from legal_parser import STOP_KEYWORDS, parse_line
+from output_versions import temp_path_for
+
+__all__ = [
+    "page_report_path_for",
+    "write_page_report",
+    "load_page_report",
+    "failed_pages",
+    "resync_range",
+    "retry_failed_pages",
+]
+
+logger = logging.getLogger(__name__)
+
+REPORT_SUFFIX = ".pages.json"
+# Ekstraktors lapas iznākumā -> tā pati ekstrakcija `extractor_compare` stratēģijās
+ORIGINAL_STRATEGIES = {"pymupdf": "pymupdf_blocks", "pdfplumber": "pdfplumber"}
+
+
+def page_report_path_for(safe_title: str) -> Path:
+    return path_config.page_report_dir / f"{safe_title}{REPORT_SUFFIX}"
+
+
+def write_page_report(safe_title: str, report: Dict[str, Any]) -> Path:
+    path = page_report_path_for(safe_title)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path_for(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def load_page_report(safe_title: str) -> Dict[str, Any]:
+    with open(page_report_path_for(safe_title), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def failed_pages(report: Dict[str, Any]) -> List[int]:
+    return [outcome["page"] for outcome in report.get("pages", []) if outcome.get("status") == "failed"]
+
+
+# ------------------------------------------------------------
+#  Lapas ekstrakcija un parsēšana
+# ------------------------------------------------------------
+
+def extract_page(doc, page_number: int, strategies: Sequence[str], plumber_doc_factory) -> Tuple[Optional[str], str, Dict[str, str]]:
+    """Izmēģina stratēģijas pēc kārtas; atgriež (stratēģija, teksts, kļūdas)."""
+    from extractor_compare import STRATEGIES, PageContext
+    from layout_template import get_template
+
+    page = doc.load_page(page_number - 1)
+    errors: Dict[str, str] = {}
+    try:
+        clip = get_template(doc).clip_for(page)
+    except Exception as e:
+        # Tieši izgriešana varēja būt kļūdas cēlonis – stratēģijas strādā ar visu lapu
+        errors["clip"] = f"{type(e).__name__}: {e}"
+        clip = None
+    ctx = PageContext(page, clip, plumber_doc_factory)
+    for name in strategies:
+        try:
+            text = STRATEGIES[name](ctx)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            continue
+        if text and text.strip():
+            return name, text, errors
+        errors[name] = "tukšs teksts"
+    return None, "", errors
+
+
+def parse_page_text(text: str, context: Dict[str, Optional[str]],
+                    law_title: str) -> Tuple[List[str], List[Dict[str, Any]], bool]:
+    """Sadala lapas tekstu sākuma turpinājuma rindās un jaunos ierakstos.
+
+    Trešā vērtība ir True, ja lapā atrasts kāds no `STOP_KEYWORDS`.
+    """
+    leading: List[str] = []
+    entries: List[Dict[str, Any]] = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if any(keyword in line.lower() for keyword in STOP_KEYWORDS):
+            return leading, entries, True
+        entry = parse_line(line, context, law_title)
+        if entry is not None:
+            entries.append(entry)
+        elif entries:
+            entries[-1]["content"] += " " + line
+        else:
+            leading.append(line)
+    return leading, entries, False
+
+
+def resync_range(outcomes: Dict[int, Dict[str, Any]], entries: List[Dict[str, Any]], page: int) -> List[int]:
+    """Neveiksmīgā lapa un nākamās lapas līdz tai, kurā sākas jauns pants.
+
+    Lapas pēc neveiksmīgās tika parsētas ar novecojušu konteksta (pants/punkts),
+    tāpēc to ieraksti ir pareizi tikai no nākamā panta virsraksta.
+    """
+    headers = {entry.get("page_start") for entry in entries if entry.get("point") is None}
+    pages = [page]
+    following = page + 1
+    while following in outcomes:
+        pages.append(following)
+        if outcomes[following].get("status") != "failed" and following in headers:
+            break
+        following += 1
+    return pages
+
+
+def _continuation_chars(outcomes: Dict[int, Dict[str, Any]], pages: Iterable[int]) -> int:
+    """Rakstzīmes, ko lapas `pages` pievienoja ierakstam, kas bija atvērts pirms tām."""
+    chars = 0
+    for page in pages:
+        outcome = outcomes.get(page)
+        if outcome is None:
+            break
+        if outcome.get("status") == "failed":
+            continue
+        chars += outcome.get("continued", 0)
+        if outcome.get("entries"):
+            break  # Tālākais turpinājums tika pievienots šīs lapas ierakstiem
+    return chars
+
+
+def detach_continuation(entry: Dict[str, Any], chars: int, from_page: int) -> Tuple[str, List[list]]:
+    """Atdala no ieraksta beigām turpinājumu, kas sākas lapā `from_page`; atgriež (teksts, bboxes)."""
+    tail = entry["content"][len(entry["content"]) - chars:] if chars else ""
+    if chars:
+        entry["content"] = entry["content"][:-chars]
+    bboxes = entry.get("bboxes", [])
+    entry["bboxes"] = [bbox for bbox in bboxes if bbox[0] < from_page]
+    entry["page_end"] = max([entry["page_start"]] + [bbox[0] for bbox in entry["bboxes"]])
+    return tail, [bbox for bbox in bboxes if bbox[0] >= from_page]
+
+
+def _context_of(entry: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    return {key: entry.get(key) if entry else None for key in ("article", "point", "subpoint")}
+
+
+# ------------------------------------------------------------
+#  Atkārtošana un saglabāšana
+# ------------------------------------------------------------
+
+def _save_entries(safe_title: str, entries: List[Dict[str, Any]], report: Dict[str, Any],
+                  pdf_path: Path, retried: List[int]) -> Dict[str, Any]:
+    """Saglabā salaboto izvadi tāpat kā `run_processing_for_list`."""
+    from output_versions import output_store
+
+    json_filename = f"{safe_title}.json"
+    metadata: Dict[str, Any] = {}
+    if path_config.versioned_output:
+        version = output_store.begin(safe_title)
+        try:
+            version.add_json(json_filename, entries)
+            version.add_file(f"{safe_title}.pdf", pdf_path, report.get("source_sha256"))
+            version.commit({"source_name": report.get("source_name"), "entry_count": len(entries),
+                            "page_retry": retried})
+        except BaseException:
+            version.abort()
+            raise
+        metadata["output_version"] = version.name
+    else:
+        from main import backup_existing_file, open_replacing
+
+        json_path = path_config.processed_json_dir / json_filename
+        backup_existing_file(json_path)
+        with open_replacing(json_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+
+    law_title = report.get("law_title")
+    if path_config.use_entry_store:
+        from entry_store import entry_store
+
+        metadata["entry_store_version"] = entry_store.add_version(
+            law_title, entries, source_name=report.get("source_name"), source_sha256=report.get("source_sha256"),
+        )
+    if path_config.build_cross_references:
+        from cross_references import CrossReferenceIndex, refs_path_for
+
+        refs = CrossReferenceIndex.from_entries(law_title, entries)
+        refs.save(refs_path_for(safe_title))
+        metadata["cross_references"] = {"edges": refs.edge_count, "unresolved": refs.unresolved}
+    if path_config.export_parquet:
+        from columnar_export import write_entries as write_parquet
+
+        write_parquet(entries, path_config.parquet_dir / f"{safe_title}.parquet")
+    if path_config.export_blocks:
+        from block_store import output_path_for, write_entries as write_blocks
+
+        write_blocks(entries, output_path_for(safe_title, path_config.block_codec),
+                     path_config.block_codec, path_config.block_entries)
+    return metadata
+
+
+def retry_failed_pages(safe_title: str, pages: Optional[Sequence[int]] = None,
+                       strategies: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Atkārtoti ekstrahē neveiksmīgās lapas un iesprauž tās esošajā izvadē.
+
+    Neveiksmīgajām lapām tiek izmēģinātas `strategies`; nākamās lapas līdz
+    jaunam pantam tiek pārparsētas ar sākotnējo ekstraktoru pareizajā
+    kontekstā. Atgriež kopsavilkumu: `retried` (lapa -> stratēģija),
+    `resynced` (pārparsētās nākamās lapas), `still_failed` (lapa -> kļūdas)
+    un `entries_added`.
+    """
+    import fitz  # PyMuPDF
+
+    from catalog import catalog
+
+    report = load_page_report(safe_title)
+    failed = failed_pages(report)
+    if pages:
+        skipped = sorted(set(pages) - set(failed))
+        if skipped:
+            logger.warning("Lapas nav atzīmētas kā neveiksmīgas, izlaistas: %s", skipped)
+        failed = [page for page in failed if page in set(pages)]
+    strategies = list(strategies or path_config.page_retry_strategies)
+    summary: Dict[str, Any] = {"retried": {}, "resynced": [], "still_failed": {}, "entries_added": 0}
+    if not failed:
+        return summary
+
+    json_path = path_config.processed_json_dir / f"{safe_title}.json"
+    with open(json_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    entries_before = len(entries)
+    pdf_path = Path(report.get("pdf_path") or path_config.processed_pdfs_dir / f"{safe_title}.pdf")
+    law_title = report.get("law_title") or (entries[0]["law_title"] if entries else safe_title)
+    outcomes = {outcome["page"]: outcome for outcome in report.get("pages", [])}
+
+    started_at = time.time()
+    plumber_doc = None
+
+    def open_plumber():
+        nonlocal plumber_doc
+        if plumber_doc is None:
+            try:
+                import pdfplumber
+
+                plumber_doc = pdfplumber.open(str(pdf_path))
+            except Exception:
+                return None
+        return plumber_doc
+
+    doc = fitz.open(str(pdf_path))
+    try:
+        done = set()
+        for first in failed:
+            if first in done:
+                continue
+            span = resync_range(outcomes, entries, first)
+            done.update(span)
+            kept = [entry for entry in entries if entry.get("page_start") not in span]
+            insert_at = next((i for i, entry in enumerate(kept) if (entry.get("page_start") or 0) > first), len(kept))
+            previous = kept[insert_at - 1] if insert_at else None
+            # Pēdējā ierakstā līdz diapazona beigām var būt nākamo lapu turpinājums – to pārnesam
+            old_last = next((entry for entry in reversed(entries) if (entry.get("page_start") or 0) <= span[-1]), None)
+            tail, tail_bboxes = "", []
+            if old_last is not None:
+                tail, tail_bboxes = detach_continuation(
+                    old_last, _continuation_chars(outcomes, count(span[-1] + 1)), span[-1] + 1)
+            if previous is not None:
+                detach_continuation(previous, _continuation_chars(outcomes, span[1:]), span[0])
+            context = _context_of(previous)
+            spliced: List[Dict[str, Any]] = []
+            for page in span:
+                outcome = outcomes[page]
+                was_failed = outcome.get("status") == "failed"
+                if was_failed and page in failed:
+                    chain = strategies
+                else:
+                    chain = [ORIGINAL_STRATEGIES.get(outcome.get("extractor"), "pymupdf_blocks")]
+                strategy, text, errors = extract_page(doc, page, chain, open_plumber)
+                if strategy is None:
+                    outcome.update(status="failed", entries=0, retry_errors=errors)
+                    outcome.pop("continued", None)
+                    summary["still_failed"][page] = errors
+                    continue
+                leading, page_entries, stopped = parse_page_text(text, context, law_title)
+                target = spliced[-1] if spliced else previous
+                continued = 0
+                if leading and target is not None:
+                    before = len(target["content"])
+                    target["content"] = " ".join([target["content"], *leading]).strip()
+                    target["page_end"] = max(target.get("page_end") or page, page)
+                    continued = len(target["content"]) - before
+                for entry in page_entries:
+                    entry.update(page_start=page, page_end=page, bboxes=[])
+                spliced.extend(page_entries)
+                outcome.update(status="retried" if was_failed else ("ok" if page_entries or continued else "empty"),
+                               entries=len(page_entries), extractor=strategy)
+                outcome.pop("retry_errors", None)
+                outcome.pop("continued", None)
+                if continued:
+                    outcome["continued"] = continued
+                if was_failed:
+                    summary["retried"][page] = strategy
+                else:
+                    summary["resynced"].append(page)
+                if stopped:
+                    break
+            target = spliced[-1] if spliced else previous
+            if target is not None and (tail or tail_bboxes):
+                target["content"] += tail
+                target["bboxes"] = target.get("bboxes", []) + tail_bboxes
+                target["page_end"] = max([target["page_end"]] + [bbox[0] for bbox in tail_bboxes])
+            entries = kept[:insert_at] + spliced + kept[insert_at:]
+    finally:
+        doc.close()
+        if plumber_doc is not None:
+            plumber_doc.close()
+
+    summary["entries_added"] = len(entries) - entries_before
+    report["pages"] = [outcomes[page] for page in sorted(outcomes)]
+    if summary["retried"]:
+        metadata = _save_entries(safe_title, entries, report, pdf_path, sorted(summary["retried"]))
+        metadata["page_retry"] = {str(page): strategy for page, strategy in summary["retried"].items()}
+        metadata["failed_pages"] = failed_pages(report)
+        finished_at = time.time()
+        try:
+            catalog.record({
+                "source_path": str(pdf_path.resolve()),
+                "source_name": report.get("source_name") or pdf_path.name,
+                "source_sha256": report.get("source_sha256"),
+                "law_title": law_title,
+                "safe_title": safe_title,
+                "json_path": str(json_path.resolve()),
+                "pdf_path": str(pdf_path.resolve()),
+                "page_count": report.get("page_count"),
+                "entry_count": len(entries),
+                "started_at": started_at,
+                "finished_at": finished_at,
+                "total_seconds": finished_at - started_at,
+                "status": "ok",
+                "metadata": metadata,
+            })
+        except Exception as e:
+            logger.error("Neizdevās ierakstīt katalogā: %s", e)
+        write_page_report(safe_title, report)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Neveiksmīgo lapu atkārtota ekstrakcija")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Dokumenti ar neveiksmīgām lapām")
+    p_retry = sub.add_parser("retry", help="Atkārtoti ekstrahēt neveiksmīgās lapas")
+    p_retry.add_argument("name", help="Likuma faila nosaukums bez paplašinājuma")
+    p_retry.add_argument("--pages", type=int, nargs="+", help="Tikai šīs lapas (1-bāzētas)")
+    p_retry.add_argument("--strategies", help="Komatiem atdalīts stratēģiju saraksts")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "list":
+        for path in sorted(path_config.page_report_dir.glob(f"*{REPORT_SUFFIX}")):
+            with open(path, "r", encoding="utf-8") as f:
+                pages = failed_pages(json.load(f))
+            if pages:
+                print(f"{path.name[:-len(REPORT_SUFFIX)]}: {', '.join(map(str, pages))}")
+    else:
+        result = retry_failed_pages(args.name, args.pages,
+                                    args.strategies.split(",") if args.strategies else None)
+        for page, strategy in sorted(result["retried"].items()):
+            print(f"{page}. lapa: {strategy}")
+        for page, errors in sorted(result["still_failed"].items()):
+            print(f"{page}. lapa joprojām neizdevās: {'; '.join(f'{k}: {v}' for k, v in errors.items())}")
+        print(f"Pievienoti ieraksti: {result['entries_added']}")
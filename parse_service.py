@@ -0,0 +1,301 @@
+"""parse_service.py
+
+Lokāls HTTP serviss PDF parsēšanai ar "siltiem" darbinieku procesiem.
+
+Katra īslaicīga `main.py` palaišana maksā par PyMuPDF, pdfplumber, pydantic
+un žurnāla iestatīšanas importu, pirms tiek apstrādāts kaut viens PDF. Šis
+serviss (tikai standarta bibliotēka) tur gatavu `SupervisedWorker` procesu
+kopu, kuros `pdf_processor` jau ir importēts, tāpēc citi lokāli servisi var
+parsēt likumus ar milisekunžu, nevis sekunžu papildu izmaksām.
+
+Galapunkti:
+
+* ``POST /parse`` – ķermenī PDF baiti (tie tiek nodoti darbiniekam atmiņā,
+  bez pagaidu faila). Atbilde ir JSON
+  ``{"law_title": ..., "entries": [...], "stats": {...}}`` vai, ja norādīts
+  ``?format=jsonl`` vai ``Accept: application/x-ndjson``, JSON Lines straume
+  ar HTTP/1.1 chunked kodējumu: pirmā rinda – galvene ar `law_title`, tad
+  pa vienam ierakstam rindā, tiklīdz parseris to pabeidzis, un pēdējā rinda
+  – ``{"stats": ..., "processing_time_ms": ..., "queue_wait_ms": ...}`` vai
+  ``{"error": ..., "report": ...}``, ja apstrāde neizdevās pēc straumes sākuma.
+* ``GET /stats`` – rindas garums, aizņemtie darbinieki un latentuma statistika.
+* ``GET /health`` – vienkārša dzīvības pārbaude.
+
+Palaišana::
+
+    python parse_service.py --port 8765 --workers 3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from cancellation import CancellationToken
+from config import path_config
+from supervisor import SupervisedWorker
+
+__all__ = [
+    "WorkerPool",
+    "ParseService",
+    "serve",
+]
+
+
+class WorkerPool:
+    """Fiksēta izmēra iepriekš palaistu `SupervisedWorker` procesu kopa."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: "queue.Queue[SupervisedWorker]" = queue.Queue()
+        self._workers = [SupervisedWorker() for _ in range(size)]
+        self._lock = threading.Lock()
+        self.waiting = 0  # pieprasījumi, kas gaida brīvu darbinieku
+        self.busy = 0
+
+    def start(self):
+        """Palaiž visus darbiniekus, lai imports notiktu pirms pirmā pieprasījuma."""
+        for worker in self._workers:
+            worker.start()
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+    def run(self, pdf_path: str, fitz_only: bool = False, pdf_stream: Optional[bytes] = None,
+            on_entry=None, cancel_token=None):
+        """Izpilda parsēšanu pirmajā brīvajā darbiniekā; atgriež (rezultāts, gaidīšanas laiks).
+
+        Argumenti tiek nodoti `SupervisedWorker.process`.
+        """
+        with self._lock:
+            self.waiting += 1
+        wait_start = time.perf_counter()
+        worker = self._idle.get()
+        queue_wait = time.perf_counter() - wait_start
+        with self._lock:
+            self.waiting -= 1
+            self.busy += 1
+        try:
+            result = worker.process(pdf_path, fitz_only=fitz_only, cancel_token=cancel_token,
+                                    pdf_stream=pdf_stream, on_entry=on_entry)
+            # Ja darbinieks tika nogalināts (taimauts), to iesildām no jauna uzreiz
+            worker.start()
+            return result, queue_wait
+        finally:
+            with self._lock:
+                self.busy -= 1
+            self._idle.put(worker)
+
+
+class ParseService:
+    """Servisa stāvoklis: darbinieku kopa un latentuma statistika."""
+
+    def __init__(self, workers: int, latency_window: int = 1000):
+        self.pool = WorkerPool(workers)
+        self.started_at = time.time()
+        self._latencies = deque(maxlen=latency_window)
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool):
+        with self._stats_lock:
+            self.requests += 1
+            if not ok:
+                self.failures += 1
+            self._latencies.append(latency)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            requests, failures = self.requests, self.failures
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "workers": self.pool.size,
+            "busy_workers": self.pool.busy,
+            "queue_depth": self.pool.waiting,
+            "requests": requests,
+            "failures": failures,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "window": len(latencies),
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "LikumuParseService/1.0"
+    # Chunked kodējums un keep-alive ir tikai HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    service: ParseService  # tiek iestatīts `serve` funkcijā
+
+    def log_message(self, format, *args):
+        # Nepiesārņojam stderr ar katru pieprasījumu
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def _write_line(self, payload: Dict[str, Any]):
+        self._write_chunk((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def _read_body(self, length: int) -> bytes:
+        chunks = []
+        remaining = length
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/stats":
+            self._send_json(200, self.service.stats())
+        else:
+            self._send_json(404, {"error": "Nav atrasts"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/parse":
+            # Nenolasītais ķermenis sabojātu nākamo pieprasījumu tajā pašā savienojumā
+            self.close_connection = True
+            self._send_json(404, {"error": "Nav atrasts"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {"error": "Tukšs pieprasījums – gaidīti PDF baiti"})
+            return
+        if length > path_config.max_file_size_mb * 1024 * 1024:
+            self.close_connection = True
+            self._send_json(413, {"error": f"Fails ir pārāk liels (> {path_config.max_file_size_mb}MB)"})
+            return
+
+        query = parse_qs(url.query)
+        want_jsonl = (
+            query.get("format", [""])[0] == "jsonl"
+            or "application/x-ndjson" in (self.headers.get("Accept") or "")
+        )
+        fitz_only = query.get("fitz_only", ["0"])[0] in ("1", "true")
+
+        start = time.perf_counter()
+        body = self._read_body(length)
+        streaming = False
+        client_gone = CancellationToken()
+
+        def on_entry(entry, page):
+            # JSON Lines: atbilde sākas ar pirmo pabeigto ierakstu, un katrs nākamais
+            # tiek nosūtīts, tiklīdz darbinieks to pabeidzis
+            nonlocal streaming
+            if client_gone.cancelled:
+                return
+            try:
+                if not streaming:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    self._write_line({"law_title": entry.get("law_title")})
+                    streaming = True
+                self._write_line(entry)
+            except OSError:
+                # Klients atvienojās – darbinieks apstājas pie nākamās lapas
+                client_gone.cancel()
+                self.close_connection = True
+
+        result, queue_wait = self.service.pool.run(
+            "upload.pdf", fitz_only=fitz_only, pdf_stream=body,
+            on_entry=on_entry if want_jsonl else None, cancel_token=client_gone,
+        )
+        latency = time.perf_counter() - start
+        ok = result.status == "ok"
+        self.service.record(latency, ok)
+        if client_gone.cancelled:
+            return
+
+        if streaming:
+            timing = {"processing_time_ms": round(latency * 1000, 1), "queue_wait_ms": round(queue_wait * 1000, 1)}
+            try:
+                if ok:
+                    stats = dict(result.stats, cpu_seconds=result.cpu_seconds, peak_rss_mb=result.peak_rss_mb)
+                    self._write_line({"stats": stats, **timing})
+                else:
+                    self._write_line({"error": result.error, "report": result.report(), **timing})
+                self._write_chunk(b"")
+            except OSError:
+                self.close_connection = True
+            return
+
+        # Vēl nekas nav nosūtīts (ar JSON Lines statuss "ok" nozīmē vismaz vienu ierakstu)
+        timing_headers = {
+            "X-Processing-Time-Ms": f"{latency * 1000:.1f}",
+            "X-Queue-Wait-Ms": f"{queue_wait * 1000:.1f}",
+        }
+        if not ok:
+            status = 504 if result.status == "timeout" else 422
+            self._send_json(status, {"error": result.error, "report": result.report()}, timing_headers)
+            return
+        stats = dict(result.stats, cpu_seconds=result.cpu_seconds, peak_rss_mb=result.peak_rss_mb)
+        self._send_json(200, {"law_title": result.law_title, "entries": result.entries, "stats": stats},
+                        timing_headers)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, workers: Optional[int] = None):
+    """Palaiž servisu un bloķē līdz Ctrl+C."""
+    service = ParseService(workers or path_config.max_concurrent_files)
+    service.pool.start()
+    handler = type("Handler", (_Handler,), {"service": service})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    print(f"Parsēšanas serviss klausās uz http://{host}:{port} ({service.pool.size} darbinieki)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.pool.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokāls PDF parsēšanas HTTP serviss")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Darbinieku procesu skaits (noklusējums: max_concurrent_files)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
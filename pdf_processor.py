@@ -3,17 +3,20 @@
 import fitz
 import re
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from queue import Queue
 import logging
-from alt_extractor import get_page_texts, extract_law_title_pdfplumber, texts_are_similar
+from alt_extractor import PageTextWindow, get_page_texts, extract_law_title_pdfplumber, texts_are_similar
 from config import path_config
-from legal_parser import (
-    ARTICLE_PATTERN,
-    POINT_PATTERN_PAREN,
-    POINT_SUBPOINT_PATTERN_DOT,
-    STOP_KEYWORDS,
-)
+from extractor_selection import choose_extractor
+from layout_template import get_template
+from memory_stats import WorkingSetTracker
+from progress import ProgressEvent, emit_progress
+from logging_setup import wants_line_events
+from legal_parser import STOP_KEYWORDS, parse_line
+
+logger = logging.getLogger(__name__)
 
 def log_item(queue, text, tag):
     if queue:
@@ -54,53 +57,161 @@ def extract_law_title(page: fitz.Page, log_queue: Optional[Queue] = None) -> Opt
     
     return None
 
-def process_pdf_to_structured_data(pdf_path: str, log_queue: Optional[Queue] = None) -> Tuple[Optional[str], List[Dict[str, Any]]]:
-    """Process PDF with improved error handling and performance."""
+def process_pdf_to_structured_data(pdf_path: str, log_queue: Optional[Queue] = None,
+                                   on_entry: Optional[Callable[[Dict[str, Any], int], None]] = None,
+                                   stats: Optional[Dict[str, Any]] = None,
+                                   cancel_token=None,
+                                   pdf_stream: Optional[bytes] = None) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Process PDF with improved error handling and performance.
+
+    If ``on_entry`` is given, it is called as ``on_entry(entry, page)`` with
+    every entry once the entry is complete (i.e. no more continuation text
+    can be appended to it), in the same order as the returned list; ``page``
+    is the 1-based page where the entry starts. This allows write-through
+    output and inline validation.
+
+    Every entry records where it came from: ``page_start`` and ``page_end``
+    (1-based) and ``bboxes``, a list of ``[page, x0, y0, x1, y1]`` text
+    blocks from ``page.get_text("blocks")``. Entries recovered from the
+    pdfplumber text only have the page range. See ``source_region``.
+
+    If ``stats`` is given, it is filled with document metadata such as
+    ``page_count``, ``pages_processed`` and the peak working set.
+
+    With ``path_config.bounded_memory`` pdfplumber text is extracted on
+    demand and only the last ``page_window`` pages are kept; PyMuPDF's
+    resource store is emptied every ``page_window`` pages.
+
+    Every page gets an outcome record in ``stats["page_outcomes"]``
+    (``page``, ``status`` "ok"/"empty"/"failed", ``entries``, ``extractor``,
+    ``error`` and ``continued`` - characters appended to the entry that was
+    open when the page started). Whatever a failed page had added is rolled back, so
+    ``page_retry`` can later re-extract just that page and splice it in;
+    entries are therefore passed to ``on_entry`` at page boundaries.
+
+    ``cancel_token`` (see ``cancellation``) is checked before every page:
+    it blocks while paused and raises ``ProcessingCancelled`` once cancelled.
+
+    With ``pdf_stream`` the document is read from memory (e.g. an archive
+    member, see ``archive_source``) and ``pdf_path`` is only its name.
+    """
     doc = None
+    plumber_window = None
+    memory = WorkingSetTracker()
+    if stats is None:
+        stats = {}
     try:
-        doc = fitz.open(pdf_path)
-        # Iegūstam tekstu ar pdfplumber, ja funkcija ieslēgta konfigurācijā
-        plumber_pages = get_page_texts(pdf_path) if path_config.use_pdfplumber_fallback else []
+        # pdfplumber reads the same bytes through a BytesIO
+        source = pdf_stream if pdf_stream is not None else pdf_path
+        doc = fitz.open(stream=pdf_stream, filetype="pdf") if pdf_stream is not None else fitz.open(pdf_path)
+        stats["page_count"] = len(doc)
+        stats["pages_processed"] = 0
+        file_name = Path(pdf_path).name
         structured_data = []
         law_title = "Nezinams_likums"
 
+        page_outcomes: List[Dict[str, Any]] = []
+        stats["page_outcomes"] = page_outcomes
+        emitted = 0
+
+        # Katras rindas notikumus veidojam tikai tad, ja kāds tos lasa
+        queue_lines = wants_line_events(log_queue)
+        debug_lines = logger.isEnabledFor(logging.DEBUG)
+        trace_lines = queue_lines or debug_lines
+
+        def log_line(text: str, tag: str):
+            if queue_lines:
+                log_queue.put((text, tag))
+            if debug_lines:
+                logger.debug("%s", text.strip(), extra={"tag": tag})
+
+        def note_source(entry: Dict[str, Any], page_number: int, bbox=None):
+            entry["page_end"] = page_number
+            if bbox is not None:
+                region = [page_number, *(round(v, 1) for v in bbox)]
+                if not entry["bboxes"] or entry["bboxes"][-1] != region:
+                    entry["bboxes"].append(region)
+
+        def add_entry(entry: Dict[str, Any], page_number: int, bbox=None):
+            entry["page_start"] = entry["page_end"] = page_number
+            entry["bboxes"] = []
+            note_source(entry, page_number, bbox)
+            structured_data.append(entry)
+
+        def emit_completed(keep_open: int = 1):
+            # Ieraksts ir pabeigts, tiklīdz sācies nākamais; izsūtām tikai veiksmīgu lapu beigās
+            nonlocal emitted
+            end = len(structured_data) - keep_open
+            if on_entry:
+                for entry in structured_data[emitted:end]:
+                    on_entry(entry, entry["page_start"])
+            emitted = max(emitted, end)
+
         if len(doc) > 0:
             title_candidate = extract_law_title(doc[0], log_queue)
             if title_candidate:
                 law_title = title_candidate
             # Fallback: mēģinām atrast nosaukumu ar pdfplumber, ja PyMuPDF neatrada
             if law_title == "Nezinams_likums":
-                alt_title = extract_law_title_pdfplumber(pdf_path)
+                alt_title = extract_law_title_pdfplumber(source)
                 if alt_title:
                     law_title = alt_title
         
         log_item(log_queue, f"{law_title}\n", 'title')
-        time.sleep(0.1)  # Reduced delay for better performance
+
+        # Galvenes un kājenes apgabali, kas tiek izgriezti pirms rindu parsēšanas
+        template = get_template(doc)
+        stats["layout"] = template.describe()
+
+        # Iegūstam tekstu ar pdfplumber, ja funkcija ieslēgta konfigurācijā
+        # (adaptīvajā režīmā – tikai ja paraugs rāda, ka PyMuPDF nepietiek)
+        use_plumber = path_config.use_pdfplumber_fallback
+        if use_plumber and path_config.adaptive_extraction and len(doc) > 0:
+            decision = choose_extractor(doc, source, law_title, template)
+            stats["extractor"] = decision
+            use_plumber = decision["extractor"] == "pdfplumber"
+            log_item(log_queue, f"Ekstraktors: {decision['extractor']} ({decision['source']})\n", 'meta')
+        bounded = path_config.bounded_memory
+        if use_plumber and bounded:
+            plumber_window = PageTextWindow(source, path_config.page_window)
+            plumber_pages = []
+        else:
+            plumber_pages = get_page_texts(source) if use_plumber else []
+        if log_queue:
+            time.sleep(0.1)  # Pacing for the live GUI view only
 
         current_context = {"article": None, "point": None, "subpoint": None}
         
-        # Izmantojam centralizētos patternus no legal_parser
-        article_pattern = ARTICLE_PATTERN
-        point_pattern_paren = POINT_PATTERN_PAREN
-        point_subpoint_pattern_dot = POINT_SUBPOINT_PATTERN_DOT
-        
         stop_keywords = STOP_KEYWORDS
         stop_processing = False
 
-        for i, page in enumerate(doc):
+        for i in range(len(doc)):
             entries_before_page = len(structured_data)
             page_has_entries = False
+            extractor = "pymupdf"
+            # Iepriekšējā ieraksta stāvoklis, lai kļūdas gadījumā lapu varētu atsaukt
+            open_entry = structured_data[-1] if structured_data else None
+            open_state = (open_entry["content"], open_entry["page_end"], len(open_entry["bboxes"])) if open_entry else None
+            context_before = dict(current_context)
             if stop_processing: 
                 break
+            if cancel_token is not None:
+                cancel_token.check()
+            stats["pages_processed"] = i + 1
+            memory.sample()
+            if bounded and i and i % path_config.page_window == 0:
+                # Atbrīvojam iepriekšējo lapu fontus, attēlus u.c. MuPDF kešatmiņā
+                fitz.TOOLS.store_shrink(100)
+            page = doc.load_page(i)
                 
             log_item(log_queue, f"\n--- Lasa {i+1}. lapu ---\n", 'meta')
-            log_item(log_queue, "", "progress_update")
-            time.sleep(0.05)  # Reduced delay
+            emit_progress(log_queue, ProgressEvent("page", file_name, pages_done=i, page_count=len(doc),
+                                                   entries=len(structured_data)))
+            if log_queue:
+                time.sleep(0.05)  # Pacing for the live GUI view only
 
             try:
-                page_rect = page.rect
-                clip_rect = fitz.Rect(page_rect.x0 + 50, page_rect.y0 + 50, 
-                                    page_rect.x1 - 50, page_rect.y1 - 50)
+                clip_rect = template.clip_for(page)
                 
                 blocks = page.get_text("blocks", clip=clip_rect)
                 
@@ -118,120 +229,82 @@ def process_pdf_to_structured_data(pdf_path: str, log_queue: Optional[Queue] = N
                         if not line: 
                             continue
                         
-                        # Process different types of content
-                        new_entry = None
-                        
-                        article_match = article_pattern.match(line)
-                        if article_match:
-                            current_context = {
-                                "article": article_match.group(1).strip(), 
-                                "point": None, 
-                                "subpoint": None
-                            }
-                            content = article_match.group(2).strip()
-                            log_item(log_queue, f"{current_context['article']} {content}\n", 'article')
-                            new_entry = {
-                                "law_title": law_title, 
-                                "article": current_context["article"], 
-                                "point": None, 
-                                "subpoint": None, 
-                                "content": content
-                            }
-                        else:
-                            point_match_paren = point_pattern_paren.match(line)
-                            if point_match_paren and current_context["article"]:
-                                current_context["point"] = point_match_paren.group(1).strip()
-                                current_context["subpoint"] = None
-                                content = point_match_paren.group(2).strip()
-                                log_item(log_queue, f"({current_context['point']}) {content}\n", 'point')
-                                new_entry = {
-                                    "law_title": law_title, 
-                                    "article": current_context["article"], 
-                                    "point": current_context["point"], 
-                                    "subpoint": None, 
-                                    "content": content
-                                }
+                        # Tā pati rindas parsēšana kā lapu atkārtošanai (`page_retry`)
+                        new_entry = parse_line(line, current_context, law_title)
+                        if new_entry is None:
+                            # Continuation text
+                            if structured_data:
+                                if trace_lines:
+                                    log_line(f"{line} ", 'content')
+                                structured_data[-1]["content"] += " " + line
+                                note_source(structured_data[-1], i + 1, block[:4])
+                            continue
+                        if trace_lines:
+                            content = new_entry["content"]
+                            if new_entry["point"] is None:
+                                log_line(f"{new_entry['article']} {content}\n", 'article')
+                            elif new_entry["subpoint"] is not None:
+                                log_line(f"{new_entry['subpoint']}) {content}\n", 'subpoint')
+                            elif line.startswith("("):
+                                log_line(f"({new_entry['point']}) {content}\n", 'point')
                             else:
-                                point_subpoint_match = point_subpoint_pattern_dot.match(line)
-                                if point_subpoint_match and current_context["article"]:
-                                    content = point_subpoint_match.group(2).strip()
-                                    if not current_context["point"]:
-                                        current_context["point"] = point_subpoint_match.group(1).strip()
-                                        log_item(log_queue, f"{current_context['point']}) {content}\n", 'point')
-                                        new_entry = {
-                                            "law_title": law_title, 
-                                            "article": current_context["article"], 
-                                            "point": current_context["point"], 
-                                            "subpoint": None, 
-                                            "content": content
-                                        }
-                                    else:
-                                        current_context["subpoint"] = point_subpoint_match.group(1).strip()
-                                        log_item(log_queue, f"{current_context['subpoint']}) {content}\n", 'subpoint')
-                                        new_entry = {
-                                            "law_title": law_title, 
-                                            "article": current_context["article"], 
-                                            "point": current_context["point"], 
-                                            "subpoint": current_context["subpoint"], 
-                                            "content": content
-                                        }
-                                else:
-                                    # Continuation text
-                                    if structured_data and line:
-                                        log_item(log_queue, f"{line} ", 'content')
-                                        structured_data[-1]["content"] += " " + line
-                        
-                        if new_entry:
-                            if not new_entry["content"]: 
-                                new_entry["content"] = ""
-                            structured_data.append(new_entry)
-                            page_has_entries = True
+                                log_line(f"{new_entry['point']}) {content}\n", 'point')
+                        add_entry(new_entry, i + 1, block[:4])
+                        page_has_entries = True
                             
                 # ------------------------------------------------------------
                 #  Fallback: ja šai lapai netika pievienoti ieraksti, izmanto pdfplumber tekstu
                 # ------------------------------------------------------------
-                if path_config.use_pdfplumber_fallback and not page_has_entries:
-                    plumber_text = plumber_pages[i] if i < len(plumber_pages) else ""
+                if use_plumber and not page_has_entries:
+                    if plumber_window is not None:
+                        plumber_text = plumber_window.get(i)
+                    else:
+                        plumber_text = plumber_pages[i] if i < len(plumber_pages) else ""
                     for _line in plumber_text.split("\n"):
                         _line = _line.strip()
                         if not _line:
                             continue
-                        alt_new_entry = None
-                        art_m = article_pattern.match(_line)
-                        if art_m:
-                            current_context = {"article": art_m.group(1).strip(), "point": None, "subpoint": None}
-                            _content = art_m.group(2).strip()
-                            alt_new_entry = {"law_title": law_title, "article": current_context["article"], "point": None, "subpoint": None, "content": _content}
-                        else:
-                            paren_m = point_pattern_paren.match(_line)
-                            if paren_m and current_context["article"]:
-                                current_context["point"] = paren_m.group(1).strip()
-                                _content = paren_m.group(2).strip()
-                                alt_new_entry = {"law_title": law_title, "article": current_context["article"], "point": current_context["point"], "subpoint": None, "content": _content}
-                            else:
-                                dot_m = point_subpoint_pattern_dot.match(_line)
-                                if dot_m and current_context["article"]:
-                                    _content = dot_m.group(2).strip()
-                                    if not current_context["point"]:
-                                        current_context["point"] = dot_m.group(1).strip()
-                                        alt_new_entry = {"law_title": law_title, "article": current_context["article"], "point": current_context["point"], "subpoint": None, "content": _content}
-                                    else:
-                                        current_context["subpoint"] = dot_m.group(1).strip()
-                                        alt_new_entry = {"law_title": law_title, "article": current_context["article"], "point": current_context["point"], "subpoint": current_context["subpoint"], "content": _content}
+                        # Turpinājuma rindas no pdfplumber teksta netiek pievienotas
+                        alt_new_entry = parse_line(_line, current_context, law_title)
                         if alt_new_entry:
-                            structured_data.append(alt_new_entry)
+                            add_entry(alt_new_entry, i + 1)
                     # atjauninām page_has_entries, ja kaut kas pievienots
                     if len(structured_data) > entries_before_page:
                         page_has_entries = True
+                        extractor = "pdfplumber"
             except Exception as e:
                 log_item(log_queue, f"Kļūda apstrādājot {i+1}. lapu: {e}\n", 'error')
+                del structured_data[entries_before_page:]
+                if open_entry is not None:
+                    open_entry["content"], open_entry["page_end"], bbox_count = open_state
+                    del open_entry["bboxes"][bbox_count:]
+                current_context = context_before
+                page_outcomes.append({"page": i + 1, "status": "failed", "entries": 0,
+                                      "extractor": extractor, "error": f"{type(e).__name__}: {e}"})
                 continue
 
+            new_entries = len(structured_data) - entries_before_page
+            continued = len(open_entry["content"]) - len(open_state[0]) if open_entry is not None else 0
+            outcome = {"page": i + 1, "status": "ok" if new_entries or continued else "empty",
+                       "entries": new_entries, "extractor": extractor}
+            if continued:
+                outcome["continued"] = continued
+            page_outcomes.append(outcome)
+            emit_completed()
+
+        emit_completed(keep_open=0)
+        emit_progress(log_queue, ProgressEvent("page", file_name, pages_done=stats["pages_processed"],
+                                               page_count=len(doc), entries=len(structured_data)))
+
         return law_title, structured_data
         
     except Exception as e:
         log_item(log_queue, f"Kritiska kļūda PDF apstrādē: {e}\n", 'error')
+        stats["error"] = f"{type(e).__name__}: {e}"
         return None, []
     finally:
+        if plumber_window is not None:
+            plumber_window.close()
         if doc:
-            doc.close()
\ No newline at end of file
+            doc.close()
+        stats.update(memory.report())
\ No newline at end of file
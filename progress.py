@@ -0,0 +1,185 @@
+"""progress.py
+
+Strukturēti progresa notikumi un caurlaidspējas aprēķins.
+
+Apstrādes kods progresu sūta tajā pašā `log_queue` kā žurnāla rindas, bet
+kā `(ProgressEvent, PROGRESS_TAG)`, nevis netipizētu `("", "progress_update")`.
+`ThroughputTracker` no šiem notikumiem aprēķina lapas/s un ieraksti/s
+pašreizējam failam, katra posma ilgumu, darbinieku noslodzi un ETA, kas
+balstīts uz apstrādes laikā izmērīto ātrumu, nevis pieņēmumu, ka visas
+lapas ir vienādi dārgas.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+__all__ = [
+    "PROGRESS_TAG",
+    "STAGE_LABELS",
+    "FileProgress",
+    "ProgressEvent",
+    "ThroughputTracker",
+    "emit_progress",
+]
+
+PROGRESS_TAG = "progress"
+
+# Posmu nosaukumi lietotāja saskarnei
+STAGE_LABELS = {
+    "prepare": "sagatavošana",
+    "extract": "analīze",
+    "validate": "validācija",
+    "save": "saglabāšana",
+}
+
+
+@dataclass
+class ProgressEvent:
+    """Viens progresa notikums.
+
+    `kind`:
+    * "file_started" – fails sāk apstrādi;
+    * "page" – `pages_done` no `page_count` lapām apstrādātas, izveidoti `entries` ieraksti;
+    * "stage" – posms `stage` pabeigts `seconds` laikā;
+    * "file_finished" – fails pabeigts (`ok` norāda rezultātu).
+    """
+
+    kind: str
+    file: str
+    pages_done: int = 0
+    page_count: int = 0
+    entries: int = 0
+    stage: Optional[str] = None
+    seconds: float = 0.0
+    ok: bool = True
+    timestamp: float = field(default_factory=time.time)
+
+
+def emit_progress(log_queue, event: ProgressEvent):
+    """Ievieto notikumu rindā, ja tāda ir."""
+    if log_queue:
+        log_queue.put((event, PROGRESS_TAG))
+
+
+@dataclass
+class FileProgress:
+    """Viena faila apstrādes stāvoklis."""
+
+    name: str
+    started: float
+    pages_done: int = 0
+    page_count: int = 0
+    entries: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+    finished: Optional[float] = None
+
+    def elapsed(self, now: float) -> float:
+        return (self.finished or now) - self.started
+
+    def pages_per_second(self, now: float) -> float:
+        elapsed = self.elapsed(now)
+        return self.pages_done / elapsed if elapsed > 0 else 0.0
+
+    def entries_per_second(self, now: float) -> float:
+        elapsed = self.elapsed(now)
+        return self.entries / elapsed if elapsed > 0 else 0.0
+
+
+class ThroughputTracker:
+    """Apkopo `ProgressEvent` plūsmu visam apstrādes ciklam.
+
+    `total_pages` ir iepriekš zināmais visu failu lapu skaits (ETA aprēķinam);
+    `workers` – cik failus drīkst apstrādāt vienlaikus (noslodzes aprēķinam).
+    """
+
+    def __init__(self, total_pages: int = 0, workers: int = 1, smoothing: float = 0.3):
+        self.total_pages = total_pages
+        self.workers = max(1, workers)
+        self.smoothing = smoothing
+        self.started = time.time()
+        self.files: Dict[str, FileProgress] = {}
+        self.finished_files: List[FileProgress] = []
+        self._rate: Optional[float] = None  # lapas/s, eksponenciāli izlīdzināts
+        self._last_sample: Optional[tuple] = None  # (laiks, apstrādātās lapas)
+        self._pages_finished_files = 0
+        self._busy_seconds = 0.0
+
+    # ------------------------------------------------------------
+    #  Notikumu apstrāde
+    # ------------------------------------------------------------
+
+    def update(self, event: ProgressEvent):
+        now = event.timestamp
+        current = self.files.get(event.file)
+        if event.kind == "file_started" or current is None:
+            current = self.files.setdefault(event.file, FileProgress(event.file, now))
+        if event.kind == "page":
+            current.pages_done = max(current.pages_done, event.pages_done)
+            current.page_count = event.page_count or current.page_count
+            current.entries = event.entries
+        elif event.kind == "stage" and event.stage:
+            current.stages[event.stage] = current.stages.get(event.stage, 0.0) + event.seconds
+        elif event.kind == "file_finished":
+            current.finished = now
+            # Apstrāde var beigties agrāk (piem., pie "Pārejas noteikumiem") –
+            # visas faila lapas uzskatām par paveiktām
+            self._pages_finished_files += max(current.page_count, current.pages_done)
+            self._busy_seconds += current.elapsed(now)
+            self.finished_files.append(self.files.pop(event.file))
+        self._sample_rate(now)
+
+    def _sample_rate(self, now: float):
+        done = self.pages_done
+        if self._last_sample is None:
+            self._last_sample = (self.started, 0)
+        last_time, last_done = self._last_sample
+        if now - last_time < 0.5:
+            return
+        rate = (done - last_done) / (now - last_time)
+        self._rate = rate if self._rate is None else self.smoothing * rate + (1 - self.smoothing) * self._rate
+        self._last_sample = (now, done)
+
+    # ------------------------------------------------------------
+    #  Rādītāji
+    # ------------------------------------------------------------
+
+    @property
+    def pages_done(self) -> int:
+        return self._pages_finished_files + sum(f.pages_done for f in self.files.values())
+
+    @property
+    def current(self) -> Optional[FileProgress]:
+        """Pēdējais sāktais vēl nepabeigtais fails."""
+        if not self.files:
+            return None
+        return max(self.files.values(), key=lambda f: f.started)
+
+    def progress(self) -> float:
+        if self.total_pages <= 0:
+            return 0.0
+        return min(self.pages_done / self.total_pages, 1.0)
+
+    def pages_per_second(self) -> float:
+        """Izlīdzinātais kopējais ātrums; pirms pirmā mērījuma – vidējais."""
+        if self._rate is not None:
+            return self._rate
+        elapsed = time.time() - self.started
+        return self.pages_done / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.pages_per_second()
+        remaining = max(self.total_pages - self.pages_done, 0)
+        if rate <= 0:
+            return None
+        return remaining / rate
+
+    def utilization(self, now: Optional[float] = None) -> float:
+        """Darbinieku noslodze: aizņemtais laiks / (pagājušais laiks * darbinieki)."""
+        now = now or time.time()
+        elapsed = now - self.started
+        if elapsed <= 0:
+            return 0.0
+        busy = self._busy_seconds + sum(f.elapsed(now) for f in self.files.values())
+        return min(busy / (elapsed * self.workers), 1.0)
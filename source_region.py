@@ -0,0 +1,163 @@
+"""source_region.py
+
+Ieraksta avota apgabals PDF dokumentā.
+
+`process_pdf_to_structured_data` katram ierakstam saglabā `page_start`,
+`page_end` un `bboxes` (`[lapa, x0, y0, x1, y1]` teksta bloki). Ar tiem
+pārbaudes un pārskatīšanas rīki var nolasīt vai attēlot tikai ieraksta
+apgabalu, nevis visa dokumenta tekstu. Bloks var saturēt vairākus
+ierakstus (piem., vairākus punktus), tāpēc apgabala teksts ir ieraksta
+satura virskopa.
+
+`SourceDocument` atver PDF vienreiz un kešo jau nolasīto lapu tekstu, tāpēc
+vairāku ierakstu pārbaude nolasa katru vajadzīgo lapu tikai vienu reizi.
+
+Lietošana no komandrindas::
+
+    python source_region.py processed_json/Darba_likums.json 42
+    python source_region.py processed_json/Darba_likums.json 42 --png ieraksts.png
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+__all__ = [
+    "SourceDocument",
+    "entry_page_range",
+    "entry_regions",
+    "has_source",
+]
+
+# Atstarpe ap attēloto apgabalu (punktos), lai nenogrieztu burtu augšdaļas
+RENDER_MARGIN = 4.0
+
+
+def has_source(entry: Dict[str, Any]) -> bool:
+    """Vai ierakstam ir avota lapas (vecākos JSON failos to nav)."""
+    return bool(entry.get("page_start"))
+
+
+def entry_page_range(entries: Iterable[Dict[str, Any]]) -> Optional[Tuple[int, int]]:
+    """Mazākā `page_start` un lielākā `page_end` (1-bāzētas) ierakstu kopai."""
+    start = end = None
+    for entry in entries:
+        if not has_source(entry):
+            continue
+        start = entry["page_start"] if start is None else min(start, entry["page_start"])
+        page_end = entry.get("page_end") or entry["page_start"]
+        end = page_end if end is None else max(end, page_end)
+    if start is None:
+        return None
+    return start, end
+
+
+def entry_regions(entry: Dict[str, Any]) -> List[Tuple[int, Optional[fitz.Rect]]]:
+    """Ieraksta apgabali pa lapām: `(lapa, Rect)`; `None` nozīmē visu lapu.
+
+    Vienas lapas bloki tiek apvienoti vienā taisnstūrī.
+    """
+    if not has_source(entry):
+        return []
+    regions: Dict[int, Optional[fitz.Rect]] = {}
+    for page, *bbox in entry.get("bboxes") or []:
+        rect = fitz.Rect(bbox)
+        regions[page] = rect if regions.get(page) is None else regions[page] | rect
+    # Lapām bez blokiem (pdfplumber ieraksti) – visa lapa
+    for page in range(entry["page_start"], (entry.get("page_end") or entry["page_start"]) + 1):
+        regions.setdefault(page, None)
+    return sorted(regions.items())
+
+
+class SourceDocument:
+    """Atvērts avota PDF ar lapu teksta kešu."""
+
+    def __init__(self, pdf_path: str | Path):
+        self.pdf_path = Path(pdf_path)
+        self.doc = fitz.open(str(pdf_path))
+        self._page_text: Dict[int, str] = {}
+
+    def __enter__(self) -> "SourceDocument":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.doc.close()
+
+    @property
+    def pages_read(self) -> int:
+        return len(self._page_text)
+
+    def page_text(self, page: int) -> str:
+        """Visas lapas teksts (1-bāzēts lapas numurs)."""
+        if page not in self._page_text:
+            self._page_text[page] = self.doc.load_page(page - 1).get_text() if 0 < page <= len(self.doc) else ""
+        return self._page_text[page]
+
+    def text_range(self, start: int, end: int) -> str:
+        return "".join(self.page_text(page) for page in range(start, end + 1))
+
+    def full_text(self) -> str:
+        return self.text_range(1, len(self.doc))
+
+    def region_text(self, entry: Dict[str, Any]) -> str:
+        """Ieraksta bloku teksts; bez blokiem – attiecīgo lapu teksts."""
+        parts = []
+        for page, rect in entry_regions(entry):
+            if rect is None:
+                parts.append(self.page_text(page))
+            else:
+                parts.append(self.doc.load_page(page - 1).get_text("text", clip=rect))
+        return "".join(parts)
+
+    def render(self, entry: Dict[str, Any], zoom: float = 2.0) -> List[bytes]:
+        """Ieraksta apgabals kā PNG attēli (viens katrai lapai)."""
+        images = []
+        for page_number, rect in entry_regions(entry):
+            page = self.doc.load_page(page_number - 1)
+            clip = page.rect if rect is None else (rect + (-RENDER_MARGIN, -RENDER_MARGIN,
+                                                          RENDER_MARGIN, RENDER_MARGIN)) & page.rect
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+            images.append(pixmap.tobytes("png"))
+        return images
+
+
+def _find_source_pdf(json_path: Path) -> Optional[Path]:
+    from catalog import catalog
+    entry = catalog.find_by_json_path(json_path.resolve())
+    if entry and entry.get("pdf_path") and Path(entry["pdf_path"]).exists():
+        return Path(entry["pdf_path"])
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ieraksta avota apgabals PDF dokumentā")
+    parser.add_argument("json_file", type=Path)
+    parser.add_argument("index", type=int, help="Ieraksta numurs JSON failā (no 0)")
+    parser.add_argument("--pdf", type=Path, help="Avota PDF (pēc noklusējuma – no kataloga)")
+    parser.add_argument("--png", type=Path, help="Saglabāt apgabalu kā attēlu")
+    parser.add_argument("--zoom", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with open(args.json_file, "r", encoding="utf-8") as f:
+        entry = json.load(f)[args.index]
+    if not has_source(entry):
+        parser.error("Ierakstam nav avota lapu – apstrādājiet PDF atkārtoti")
+    pdf_path = args.pdf or _find_source_pdf(args.json_file)
+    if pdf_path is None:
+        parser.error("Avota PDF nav atrasts katalogā – norādiet --pdf")
+
+    with SourceDocument(pdf_path) as source:
+        print(f"{pdf_path.name}, {entry['page_start']}.–{entry['page_end']}. lapa")
+        print(source.region_text(entry))
+        if args.png:
+            for n, image in enumerate(source.render(entry, args.zoom), 1):
+                out = args.png if n == 1 else args.png.with_name(f"{args.png.stem}_{n}{args.png.suffix}")
+                out.write_bytes(image)
+                print(f"Saglabāts: {out}")
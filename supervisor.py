@@ -0,0 +1,438 @@
+"""supervisor.py
+
+Dokumentu apstrāde uzraudzītā apakšprocesā.
+
+Bojāts PDF var "iesaldēt" `fitz` vai pdfplumber vai patērēt tik daudz
+atmiņas, ka operētājsistēma aptur visu programmu. Tāpēc `SupervisedWorker`
+palaiž `process_pdf_to_structured_data` atsevišķā procesā, kam ir:
+
+* sienas pulksteņa (wall-clock) taimauts – `path_config.processing_timeout`;
+* adrešu telpas ierobežojums – `path_config.worker_memory_limit_mb`
+  (`RLIMIT_AS`, pieejams tikai POSIX sistēmās);
+* CPU laika uzskaite katram dokumentam.
+
+Ja darbinieks neatbild laikā vai nomirst, tas tiek nogalināts un nākamajam
+dokumentam palaists jauns process. `CancellationToken` stāvoklis (pauze,
+atcelšana) tiek nodots darbiniekam caur koplietotu vērtību un pārbaudīts
+starp lapām; pauzes laiks netiek ieskaitīts taimautā. Rezultāts tiek atgriezts kā
+`WorkerResult` ar strukturētu statusu, ko `main` izmanto, lai dokumentu
+apstrādātu vēlreiz lētākā (tikai fitz) režīmā vai pārvietotu uz `error_dir`.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cancellation import CANCELLED, PAUSED, RUNNING, ProcessingCancelled, SharedStateToken
+from config import path_config
+from logging_setup import LINE_EVENT_TAGS, PROCESSING_LOGGERS, log_level, wants_line_events
+from memory_stats import peak_rss_mb
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+__all__ = [
+    "RETRYABLE_STATUSES",
+    "WorkerResult",
+    "SupervisedWorker",
+    "ProcessingFailure",
+]
+
+# Statusi, pēc kuriem ir jēga mēģināt vēlreiz lētākā režīmā
+RETRYABLE_STATUSES = ("timeout", "memory", "crashed")
+
+# Cik ilgi pēc atcelšanas gaidām, līdz darbinieks sasniedz nākamo pārbaudes punktu
+CANCEL_GRACE_SECONDS = 5.0
+
+# Žurnāla rindas marķieris: visi darba ieraksti ir nosūtīti
+_JOB_DONE = ("", "__job_done__")
+# Žurnāla rindas tags pabeigtam ierakstam, ja vecāks tos saņem apstrādes laikā (`on_entry`)
+_ENTRY_TAG = "__entry__"
+# Žurnāla rindas tags `logging.LogRecord`, ko vecāks nodod tā paša nosaukuma žurnālam
+_RECORD_TAG = "__record__"
+
+
+@dataclass
+class WorkerResult:
+    """Viena dokumenta apstrādes rezultāts no uzraudzītā procesa."""
+
+    status: str  # "ok" | "failed" | "timeout" | "memory" | "crashed" | "cancelled"
+    law_title: Optional[str] = None
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    entry_pages: List[int] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    cpu_seconds: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+    fitz_only: bool = False
+
+    def report(self) -> Dict[str, Any]:
+        """Strukturēts kļūdas apraksts bez pašiem ierakstiem."""
+        data = asdict(self)
+        data.pop("entries")
+        data.pop("entry_pages")
+        data["stats"] = {k: v for k, v in data["stats"].items() if k != "page_outcomes"}
+        return data
+
+
+class ProcessingFailure(Exception):
+    """Dokumentu neizdevās apstrādāt arī pēc atkārtota mēģinājuma."""
+
+    def __init__(self, message: str, report: Dict[str, Any]):
+        super().__init__(message)
+        self.report = report
+
+
+# ------------------------------------------------------------
+#  Apakšprocesa puse
+# ------------------------------------------------------------
+
+class _LogRelay:
+    """Queue-līdzīgs objekts, kas pārsūta žurnāla ierakstus uz vecāka procesu."""
+
+    def __init__(self, mp_queue, line_events: bool):
+        self._queue = mp_queue
+        self._line_events = line_events
+
+    def accepts(self, tag: str) -> bool:
+        # Katras rindas notikumus sūtām tikai, ja vecāka rinda tos lasa
+        return self._line_events or tag not in LINE_EVENT_TAGS
+
+    def put(self, item):
+        self._queue.put(item)
+
+
+class _RecordRelay(logging.Handler):
+    """Sūta apakšprocesa žurnālu ierakstus (piem., pdf_processor DEBUG rindas) uz vecāka procesu."""
+
+    def __init__(self, mp_queue):
+        super().__init__()
+        self._queue = mp_queue
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            # Argumenti un izņēmums var nebūt serializējami – sūtām gatavu tekstu
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self._queue.put((record, _RECORD_TAG))
+        except Exception:
+            self.handleError(record)
+
+
+def _relay_processing_logs(log_queue):
+    """Apstrādes moduļu žurnāli apakšprocesā: vecāka līmenis, ieraksti uz vecāka žurnālu."""
+    for name in PROCESSING_LOGGERS:
+        target = logging.getLogger(name)
+        target.setLevel(log_level())
+        if not any(isinstance(handler, _RecordRelay) for handler in target.handlers):
+            target.addHandler(_RecordRelay(log_queue))
+            target.propagate = False
+
+
+def _apply_memory_limit(memory_limit_mb: Optional[int]):
+    if resource is None or not memory_limit_mb:
+        return
+    limit = int(memory_limit_mb) * 1024 * 1024
+    try:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(conn, log_queue, memory_limit_mb: Optional[int], control):
+    """Apakšprocesa cikls: saņem darbus pa `conn`, sūta atpakaļ rezultātus."""
+    _apply_memory_limit(memory_limit_mb)
+    from pdf_processor import process_pdf_to_structured_data
+
+    cancel_token = SharedStateToken(control)
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        pdf_path, config_snapshot, fitz_only, relay_logs, line_events, pdf_stream, stream_entries = job
+        # Apakšprocess ir jauns interpretators – pārņemam vecāka konfigurāciju
+        path_config.__dict__.update(config_snapshot)
+        if fitz_only:
+            path_config.use_pdfplumber_fallback = False
+        _relay_processing_logs(log_queue)
+
+        entry_pages: List[int] = []
+        stats: Dict[str, Any] = {}
+
+        def on_entry(entry, page):
+            entry_pages.append(page)
+            if stream_entries:
+                log_queue.put(((entry, page), _ENTRY_TAG))
+
+        cpu_start = time.process_time()
+        try:
+            law_title, entries = process_pdf_to_structured_data(
+                pdf_path,
+                _LogRelay(log_queue, line_events) if relay_logs else None,
+                on_entry=on_entry,
+                stats=stats,
+                cancel_token=cancel_token,
+                pdf_stream=pdf_stream,
+            )
+            error = stats.get("error")
+            if error and "MemoryError" in error:
+                status = "memory"
+            else:
+                status = "ok" if law_title and entries else "failed"
+        except ProcessingCancelled:
+            law_title, entries, status, error = None, [], "cancelled", "Apstrāde atcelta"
+        except MemoryError as e:
+            law_title, entries, status, error = None, [], "memory", f"MemoryError: {e}"
+        except Exception as e:
+            law_title, entries, status, error = None, [], "failed", f"{type(e).__name__}: {e}"
+
+        # Straumētie ieraksti jau ir vecāka procesā – tos nesūtām otrreiz
+        keep_entries = status == "ok" and not stream_entries
+        result = {
+            "status": status,
+            "law_title": law_title,
+            "entries": entries if keep_entries else [],
+            "entry_pages": entry_pages if keep_entries else [],
+            "stats": stats,
+            "cpu_seconds": time.process_time() - cpu_start,
+            "peak_rss_mb": peak_rss_mb(),
+            "error": error,
+        }
+        log_queue.put(_JOB_DONE)
+        try:
+            conn.send(result)
+        except MemoryError:
+            conn.send({"status": "memory", "error": "MemoryError: rezultātu neizdevās nosūtīt"})
+
+
+# ------------------------------------------------------------
+#  Uzraugs (vecāka procesa puse)
+# ------------------------------------------------------------
+
+class SupervisedWorker:
+    """Viens ilgstošs darbinieka process, kas tiek pārstartēts pēc kļūmes.
+
+    Lieto kā konteksta pārvaldnieku vai izsauc `close()` pēc darba beigām.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        max_jobs: Optional[int] = None,
+    ):
+        self.timeout = timeout if timeout is not None else path_config.processing_timeout
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else path_config.worker_memory_limit_mb
+        self.max_jobs = max_jobs if max_jobs is not None else path_config.worker_max_jobs
+        self._ctx = mp.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._log_queue = None
+        self._control = None
+        self._jobs_done = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def memory_limit_enforced(self) -> bool:
+        return resource is not None and bool(self.memory_limit_mb)
+
+    def start(self):
+        """Palaiž darbinieka procesu jau iepriekš (tas uzreiz importē PyMuPDF u.c.)."""
+        if self._process is None:
+            self._start()
+
+    def _start(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        self._log_queue = self._ctx.Queue()
+        # Atcelšanas žetona stāvoklis, ko darbinieks pārbauda starp lapām
+        self._control = self._ctx.Value("b", RUNNING, lock=False)
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self._log_queue, self.memory_limit_mb, self._control),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._jobs_done = 0
+
+    def _kill(self):
+        """Aptur darbinieku (vispirms maigi, tad ar SIGKILL)."""
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(2)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join(2)
+        self._close_channels()
+
+    def _close_channels(self):
+        if self._conn is not None:
+            self._conn.close()
+        if self._log_queue is not None:
+            self._log_queue.close()
+            self._log_queue.cancel_join_thread()
+        self._process = None
+        self._conn = None
+        self._log_queue = None
+        self._control = None
+
+    def kill(self):
+        """Nogalina pašreizējo darbinieka procesu (drīkst saukt no cita pavediena).
+
+        Notiekošais `process` izsaukums to konstatē un atgriež statusu "crashed";
+        nākamais darbs palaiž jaunu procesu.
+        """
+        process = self._process
+        if process is not None and process.is_alive():
+            process.kill()
+
+    def close(self):
+        """Pabeidz darbinieka procesu."""
+        if self._process is None:
+            return
+        try:
+            if self._process.is_alive():
+                self._conn.send(None)
+                self._process.join(5)
+        except (OSError, BrokenPipeError):
+            pass
+        self._kill()
+
+    def _drain_logs(self, log_queue, wait_for_done: bool = False, on_entry=None):
+        """Pārsūta apakšprocesa žurnāla ierakstus uz `log_queue` un ierakstus uz `on_entry`.
+
+        Ar `wait_for_done` gaida darba beigu marķieri, jo `multiprocessing.Queue`
+        ierakstus piegādā asinhroni un tie var atpalikt no rezultāta.
+        """
+        if self._log_queue is None:
+            return
+        deadline = time.monotonic() + 2
+        while True:
+            try:
+                if wait_for_done:
+                    item = self._log_queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+                else:
+                    item = self._log_queue.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                return
+            if item == _JOB_DONE:
+                return
+            if item[1] == _ENTRY_TAG:
+                if on_entry is not None:
+                    on_entry(*item[0])
+            elif item[1] == _RECORD_TAG:
+                logging.getLogger(item[0].name).handle(item[0])
+            elif log_queue:
+                log_queue.put(item)
+
+    def process(self, pdf_path: str | Path, log_queue=None, fitz_only: bool = False,
+                cancel_token=None, pdf_stream: Optional[bytes] = None, on_entry=None) -> WorkerResult:
+        """Apstrādā vienu PDF darbinieka procesā un atgriež `WorkerResult`.
+
+        Ar `pdf_stream` PDF baiti tiek nosūtīti caur kanālu (piem., arhīva
+        dalībnieks), un `pdf_path` ir tikai dokumenta nosaukums.
+
+        Ar `on_entry(entry, page)` katrs pabeigtais ieraksts tiek nodots
+        apstrādes laikā (šajā pavedienā), un rezultāta `entries` paliek tukšs.
+
+        Ar `cancel_token` darbs tiek pauzēts vai atcelts starp lapām; ja
+        darbinieks atcelšanu neievēro `CANCEL_GRACE_SECONDS` laikā, tas tiek
+        nogalināts. Abos gadījumos statuss ir "cancelled".
+        """
+        if self._process is not None and not self._process.is_alive():
+            self._close_channels()
+        if self._process is None:
+            self._start()
+
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout else None
+        snapshot = dict(vars(path_config))
+        self._control.value = cancel_token.state if cancel_token is not None else RUNNING
+        self._conn.send((str(pdf_path), snapshot, fitz_only, log_queue is not None, wants_line_events(log_queue),
+                         pdf_stream, on_entry is not None))
+
+        payload = None
+        status = None
+        exit_code = None
+        cancelled_at = None
+        last_poll = start
+        while True:
+            self._drain_logs(log_queue, on_entry=on_entry)
+            if cancel_token is not None:
+                state = cancel_token.state
+                self._control.value = state
+                now = time.monotonic()
+                if state == PAUSED and deadline:
+                    deadline += now - last_poll  # Pauze neskaitās apstrādes laikā
+                last_poll = now
+                if state == CANCELLED:
+                    cancelled_at = cancelled_at or now
+                    if now - cancelled_at > CANCEL_GRACE_SECONDS:
+                        status = "cancelled"
+                        break
+            try:
+                if self._conn.poll(0.1):
+                    payload = self._conn.recv()
+                    break
+            except (EOFError, OSError):
+                pass
+            if not self._process.is_alive():
+                exit_code = self._process.exitcode
+                status = "crashed"
+                break
+            if deadline and time.monotonic() > deadline:
+                status = "timeout"
+                break
+
+        wall_seconds = time.monotonic() - start
+        self._drain_logs(log_queue, wait_for_done=payload is not None, on_entry=on_entry)
+
+        if payload is None:
+            # Darbinieks iestrēga vai nomira – nogalinām, nākamajam darbam būs jauns
+            if exit_code is None and self._process is not None:
+                self._kill()
+            else:
+                self._close_channels()
+            if status == "timeout":
+                error = f"Pārsniegts apstrādes laiks ({self.timeout}s)"
+            elif status == "cancelled":
+                error = "Apstrāde atcelta"
+            else:
+                error = f"Darbinieka process negaidīti beidzās (exit code {exit_code})"
+            return WorkerResult(status=status, wall_seconds=wall_seconds, exit_code=exit_code,
+                                error=error, fitz_only=fitz_only)
+
+        self._jobs_done += 1
+        result = WorkerResult(wall_seconds=wall_seconds, fitz_only=fitz_only, **payload)
+        if result.status == "memory" or (self.max_jobs and self._jobs_done >= self.max_jobs):
+            # Pēc atmiņas kļūdas vai N darbiem process tiek atjaunots
+            self.close()
+        return result
@@ -0,0 +1,385 @@
+"""synthetic_pdf.py
+
+Sintētiski likumu PDF dokumenti mērogošanas testiem.
+
+Vienīgais līdzi dotais īstais dokuments ir pārāk mazs, lai parādītu, kā
+apstrāde uzvedas ar desmitiem tūkstošu lapu. Šeit ar PyMuPDF tiek izveidots
+likumi.lv eksportam līdzīgs PDF: izsludināšanas teksts un nosaukums, pants
+→ punkti → apakšpunkti ar turpinājuma rindām, galvene un kājene ar lapas
+numuru katrā lapā, "Pārejas noteikumi" un pielikumi (kurus parseris nedrīkst
+apstrādāt) un pēc izvēles gari ieraksti, kuru vidusdaļas lapās nesākas neviens
+ieraksts – tieši šīs lapas izsauc pdfplumber fallback.
+
+Kopā ar PDF tiek uzrakstīta sagaidāmā `process_pdf_to_structured_data`
+izvade (`<nosaukums>.expected.jsonl`), tāpēc ātruma un atmiņas mērījumi
+jebkurā mērogā vienlaikus pārbauda arī rezultāta pareizību.
+
+Lietošana no komandrindas::
+
+    python synthetic_pdf.py generate sintetisks.pdf --pages 20000
+    python synthetic_pdf.py bench --pages 2000 --long-entries 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+__all__ = [
+    "SyntheticDocument",
+    "SyntheticSpec",
+    "compare_entries",
+    "generate",
+    "read_expected",
+    "spec_for_pages",
+]
+
+SYNTHETIC_TITLE = "Sintētiskais testa likums"
+
+# A4 izkārtojums (punktos); galvene un kājene atrodas ārpus fiksētās 50 pt malas
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+LEFT_MARGIN = 72
+BODY_TOP = 80
+BODY_BOTTOM = 770
+LINE_HEIGHT = 14
+FONT_SIZE = 10
+HEADER_Y = 36
+FOOTER_Y = 820
+LINES_PER_PAGE = (BODY_BOTTOM - BODY_TOP) // LINE_HEIGHT + 1
+
+# Pants tiek atpazīts tikai ar 1–3 cipariem, apakšpunkts – ar 1–2
+MAX_ARTICLES = 999
+MAX_SUBPOINTS = 99
+
+# Vārdi turpinājuma rindām; bez STOP_KEYWORDS un bez cipariem vai iekavām,
+# lai neviena rinda netiktu atpazīta kā struktūra
+_WORDS = (
+    "darba devējs darbinieks līgums pienākums tiesības atlīdzība noteikumi "
+    "institūcija persona kārtība termiņš pieteikums lēmums saskaņā ar šo likumu "
+    "ievērojot attiecīgo gadījumu vai un ja kā arī tostarp paredzēto apmēru "
+    "valsts pārvalde uzņēmums komersants nodoklis pārbaude iesniegums "
+    "informācija dokumenti ziņas sabiedrība pašvaldība drošība veselība "
+    "apdrošināšana pārstāvis vienošanās grozījumi izpilde uzraudzība"
+).split()
+_MAX_LINE_CHARS = 72
+
+
+@dataclass
+class SyntheticSpec:
+    """Ģenerējamā dokumenta struktūra.
+
+    `points` – punkti katrā pantā, `subpoints` – apakšpunkti katrā punktā,
+    `continuation_lines` – turpinājuma rindas aiz katra ieraksta pirmās rindas.
+    Katrs `long_entry_every`-tais pants (0 – neviens) saņem turpinājumu
+    `long_entry_pages` lapu garumā.
+    """
+
+    articles: int = 100
+    points: int = 3
+    subpoints: int = 2
+    continuation_lines: int = 1
+    long_entry_every: int = 0
+    long_entry_pages: float = 1.5
+    annexes: int = 1
+    annex_pages: int = 2
+    seed: int = 1
+
+    def __post_init__(self):
+        if not 1 <= self.articles <= MAX_ARTICLES:
+            raise ValueError(f"articles jābūt no 1 līdz {MAX_ARTICLES}")
+        if self.subpoints > MAX_SUBPOINTS:
+            raise ValueError(f"subpoints nedrīkst pārsniegt {MAX_SUBPOINTS}")
+
+
+def spec_for_pages(pages: int, **overrides) -> SyntheticSpec:
+    """Specifikācija, kas dod aptuveni `pages` lapas.
+
+    Vispirms tiek palielināts pantu skaits; kad sasniegti 999 panti, –
+    punktu skaits katrā pantā.
+    """
+    spec = SyntheticSpec(**overrides)
+    per_entry = 1 + spec.continuation_lines
+    target_lines = max(pages, 1) * LINES_PER_PAGE
+    lines_per_point = per_entry * (1 + spec.subpoints)
+    lines_per_article = per_entry + spec.points * lines_per_point
+    articles = math.ceil(target_lines / lines_per_article)
+    if articles > MAX_ARTICLES:
+        spec.points = math.ceil((target_lines / MAX_ARTICLES - per_entry) / lines_per_point)
+        articles = MAX_ARTICLES
+    spec.articles = max(articles, 1)
+    return spec
+
+
+@dataclass
+class SyntheticDocument:
+    """Ģenerēšanas rezultāts."""
+
+    pdf_path: Path
+    expected_path: Path
+    spec: SyntheticSpec
+    page_count: int = 0
+    entries: int = 0
+    stop_page: int = 0  # lapa ar "Pārejas noteikumi"
+    fallback_pages: List[int] = field(default_factory=list)  # lapas bez neviena ieraksta sākuma
+    seconds: float = 0.0
+
+    def describe(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["pdf_path"] = str(self.pdf_path)
+        data["expected_path"] = str(self.expected_path)
+        data["fallback_pages"] = len(self.fallback_pages)
+        return data
+
+
+# ------------------------------------------------------------
+#  Teksta plūsma
+# ------------------------------------------------------------
+
+def _sentence(rng: random.Random) -> str:
+    words: List[str] = []
+    length = 0
+    while True:
+        word = rng.choice(_WORDS)
+        if length + len(word) + 1 > _MAX_LINE_CHARS - rng.randint(0, 20) and words:
+            break
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _entry_lines(rng: random.Random, marker: str, continuation: int, entry: Dict[str, Any]):
+    """Ieraksta rindas; pirmā rinda nes sagaidāmo ierakstu."""
+    first = _sentence(rng)
+    entry["content"] = first
+    yield f"{marker} {first}", entry
+    for _ in range(continuation):
+        line = _sentence(rng)
+        entry["content"] += " " + line
+        yield line, None
+
+
+def _body_lines(spec: SyntheticSpec, rng: random.Random) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    long_lines = int(spec.long_entry_pages * LINES_PER_PAGE)
+    for a in range(1, spec.articles + 1):
+        article = f"{a}. pants."
+        continuation = spec.continuation_lines
+        if spec.long_entry_every and a % spec.long_entry_every == 0:
+            continuation = long_lines
+        yield from _entry_lines(rng, article, continuation, _entry(article))
+        for p in range(1, spec.points + 1):
+            yield from _entry_lines(rng, f"({p})", spec.continuation_lines, _entry(article, str(p)))
+            for s in range(1, spec.subpoints + 1):
+                yield from _entry_lines(rng, f"{s})", spec.continuation_lines, _entry(article, str(p), str(s)))
+
+
+def _entry(article: str, point: Optional[str] = None, subpoint: Optional[str] = None) -> Dict[str, Any]:
+    return {"law_title": SYNTHETIC_TITLE, "article": article, "point": point, "subpoint": subpoint}
+
+
+def _annex_lines(spec: SyntheticSpec, rng: random.Random) -> Iterator[Optional[str]]:
+    yield "Pārejas noteikumi"
+    for n in range(1, 4):
+        yield f"{n}. {_sentence(rng)}"
+    for annex in range(1, spec.annexes + 1):
+        yield None  # jauna lapa
+        yield f"{annex}. pielikums"
+        for n in range(1, spec.annex_pages * LINES_PER_PAGE - 1):
+            # Struktūrai līdzīgas rindas, kuras parseris nedrīkst redzēt
+            yield f"({n}) {_sentence(rng)}" if n % 3 else f"{n}. pants. {_sentence(rng)}"
+
+
+# ------------------------------------------------------------
+#  PDF veidošana
+# ------------------------------------------------------------
+
+class _PageWriter:
+    def __init__(self, doc: fitz.Document, font: fitz.Font):
+        self.doc = doc
+        self.font = font
+        self.page = None
+        self.writer = None
+        self.y = BODY_TOP
+
+    @property
+    def page_number(self) -> int:
+        return len(self.doc)
+
+    def new_page(self):
+        self.finish()
+        self.page = self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        self.writer = fitz.TextWriter(self.page.rect)
+        self.y = BODY_TOP
+        self.writer.append((LEFT_MARGIN, HEADER_Y), "Latvijas Vēstnesis, 100, 22.10.2024.",
+                           font=self.font, fontsize=FONT_SIZE - 2)
+
+    def line(self, text: str):
+        if self.page is None or self.y > BODY_BOTTOM:
+            self.new_page()
+        self.writer.append((LEFT_MARGIN, self.y), text, font=self.font, fontsize=FONT_SIZE)
+        self.y += LINE_HEIGHT
+
+    def finish(self):
+        if self.writer is not None:
+            self.writer.write_text(self.page)
+            self.writer = None
+
+
+def generate(pdf_path: str | Path, spec: Optional[SyntheticSpec] = None) -> SyntheticDocument:
+    """Izveido PDF un blakus tam sagaidāmo izvadi JSON Lines formātā."""
+    spec = spec or SyntheticSpec()
+    started = time.perf_counter()
+    pdf_path = Path(pdf_path)
+    expected_path = pdf_path.with_suffix(".expected.jsonl")
+    result = SyntheticDocument(pdf_path, expected_path, spec)
+    rng = random.Random(spec.seed)
+
+    doc = fitz.open()
+    doc.set_metadata({"title": SYNTHETIC_TITLE, "creator": "synthetic_pdf.py", "producer": "PyMuPDF"})
+    out = _PageWriter(doc, fitz.Font("helv"))
+    pages_with_starts = set()
+    pending: Optional[Dict[str, Any]] = None
+
+    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(expected_path, "w", encoding="utf-8") as expected:
+        def flush(entry):
+            if entry is not None:
+                expected.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                result.entries += 1
+
+        out.line("Saeima ir pieņēmusi un Valsts prezidents izsludina šādu likumu:")
+        out.line(SYNTHETIC_TITLE)
+        for text, entry in _body_lines(spec, rng):
+            out.line(text)
+            page = out.page_number
+            if entry is not None:
+                flush(pending)
+                pending = entry
+                pending["page_start"] = page
+                pages_with_starts.add(page)
+            pending["page_end"] = page
+        flush(pending)
+
+        # Pārejas noteikumi sākas jaunā lapā, lai apstāšanās neskartu pamattekstu
+        out.new_page()
+        result.stop_page = out.page_number
+        for text in _annex_lines(spec, rng):
+            if text is None:
+                out.new_page()
+            else:
+                out.line(text)
+        out.finish()
+
+    # Kājene ar lapas numuru "n/N" (kopējais lapu skaits zināms tikai beigās)
+    for page in doc:
+        page.insert_text((PAGE_WIDTH / 2 - 10, FOOTER_Y), f"{page.number + 1}/{len(doc)}", fontsize=FONT_SIZE - 2)
+
+    result.page_count = len(doc)
+    result.fallback_pages = [p for p in range(1, result.stop_page) if p not in pages_with_starts]
+    doc.save(str(pdf_path), garbage=3, deflate=True)
+    doc.close()
+    result.seconds = round(time.perf_counter() - started, 2)
+    return result
+
+
+# ------------------------------------------------------------
+#  Pārbaude un etalons
+# ------------------------------------------------------------
+
+_COMPARED_FIELDS = ("law_title", "article", "point", "subpoint", "content", "page_start", "page_end")
+
+
+def read_expected(expected_path: str | Path) -> Iterator[Dict[str, Any]]:
+    with open(expected_path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def compare_entries(entries, expected_path: str | Path, max_reported: int = 5) -> List[str]:
+    """Salīdzina parsētos ierakstus ar sagaidāmajiem; atgriež atšķirību aprakstus."""
+    problems = []
+    expected = read_expected(expected_path)
+    count = 0
+    for count, (actual, wanted) in enumerate(zip(entries, expected), 1):
+        if len(problems) >= max_reported:
+            break
+        diff = [name for name in _COMPARED_FIELDS if actual.get(name) != wanted.get(name)]
+        if diff:
+            problems.append(f"#{count}: {', '.join(f'{n}={actual.get(n)!r} (gaidīts {wanted.get(n)!r})' for n in diff)}")
+    if len(problems) < max_reported:
+        actual_count = len(entries)
+        expected_count = sum(1 for _ in read_expected(expected_path))
+        if actual_count != expected_count:
+            problems.append(f"Ierakstu skaits {actual_count}, gaidīts {expected_count}")
+    return problems
+
+
+def run_benchmark(document: SyntheticDocument) -> Dict[str, Any]:
+    """Apstrādā dokumentu ar `process_pdf_to_structured_data` un pārbauda rezultātu."""
+    from pdf_processor import process_pdf_to_structured_data
+
+    stats: Dict[str, Any] = {}
+    started = time.perf_counter()
+    _, entries = process_pdf_to_structured_data(str(document.pdf_path), stats=stats)
+    seconds = time.perf_counter() - started
+    problems = compare_entries(entries, document.expected_path)
+    return {
+        "pages": stats.get("pages_processed"),
+        "entries": len(entries),
+        "seconds": round(seconds, 2),
+        "pages_per_second": round(stats.get("pages_processed", 0) / seconds, 1) if seconds else None,
+        "entries_per_second": round(len(entries) / seconds, 1) if seconds else None,
+        "peak_working_set_mb": stats.get("peak_working_set_mb"),
+        "working_set_growth_mb": stats.get("working_set_growth_mb"),
+        "layout": stats.get("layout"),
+        "correct": not problems,
+        "problems": problems,
+    }
+
+
+def _spec_from_args(args) -> SyntheticSpec:
+    overrides = {"continuation_lines": args.continuation_lines, "long_entry_every": args.long_entries,
+                 "annexes": args.annexes, "seed": args.seed}
+    if args.articles:
+        return SyntheticSpec(articles=args.articles, points=args.points, subpoints=args.subpoints, **overrides)
+    return spec_for_pages(args.pages, points=args.points, subpoints=args.subpoints, **overrides)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sintētiski likumu PDF mērogošanas testiem")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_generate = sub.add_parser("generate", help="Izveidot PDF un sagaidāmo izvadi")
+    p_generate.add_argument("output", type=Path)
+    p_bench = sub.add_parser("bench", help="Izveidot, apstrādāt un pārbaudīt")
+    p_bench.add_argument("--keep", type=Path, help="Saglabāt PDF šajā ceļā (citādi pagaidu mapē)")
+    for p in (p_generate, p_bench):
+        p.add_argument("--pages", type=int, default=100, help="Aptuvenais lapu skaits")
+        p.add_argument("--articles", type=int, help="Precīzs pantu skaits (ignorē --pages)")
+        p.add_argument("--points", type=int, default=3)
+        p.add_argument("--subpoints", type=int, default=2)
+        p.add_argument("--continuation-lines", type=int, default=1)
+        p.add_argument("--long-entries", type=int, default=0, metavar="N",
+                       help="Katram N-tajam pantam gars turpinājums (fallback lapas)")
+        p.add_argument("--annexes", type=int, default=1)
+        p.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    spec = _spec_from_args(args)
+    if args.command == "generate":
+        document = generate(args.output, spec)
+        print(json.dumps(document.describe(), ensure_ascii=False, indent=2))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            document = generate(args.keep or Path(tmp) / "synthetic.pdf", spec)
+            print(f"Izveidots: {document.page_count} lapas, {document.entries} ieraksti, "
+                  f"{len(document.fallback_pages)} fallback lapas ({document.seconds}s)")
+            report = run_benchmark(document)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        raise SystemExit(0 if report["correct"] else 1)
@@ -1,69 +1,121 @@
 # validator.py
 import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
-def validate_processed_data(data: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
-    """Enhanced validation of processed data structure."""
-    messages = []
-    
-    if not data:
-        messages.append("Validācijas kļūda: Datu saraksts ir tukšs.")
-        return False, messages
-
-    # Check for law title
-    missing_titles = sum(1 for item in data if not item.get("law_title") or item["law_title"] == "Nezinams_likums")
-    if missing_titles > 0:
-        messages.append(f"Brīdinājums: {missing_titles} ierakstiem trūkst likuma nosaukuma.")
-
-    # Check content quality
-    empty_content = sum(1 for item in data if not item.get("content", "").strip())
-    if empty_content > 0:
-        messages.append(f"Brīdinājums: {empty_content} ierakstiem ir tukšs saturs.")
-
-    # Article sequence validation
-    articles = []
-    for i, item in enumerate(data):
-        if item.get("article"):
-            match = re.match(r'(\d+)', item["article"])
-            if match:
-                article_num = int(match.group(1))
-                articles.append((article_num, i))
-
-    if articles:
-        articles.sort()
-        prev_num = 0
-        gaps = []
-        
-        for article_num, index in articles:
-            if article_num < prev_num:
-                messages.append(f"Validācijas kļūda: Pantu secība nav pareiza pie ieraksta Nr.{index+1}. Pants {article_num} seko pēc {prev_num}.")
-            elif article_num > prev_num + 1:
-                # Check for gaps
-                for missing in range(prev_num + 1, article_num):
-                    gaps.append(str(missing))
-            prev_num = article_num
-        
-        if gaps:
-            messages.append(f"Brīdinājums: Iespējami iztrūkstošie panti: {', '.join(gaps[:10])}{'...' if len(gaps) > 10 else ''}")
-
-    # Structure validation
-    orphaned_points = sum(1 for item in data if item.get("point") and not item.get("article"))
-    if orphaned_points > 0:
-        messages.append(f"Strukturāla kļūda: {orphaned_points} punkti bez panta atsauces.")
-
-    orphaned_subpoints = sum(1 for item in data if item.get("subpoint") and not item.get("point"))
-    if orphaned_subpoints > 0:
-        messages.append(f"Strukturāla kļūda: {orphaned_subpoints} apakšpunkti bez punkta atsauces.")
-
-    # Content length validation
-    short_articles = sum(1 for item in data if item.get("article") and len(item.get("content", "")) < 10)
-    if short_articles > 0:
-        messages.append(f"Brīdinājums: {short_articles} panti ar ļoti īsu saturu (< 10 simboli).")
-
-    has_errors = any("kļūda" in msg.lower() for msg in messages)
-    
-    if not messages:
-        messages.append("Dati ir strukturāli derīgi un kvalitatīvi.")
-
-    return not has_errors, messages
+ARTICLE_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+class StreamingValidator:
+    """Incremental validation of entries in the order the parser emits them.
+
+    Keeps only counters and the current article/point state, so every
+    ``feed`` call is O(1) and the validator can run while the document is
+    still being parsed (e.g. as the ``on_entry`` callback of
+    ``process_pdf_to_structured_data``). Issues remember the page where the
+    offending entry starts; only the first ``max_reported`` of each kind are kept.
+    """
+
+    def __init__(self, max_reported: int = 10):
+        self.max_reported = max_reported
+        self.count = 0
+        self.missing_titles = 0
+        self.empty_content = 0
+        self.orphaned_points = 0
+        self.orphaned_subpoints = 0
+        self.short_articles = 0
+        self.order_errors: List[str] = []
+        self.gap_count = 0
+        self.gaps: List[str] = []
+        self._prev_article: Optional[str] = None
+        self._prev_num = 0
+
+    @staticmethod
+    def _at_page(page: Optional[int]) -> str:
+        return f" ({page}. lapā)" if page else ""
+
+    def feed(self, item: Dict[str, Any], page: Optional[int] = None):
+        """Validate one completed entry; ``page`` is its 1-based start page."""
+        self.count += 1
+        index = self.count
+
+        if not item.get("law_title") or item["law_title"] == "Nezinams_likums":
+            self.missing_titles += 1
+
+        content = item.get("content") or ""
+        if not content.strip():
+            self.empty_content += 1
+
+        article = item.get("article")
+        if article:
+            if len(content) < 10:
+                self.short_articles += 1
+            # Sequence is only checked when the article changes
+            if article != self._prev_article:
+                self._prev_article = article
+                match = ARTICLE_NUMBER_PATTERN.match(article)
+                if match:
+                    self._check_sequence(int(match.group(1)), index, page)
+        elif item.get("point"):
+            self.orphaned_points += 1
+
+        if item.get("subpoint") and not item.get("point"):
+            self.orphaned_subpoints += 1
+
+    def _check_sequence(self, article_num: int, index: int, page: Optional[int]):
+        prev_num = self._prev_num
+        if article_num < prev_num:
+            if len(self.order_errors) < self.max_reported:
+                self.order_errors.append(
+                    f"Validācijas kļūda: Pantu secība nav pareiza pie ieraksta Nr.{index}{self._at_page(page)}. "
+                    f"Pants {article_num} seko pēc {prev_num}."
+                )
+            return
+        if article_num > prev_num + 1:
+            missing = article_num - prev_num - 1
+            self.gap_count += missing
+            for number in range(prev_num + 1, article_num):
+                if len(self.gaps) >= self.max_reported:
+                    break
+                self.gaps.append(f"{number}{self._at_page(page)}")
+        self._prev_num = article_num
+
+    def finish(self) -> Tuple[bool, List[str]]:
+        """Return ``(is_valid, messages)`` in the same form as ``validate_processed_data``."""
+        messages = []
 
+        if self.count == 0:
+            messages.append("Validācijas kļūda: Datu saraksts ir tukšs.")
+            return False, messages
+
+        if self.missing_titles > 0:
+            messages.append(f"Brīdinājums: {self.missing_titles} ierakstiem trūkst likuma nosaukuma.")
+
+        if self.empty_content > 0:
+            messages.append(f"Brīdinājums: {self.empty_content} ierakstiem ir tukšs saturs.")
+
+        messages.extend(self.order_errors)
+
+        if self.gaps:
+            messages.append(f"Brīdinājums: Iespējami iztrūkstošie panti: {', '.join(self.gaps)}{'...' if self.gap_count > len(self.gaps) else ''}")
+
+        if self.orphaned_points > 0:
+            messages.append(f"Strukturāla kļūda: {self.orphaned_points} punkti bez panta atsauces.")
+
+        if self.orphaned_subpoints > 0:
+            messages.append(f"Strukturāla kļūda: {self.orphaned_subpoints} apakšpunkti bez punkta atsauces.")
+
+        if self.short_articles > 0:
+            messages.append(f"Brīdinājums: {self.short_articles} panti ar ļoti īsu saturu (< 10 simboli).")
+
+        has_errors = any("kļūda" in msg.lower() for msg in messages)
+
+        if not messages:
+            messages.append("Dati ir strukturāli derīgi un kvalitatīvi.")
+
+        return not has_errors, messages
+
+def validate_processed_data(data: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
+    """Enhanced validation of processed data structure (single pass over ``data``)."""
+    validator = StreamingValidator()
+    for item in data:
+        validator.feed(item)
+    return validator.finish()
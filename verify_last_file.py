@@ -3,45 +3,43 @@
 import os
 import shutil
 import json
-import fitz  # PyMuPDF
 import logging
 import re
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
 from config import path_config
+from catalog import catalog
+from logging_setup import configure_logging
 
 # Enhanced logging setup
 def setup_logging():
     """Setup logging with proper formatting."""
-    log_file_handler = logging.FileHandler(path_config.log_file, mode='a', encoding='utf-8')
-    log_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - VERIFY - %(message)s'))
-    
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
-    
-    if not logger.handlers:
-        logger.addHandler(log_file_handler)
-        logger.addHandler(logging.StreamHandler())
-    
-    return logger
+    return configure_logging(logging.getLogger(__name__), "VERIFY")
 
-logger = setup_logging()
+# Handlers are attached in main(), so importing this module has no side effects
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def find_latest_processed_files() -> Tuple[Optional[Path], Optional[Path]]:
+    """Find the most recently processed JSON and PDF files with better error handling.
 
-def extract_page_text_compat(page) -> str:
-    """Safely extract page text across PyMuPDF versions without tripping type checkers."""
+    The processing catalog is queried first; the directory scan is only used
+    for outputs produced before the catalog existed.
+    """
     try:
-        get_text = getattr(page, "get_text", None)
-        if callable(get_text):
-            return get_text()  # default mode is plain text
-        getText = getattr(page, "getText", None)
-        if callable(getText):
-            return getText()  # legacy fallback
-    except Exception:
-        pass
-    return ""
+        latest = catalog.latest()
+        if latest and latest.get("json_path"):
+            latest_json = Path(latest["json_path"])
+            latest_pdf = Path(latest["pdf_path"]) if latest.get("pdf_path") else None
+            if latest_json.exists():
+                if not latest_pdf or not latest_pdf.exists():
+                    logger.warning(f"Corresponding PDF not found: {latest_pdf.name if latest_pdf else '-'}")
+                    return latest_json, None
+                return latest_json, latest_pdf
+            logger.warning(f"Catalog entry points to a missing JSON file: {latest_json.name}")
+    except Exception as e:
+        logger.warning(f"Catalog lookup failed, scanning directories instead: {e}")
 
-def find_latest_processed_files() -> Tuple[Optional[Path], Optional[Path]]:
-    """Find the most recently processed JSON and PDF files with better error handling."""
     try:
         if not path_config.processed_json_dir.exists():
             logger.warning("JSON directory doesn't exist")
@@ -159,39 +157,53 @@ def calculate_similarity(text1: str, text2: str) -> float:
     return shorter / longer
 
 def verify_content_integrity(json_data: List[Dict[str, Any]], pdf_path: Path) -> List[str]:
-    """Compare JSON content with PDF original with enhanced analysis."""
+    """Compare JSON content with PDF original with enhanced analysis.
+
+    Entries that record their source pages (``page_start``/``page_end``) are
+    compared against the text of those pages only; older JSON files without
+    page numbers fall back to the text of the whole document.
+    """
     findings = []
+    source = None
     
     try:
         logger.info("Starting content integrity verification...")
         
-        pdf_text = ""
-        try:
-            with fitz.open(pdf_path) as doc:
-                # Use compatibility helper to avoid direct attribute access issues
-                pdf_text = "".join(extract_page_text_compat(page) for page in doc)
-        except Exception as e:
-            logger.error(f"Failed to open or read PDF: {e}")
-            findings.append("PDF text extraction failed or document is empty")
-            return findings
-        
-        if not pdf_text.strip():
-            findings.append("PDF text extraction failed or document is empty")
-            return findings
-
         # Group JSON data by articles
         json_articles = {}
+        article_entries = {}
         for item in json_data:
             article = item.get("article")
             if article and item.get("content"):
                 if article not in json_articles:
                     json_articles[article] = []
+                    article_entries[article] = []
                 json_articles[article].append(item["content"])
+                article_entries[article].append(item)
 
         # Combine content for each article
         for article in json_articles:
             json_articles[article] = " ".join(json_articles[article])
 
+        pdf_text = None
+        try:
+            from source_region import SourceDocument, entry_page_range
+
+            source = SourceDocument(pdf_path)
+            page_ranges = {article: entry_page_range(entries) for article, entries in article_entries.items()}
+            if not page_ranges or not all(page_ranges.values()):
+                # Output from before source pages were recorded
+                page_ranges = {}
+                pdf_text = source.full_text()
+        except Exception as e:
+            logger.error(f"Failed to open or read PDF: {e}")
+            findings.append("PDF text extraction failed or document is empty")
+            return findings
+        
+        if not len(source.doc) or (pdf_text is not None and not pdf_text.strip()):
+            findings.append("PDF text extraction failed or document is empty")
+            return findings
+
         logger.info(f"Comparing {len(json_articles)} articles...")
         
         similarity_threshold = path_config.content_similarity_threshold
@@ -203,7 +215,12 @@ def verify_content_integrity(json_data: List[Dict[str, Any]], pdf_path: Path) ->
                 continue
             
             article_num = int(match.group(1))
-            pdf_article_text = get_article_text_from_pdf(pdf_text, article_num)
+            if page_ranges:
+                start_page, end_page = page_ranges[article]
+                search_text = source.text_range(start_page, end_page)
+            else:
+                search_text = pdf_text
+            pdf_article_text = get_article_text_from_pdf(search_text, article_num)
             
             if not pdf_article_text:
                 findings.append(f"Article '{article}' not found in PDF text")
@@ -222,10 +239,14 @@ def verify_content_integrity(json_data: List[Dict[str, Any]], pdf_path: Path) ->
             logger.warning(f"Found {len(problematic_articles)} articles with content issues")
         else:
             logger.info("All articles passed content integrity check")
+        logger.info(f"Read {source.pages_read} of {len(source.doc)} PDF pages")
             
     except Exception as e:
         findings.append(f"Error during content integrity verification: {e}")
         logger.error(f"Content verification error: {e}")
+    finally:
+        if source:
+            source.close()
     
     return findings
 
@@ -327,6 +348,14 @@ def reprocess_files(pdf_path: Path, json_path: Path) -> bool:
         # Remove JSON file
         json_path.unlink()
         logger.info(f"JSON file removed: {json_path.name}")
+
+        # Keep the catalog in sync so the removed output is not picked up again
+        try:
+            entry = catalog.find_by_json_path(json_path.resolve())
+            if entry:
+                catalog.update_status(entry["id"], "reprocess")
+        except Exception as e:
+            logger.warning(f"Failed to update catalog: {e}")
         
         return True
         
@@ -336,6 +365,7 @@ def reprocess_files(pdf_path: Path, json_path: Path) -> bool:
 
 def main():
     """Main verification function with enhanced workflow."""
+    setup_logging()
     logger.info("Starting enhanced file verification process...")
     
     # Ensure directories exist
@@ -419,10 +449,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-    else:
-        print("\n📋 Files kept as they are")
-        logger.info("User chose to keep files without reprocessing")
-
-if __name__ == "__main__":
-    main()
-